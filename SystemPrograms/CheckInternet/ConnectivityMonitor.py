@@ -0,0 +1,176 @@
+import ipaddress
+import socket
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import psutil
+
+# The services themselves, on the port their requests use; DNS ports are often blocked where HTTPS is not.
+# Services add the endpoints they are configured with via add_endpoint().
+PROBE_TARGETS = (("openrouter.ai", 443), ("api.elevenlabs.io", 443))
+
+_shared_monitor = None
+_shared_lock = threading.Lock()
+
+
+def get_connectivity_monitor():
+    """Return the process-wide ConnectivityMonitor used by TextGeneration, Vision and VoiceGeneration."""
+    global _shared_monitor
+    with _shared_lock:
+        if _shared_monitor is None:
+            _shared_monitor = ConnectivityMonitor()
+        return _shared_monitor
+
+
+def active_interfaces():
+    """Names of interfaces that are up and have a non-loopback address: WiFi, Ethernet, USB tethering, ..."""
+    stats = psutil.net_if_stats()
+    names = []
+    for name, addresses in psutil.net_if_addrs().items():
+        if name not in stats or not stats[name].isup:
+            continue
+        for address in addresses:
+            if address.family not in (socket.AF_INET, socket.AF_INET6):
+                continue
+            try:
+                ip = ipaddress.ip_address(address.address.split("%")[0])
+            except ValueError:
+                continue
+            if not ip.is_loopback and not ip.is_link_local:
+                names.append(name)
+                break
+    return names
+
+
+def endpoint_target(url):
+    """(host, port) a request to `url` connects to."""
+    parts = urlsplit(url)
+    return parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+
+def is_loopback(host):
+    try:
+        return host == "localhost" or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def probe(targets=PROBE_TARGETS, timeout=1.0):
+    """True if a TCP connection to any target succeeds within `timeout` seconds."""
+    for host, port in targets:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            continue
+    return False
+
+
+class ConnectivityMonitor:
+    """
+    Cached reachability of the services. A background thread re-probes every `ttl` seconds (sooner while
+    offline, or right away after request_refresh()); is_online() only reads the cached flag.
+    """
+
+    def __init__(self, targets=PROBE_TARGETS, timeout=1.0, ttl=30.0, offline_ttl=5.0):
+        self.targets = list(targets)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.offline_ttl = offline_ttl  # Retry sooner while offline, so recovery is noticed quickly
+        self.online = None  # None until the first probe
+        self.checked_at = None
+        self.lock = threading.Lock()
+        self.first_probe_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.stats = {"probes": 0, "changes": 0, "last_probe_time": None}
+
+    def check(self):
+        """Probes now and updates the cached state; returns it."""
+        started = time.perf_counter()
+        with self.lock:
+            targets = list(self.targets)
+        # No usable interface means offline without waiting on connect timeouts (local endpoints aside)
+        if not any(is_loopback(host) for host, _ in targets) and not active_interfaces():
+            online = False
+        else:
+            online = probe(targets, self.timeout)
+        with self.lock:
+            changed = self.online is not None and online != self.online
+            self.online = online
+            self.checked_at = time.monotonic()
+            self.stats["probes"] += 1
+            self.stats["last_probe_time"] = time.perf_counter() - started
+            if changed:
+                self.stats["changes"] += 1
+        if changed:
+            print(f"Internet connection {'restored' if online else 'lost'}.")
+        return online
+
+    def is_online(self):
+        """Cached reachability. Only the very first call probes (and starts the background refresh)."""
+        online = self.online
+        if online is None:
+            with self.first_probe_lock:  # Concurrent first callers share one probe
+                online = self.online if self.online is not None else self.check()
+            self.start()
+        return online
+
+    def age(self):
+        """Seconds since the last probe, or None if there has not been one."""
+        checked_at = self.checked_at
+        return None if checked_at is None else time.monotonic() - checked_at
+
+    def add_endpoint(self, url):
+        """Probes the host a service is configured with first; the next is_online() re-probes if it is new."""
+        target = endpoint_target(url)
+        with self.lock:
+            if target in self.targets:
+                return
+            self.targets.insert(0, target)
+            self.online = None
+
+    def request_refresh(self):
+        """Asks the background thread to probe right away (HTTPClient calls it when a request fails to connect)."""
+        self.wake.set()
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            self.wake.wait(self.ttl if self.online else self.offline_ttl)
+            self.wake.clear()
+            self.check()
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, online=self.online, age=self.age())
+
+
+def benchmark_monitor(reads=100_000):
+    """Cost of a cached read vs. a live probe vs. the interface scan."""
+    monitor = ConnectivityMonitor()
+    started = time.perf_counter()
+    online = monitor.check()
+    probe_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(reads):
+        monitor.is_online()
+    read_time = (time.perf_counter() - started) / reads
+    started = time.perf_counter()
+    interfaces = active_interfaces()
+    scan_time = time.perf_counter() - started
+    print(f"online={online} via {interfaces} | probe {probe_time * 1000:.1f} ms | "
+          f"interface scan {scan_time * 1000:.2f} ms | cached read {read_time * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_monitor()
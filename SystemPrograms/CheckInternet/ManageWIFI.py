@@ -6,11 +6,12 @@ import threading
 import pickle
 import os
 import speedtest
-import psutil
 import platform
 import subprocess
 import re
 
+from SystemPrograms.CheckInternet.ConnectivityMonitor import active_interfaces
+
 # Define base paths
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
@@ -20,7 +21,7 @@ class CheckWIFI:
     def __init__(self):
         self.log_message_format = "| Date: {} | Time: {} | Message: {}"
         self.log_path = os.path.join(SYSTEM_FILES_PATH, "wifi_log.pkl")
-        self.__load_wifi_log__()
+        self.wifi_log = None  # Loaded on the first write; status checks never touch the file
 
     def __load_wifi_log__(self):
         """Load existing WiFi logs or create a new log file."""
@@ -35,6 +36,8 @@ class CheckWIFI:
 
     def __save_to_log__(self, log_message):
         """Append a log entry to the log file."""
+        if self.wifi_log is None:
+            self.__load_wifi_log__()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         formatted_message = self.log_message_format.format(
             timestamp.split()[0], timestamp.split()[1], log_message
@@ -44,24 +47,22 @@ class CheckWIFI:
             pickle.dump(self.wifi_log, f)
 
     def get_wifi_status(self):
-        """Check if the system is connected to WiFi."""
-        interfaces = psutil.net_if_addrs()
-        for interface in interfaces:
-            if "wlan" in interface.lower() or "wi-fi" in interface.lower():
-                return True
-        return False
+        """Check if the system has an active network link (WiFi or wired). For reachability use ConnectivityMonitor."""
+        return bool(active_interfaces())
 
     def get_wifi_strength(self):
         """Get WiFi signal strength (percentage for Windows, dBm for Linux)."""
         os_name = platform.system()
 
         if os_name == "Linux":
+            # The kernel's wireless table has the same signal level iwconfig prints, without a subprocess
             try:
-                output = subprocess.check_output("iwconfig 2>/dev/null", shell=True).decode()
-                match = re.search(r"Signal level=(-?\d+) dBm", output)
-                if match:
-                    return f"{match.group(1)} dBm"
-            except Exception:
+                with open("/proc/net/wireless", "r") as f:
+                    for line in f.readlines()[2:]:
+                        fields = line.split()
+                        if len(fields) >= 4:
+                            return f"{int(float(fields[3].rstrip('.')))} dBm"
+            except (OSError, ValueError):
                 return "Unknown"
 
         elif os_name == "Windows":
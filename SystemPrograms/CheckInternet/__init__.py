@@ -1 +1,2 @@
-from SystemPrograms.CheckInternet.ManageWIFI import CheckWIFI
\ No newline at end of file
+from SystemPrograms.CheckInternet.ManageWIFI import CheckWIFI
+from SystemPrograms.CheckInternet.ConnectivityMonitor import ConnectivityMonitor, get_connectivity_monitor
\ No newline at end of file
@@ -0,0 +1,395 @@
+import queue
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from SystemPrograms.VoiceGeneration.VoiceSynthesis import Voice
+from SystemPrograms.VoiceRecognition.ContinuousListener import ContinuousListener, MicrophoneSource
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s)")
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "e.g.", "i.e.", "etc.", "no."}
+
+
+class SentenceSplitter:
+    """Turns a token stream into speakable sentences as soon as each one is complete."""
+
+    def __init__(self, min_chars=12, max_chars=200):
+        self.min_chars = min_chars  # Shorter fragments ("Oh.") are joined to the next sentence
+        self.max_chars = max_chars  # Longer run-ons are cut at a comma or space
+        self.buffer = ""
+
+    def feed(self, token):
+        """Adds a token; returns the sentences it completed."""
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            words = candidate.split()
+            if len(candidate) < self.min_chars or (words and words[-1].lower() in ABBREVIATIONS):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        while len(self.buffer) > self.max_chars:
+            cut = max(self.buffer.rfind(", ", 0, self.max_chars), self.buffer.rfind("; ", 0, self.max_chars))
+            cut = cut + 1 if cut > 0 else self.buffer.rfind(" ", 0, self.max_chars)
+            if cut <= 0:
+                break
+            sentences.append(self.buffer[:cut].strip())
+            self.buffer = self.buffer[cut:]
+        return [sentence for sentence in sentences if sentence]
+
+    def flush(self):
+        """Returns whatever is left once the stream has ended."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest or None
+
+
+class SpokenSentence:
+    """One sentence of a reply and its PCM, filled by a synthesis worker and drained by the player."""
+
+    def __init__(self, text):
+        self.text = text
+        self.chunks = queue.Queue()  # PCM chunks, then None
+
+
+class VoiceConversation:
+    """
+    Speech in, speech out, with the stages overlapped: the reply is streamed from the LLM, each finished
+    sentence goes to TTS while later ones are still being written, and one player writes the sentences'
+    audio back to back into a single sink. With barge_in, speaking while a reply is playing cancels it.
+    """
+
+    def __init__(self, ai, voice=None, vision_model=None, source=None, synthesis_workers=2, barge_in=False):
+        self.ai = ai
+        self.voice = voice or Voice()
+        self.vision_model = vision_model
+        self.source = source  # Audio source for the listener; the microphone by default
+        self.barge_in = barge_in  # Needs headphones or echo cancellation, or the reply interrupts itself
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=synthesis_workers)
+        self.listener = None
+        self.turns = queue.Queue()  # (transcript, end-of-speech timestamp), None to stop
+        self.turn_thread = None
+        self.turn_cancel = threading.Event()
+        self.producer = None  # Thread streaming the current (or last) reply
+        self.busy = threading.Event()  # Set while a reply is being generated or played
+        self.active_sink = None
+        self.sink_lock = threading.Lock()
+        self.metrics = {}
+        self.latencies = deque(maxlen=100)  # End of user speech -> first audio, per turn
+        self.interruptions = 0
+
+    def start(self):
+        """Starts listening and answering in the background."""
+        self.turn_thread = threading.Thread(target=self._turn_loop, daemon=True)
+        self.turn_thread.start()
+        self.listener = ContinuousListener(self.source or MicrophoneSource(), on_transcript=self._on_transcript,
+                                           on_speech_start=self._on_speech_start).start()
+        return self
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+        self.interrupt()
+        self.turns.put(None)
+        if self.turn_thread:
+            self.turn_thread.join(5.0)
+        if self.producer is not None:
+            self.producer.join(5.0)
+        self.synthesis_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_speech_start(self):
+        if self.barge_in and self.busy.is_set():
+            self.interrupt()
+
+    def _on_transcript(self, text, latency):
+        self.turns.put((text, time.perf_counter() - latency))
+
+    def _turn_loop(self):
+        while True:
+            turn = self.turns.get()
+            if turn is None:
+                return
+            text, speech_ended = turn
+            print(f"You: {text}")
+            try:
+                self.respond(text, speech_ended)
+            except Exception as e:  # One bad turn must not stop the assistant from answering
+                print(f"Voice reply failed: {e}")
+
+    def interrupt(self):
+        """Stops the current reply at once: LLM stream, pending synthesis and playback."""
+        if self.busy.is_set():
+            self.interruptions += 1
+        self.turn_cancel.set()
+        with self.sink_lock:
+            sink = self.active_sink
+        if sink is not None:
+            sink.abort()
+        self.voice.cancel()
+
+    def respond(self, text, speech_ended=None):
+        """Answers one user turn out loud. Returns the reply text (partial if interrupted)."""
+        speech_ended = speech_ended or time.perf_counter()
+        if self.producer is not None:
+            self.producer.join()  # The previous reply must be saved before this turn is added
+        cancel = self.turn_cancel = threading.Event()  # Fresh per turn, so stale workers stay cancelled
+        self.busy.set()
+        self.metrics = {"first_token": None, "first_sentence": None, "first_audio": None, "reply_time": None,
+                        "sentences": 0, "playback_stalls": 0.0, "interrupted": False}
+        playback = queue.Queue()  # SpokenSentence in reply order, None ends the reply
+        player = threading.Thread(target=self._play, args=(playback, cancel, speech_ended), daemon=True)
+        tokens = queue.Queue()  # Reply tokens, then None
+        self.producer = threading.Thread(target=self._produce, args=(text, tokens, cancel), daemon=True)
+        splitter = SentenceSplitter()
+        parts = []
+        try:
+            player.start()
+            self.producer.start()
+            while True:
+                try:
+                    token = tokens.get(timeout=0.05)
+                except queue.Empty:
+                    if cancel.is_set():
+                        break  # Barge-in while waiting for a token; the producer finishes on its own
+                    continue
+                if token is None or cancel.is_set():
+                    rest = None if cancel.is_set() else splitter.flush()
+                    if rest:
+                        self._speak(rest, playback, cancel, speech_ended)
+                    break
+                if self.metrics["first_token"] is None:
+                    self.metrics["first_token"] = time.perf_counter() - speech_ended
+                parts.append(token)
+                for sentence in splitter.feed(token):
+                    self._speak(sentence, playback, cancel, speech_ended)
+            self.metrics["reply_time"] = time.perf_counter() - speech_ended
+        finally:
+            playback.put(None)
+            player.join()
+            self.metrics["interrupted"] = cancel.is_set()
+            self.busy.clear()
+        return "".join(parts)
+
+    def _produce(self, text, tokens, cancel):
+        """
+        Streams the reply on its own thread, so a barge-in never waits for the next token. Stopping early
+        closes the stream, which saves the partial reply (see BaseAI.stream_chat_with_ai).
+        """
+        stream = self.ai.stream_chat_with_ai(text, vision_model=self.vision_model)
+        try:
+            for token in stream:
+                if cancel.is_set():
+                    break
+                tokens.put(token)
+        except Exception as e:  # Includes "Stream error" from an SSE error chunk
+            print(f"Reply failed: {e}")
+        finally:
+            stream.close()
+            tokens.put(None)
+
+    def _speak(self, text, playback, cancel, speech_ended):
+        sentence = SpokenSentence(text)
+        if self.metrics["first_sentence"] is None:
+            self.metrics["first_sentence"] = time.perf_counter() - speech_ended
+        self.metrics["sentences"] += 1
+        playback.put(sentence)
+        self.synthesis_pool.submit(self._synthesize, sentence, cancel)
+
+    def _synthesize(self, sentence, cancel):
+        """Fills a sentence's chunk queue from the audio cache or a live TTS stream."""
+        audio_cache = self.voice.audio_cache
+        key = self.voice.cache_key(sentence.text) if audio_cache else None
+        try:
+            cached = audio_cache.get(key, self.voice.sample_rate * 2) if key else None
+            if cached is not None:
+                for pcm in self.voice.iter_cached(cached):
+                    sentence.chunks.put(pcm)
+                return
+            received = []
+            for pcm in self.voice.stream_audio(sentence.text, cancel_event=cancel):
+                sentence.chunks.put(pcm)
+                received.append(pcm)
+            if key and received and not cancel.is_set():
+                audio_cache.put(key, b"".join(received))
+        except requests.exceptions.RequestException as e:
+            print(f"An error occurred while making the request: {str(e)}")
+        finally:
+            sentence.chunks.put(None)
+
+    @staticmethod
+    def _next_chunk(sentence, cancel):
+        """Waits for the sentence's next chunk; gives up as soon as the turn is cancelled."""
+        while not cancel.is_set():
+            try:
+                return sentence.chunks.get(timeout=0.05)
+            except queue.Empty:
+                continue
+        return None
+
+    def _play(self, playback, cancel, speech_ended):
+        """Writes every sentence's audio, in order, into one sink so there are no gaps between them."""
+        sink = None
+        try:
+            while not cancel.is_set():
+                sentence = playback.get()
+                if sentence is None:
+                    break
+                while not cancel.is_set():
+                    waited = time.perf_counter()
+                    pcm = self._next_chunk(sentence, cancel)
+                    if pcm is None:
+                        break
+                    if sink is None:
+                        with self.sink_lock:
+                            sink = self.active_sink = self.voice.sink_factory(self.voice.sample_rate)
+                        if cancel.is_set():
+                            break
+                    else:
+                        self.metrics["playback_stalls"] += time.perf_counter() - waited  # Audio ran dry
+                    sink.write(pcm)
+                    if self.metrics["first_audio"] is None:
+                        self.metrics["first_audio"] = sink.first_write - speech_ended
+                        self.latencies.append(self.metrics["first_audio"])
+        except OSError as e:
+            if not cancel.is_set():
+                print(f"Audio playback failed: {e}")
+        finally:
+            if sink is not None:
+                if cancel.is_set():
+                    sink.abort()
+                else:
+                    sink.close()
+            with self.sink_lock:
+                self.active_sink = None
+
+    def get_stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "turns": len(latencies),
+            "interruptions": self.interruptions,
+            "first_audio_mean": sum(latencies) / len(latencies) if latencies else None,
+            "first_audio_p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+            "last_turn": dict(self.metrics),
+        }
+
+
+def benchmark_conversation(first_token_delay=0.4, tokens_per_second=40, tts_first_byte=0.25):
+    """
+    End of user speech -> first audio, sequential chain vs. this pipeline, against local stand-ins for
+    OpenRouter (SSE or one JSON reply) and ElevenLabs (PCM at 4x real time after a first-byte delay).
+    """
+    import json
+    import os
+    import shutil
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from SystemPrograms.TextGeneration.GenerateText import BaseAI
+    from SystemPrograms.VoiceGeneration.AudioSinks import NullSink
+
+    reply = ("Sure, I can help with that. The weather today looks mild, with a light breeze in the afternoon. "
+             "You might want a jacket later. Anything else you would like to know?")
+    tokens = re.findall(r"\S+\s*", reply)
+    sample_rate = 22050
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            try:
+                if self.path.startswith("/chat"):
+                    self.chat(body)
+                else:
+                    self.tts(body)
+            except ConnectionError:
+                pass  # The client cancelled
+
+        def chunked(self, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def chat(self, body):
+            time.sleep(first_token_delay)
+            if not body.get("stream"):
+                time.sleep(len(tokens) / tokens_per_second)
+                data = json.dumps({"choices": [{"message": {"content": reply}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.chunked("text/event-stream")
+            for token in tokens:
+                self.write_chunk(f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n".encode())
+                time.sleep(1 / tokens_per_second)
+            self.write_chunk(b"data: [DONE]\n\n")
+            self.write_chunk(b"")
+
+        def tts(self, body):
+            audio_seconds = 0.065 * len(body.get("text", ""))  # Roughly speaking speed
+            chunk = b"\x00\x01" * int(sample_rate * 0.1)
+            self.chunked("audio/pcm")
+            time.sleep(tts_first_byte)
+            for _ in range(int(audio_seconds / 0.1)):
+                self.write_chunk(chunk)
+                time.sleep(0.1 / 4)
+            self.write_chunk(b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = tempfile.mkdtemp()
+    ai = BaseAI(memory_file=os.path.join(work_dir, "memory.json"), api_url=f"{base_url}/chat",
+                log_file=os.path.join(work_dir, "memory.jsonl"), fsync="never")
+    voice = Voice(use_audio_cache=False, sink_factory=lambda rate: NullSink(rate, realtime=True))
+    voice.api_key, voice.voice_id = voice.api_key or "test", voice.voice_id or "test"
+    voice.tts_url = f"{base_url}/tts"
+
+    # Today's chain: whole reply, then the whole audio, then playback
+    started = time.perf_counter()
+    text = ai.chat_with_ai("What's the weather like?")
+    b"".join(voice.stream_audio(text))
+    print(f"sequential:  first audio after {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    conversation = VoiceConversation(ai, voice)
+    conversation.respond("What's the weather like?")
+    metrics = conversation.metrics
+    print(f"pipelined:   first audio after {metrics['first_audio'] * 1000:.0f} ms | first token "
+          f"{metrics['first_token'] * 1000:.0f} ms, first sentence {metrics['first_sentence'] * 1000:.0f} ms, "
+          f"{metrics['sentences']} sentences, {metrics['playback_stalls'] * 1000:.0f} ms of stalls after first audio")
+
+    for interrupt_after in (0.2, 0.6, 1.5):  # The user starts talking over the reply
+        timer = threading.Timer(interrupt_after, conversation.interrupt)
+        timer.start()
+        started = time.perf_counter()
+        conversation.respond("Tell me again.")
+        stopped = time.perf_counter() - started
+        conversation.producer.join()
+        print(f"barge-in at {interrupt_after} s: stopped after {stopped * 1000:.0f} ms, "
+              f"saved reply {ai.memory[-1]['content'][:40]!r}")
+    conversation.stop()
+    server.shutdown()
+    assert [m["role"] for m in ai.memory[-8:]] == ["user", "assistant"] * 4
+    shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_conversation()
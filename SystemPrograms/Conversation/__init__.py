@@ -0,0 +1 @@
+from SystemPrograms.Conversation.VoiceConversation import VoiceConversation
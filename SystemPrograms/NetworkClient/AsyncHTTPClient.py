@@ -0,0 +1,172 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import requests
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+from SystemPrograms.NetworkClient.HTTPClient import DEFAULT_TIMEOUT, IDEMPOTENT_METHODS, RETRY_STATUSES, get_shared_client
+
+try:
+    import aiohttp
+except ImportError:  # Optional; requests in a worker thread is used instead
+    aiohttp = None
+
+# Errors raised before the request was sent; older aiohttp reports connect timeouts as ServerTimeoutError
+CONNECT_ERRORS = (aiohttp.ClientConnectorError, getattr(aiohttp, "ConnectionTimeoutError", aiohttp.ClientConnectorError)) if aiohttp else ()
+
+_shared_async_client = None
+_shared_async_lock = threading.Lock()
+
+
+def get_shared_async_client():
+    """Return the process-wide AsyncHTTPClient (one aiohttp session per event loop)."""
+    global _shared_async_client
+    with _shared_async_lock:
+        if _shared_async_client is None:
+            _shared_async_client = AsyncHTTPClient()
+        return _shared_async_client
+
+
+class AsyncResponse:
+    """The parts of requests.Response the callers use, for a body already read by aiohttp."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncHTTPClient:
+    """
+    Awaitable counterpart of HTTPClient with the same retries and per-endpoint stats (kept in the shared
+    sync client). Uses aiohttp when installed; otherwise runs the sync client in a worker thread.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_in_flight=8, sync_client=None):
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.sync = sync_client or get_shared_client()
+        self.session = None
+        self.loop = None
+        self.in_flight = None
+
+    def _session(self):
+        # aiohttp sessions belong to the loop that created them; asyncio.run() twice means two loops
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.loop is not loop or self.session.closed:
+            connect, read = self.timeout
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read))
+            self.loop = loop
+            self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        return self.session
+
+    async def request(self, method, url, retry=True, idempotent=None, **kwargs):
+        """Send a request and read the whole body, retrying like HTTPClient (POSTs only if they never left)."""
+        if aiohttp is None:
+            return await asyncio.to_thread(self.sync.request, method, url, retry=retry, idempotent=idempotent, **kwargs)
+
+        session = self._session()
+        endpoint = self.sync.endpoint_name(url)
+        attempts = self.sync.max_retries + 1 if retry else 1
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                async with self.in_flight:
+                    async with session.request(method, url, **kwargs) as response:
+                        content = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.sync._record(endpoint, time.perf_counter() - started, error=True)
+                get_connectivity_monitor().request_refresh()  # Don't wait for the next scheduled probe
+                if attempt + 1 >= attempts or not (idempotent or isinstance(e, CONNECT_ERRORS)):
+                    # Callers handle the same exceptions whichever backend is in use
+                    error = requests.exceptions.Timeout if isinstance(e, asyncio.TimeoutError) else requests.exceptions.ConnectionError
+                    raise error(str(e) or type(e).__name__) from e
+                self.sync._record_retry(endpoint)
+                await asyncio.sleep(self.sync._retry_delay(attempt))
+                continue
+
+            result = AsyncResponse(response.status, response.headers, content)
+            self.sync._record(endpoint, time.perf_counter() - started, result.status_code, error=not result.ok)
+            if result.status_code in RETRY_STATUSES and attempt + 1 < attempts:
+                self.sync._record_retry(endpoint)
+                await asyncio.sleep(self.sync._retry_delay(attempt, result.headers.get("Retry-After")))
+                continue
+            return result
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+def benchmark_async_client(requests_count=50, delay=0.05):
+    """Concurrent awaited requests vs. the same requests one after another, against a slow local stand-in."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class StandInServer(ThreadingHTTPServer):
+        request_queue_size = 64  # Concurrent connects would otherwise overflow the listen backlog
+
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions"
+    client = AsyncHTTPClient()
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(requests_count):
+            (await client.post(url, json={"messages": []})).json()
+        sequential = time.perf_counter() - started
+        started = time.perf_counter()
+        await asyncio.gather(*(client.post(url, json={"messages": []}) for _ in range(requests_count)))
+        concurrent = time.perf_counter() - started
+        await client.aclose()
+        return sequential, concurrent
+
+    sequential, concurrent = asyncio.run(run())
+    backend = "aiohttp" if aiohttp else "requests in threads"
+    print(f"{requests_count} requests ({backend}): awaited one by one {sequential:.2f}s | "
+          f"gathered {concurrent:.2f}s (at most {client.max_in_flight} in flight)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_async_client()
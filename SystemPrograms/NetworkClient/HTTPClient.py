@@ -0,0 +1,218 @@
+import json
+import random
+import sys
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+
+DEFAULT_TIMEOUT = (3.05, 60)  # (connect, read) seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client():
+    """Return the process-wide HTTPClient used by TextGeneration, Vision and VoiceGeneration."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HTTPClient()
+        return _shared_client
+
+
+def failed_before_send(error):
+    """True if a requests exception means the request never reached the server (it could not connect)."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.Timeout):
+        return False  # Read timeout: the server may be working on it
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+class HTTPClient:
+    """Keep-alive HTTP client with per-host connection pools, timeouts, retries and an in-flight limit."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=3, backoff=0.5, max_backoff=8.0,
+                 max_in_flight=8, pool_connections=4, pool_maxsize=8):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        # One pool per host; connections are kept alive and reused across calls
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    def endpoint_name(self, url):
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter; a server's Retry-After wins if it is longer."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        try:
+            delay = max(delay, min(float(retry_after), self.max_backoff * 4))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    def _record(self, endpoint, elapsed, status=None, error=False):
+        with self.stats_lock:
+            entry = self.stats.setdefault(endpoint, {"count": 0, "errors": 0, "retries": 0, "total": 0.0, "max": 0.0, "last": 0.0, "statuses": {}})
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["last"] = elapsed
+            if error:
+                entry["errors"] += 1
+            if status is not None:
+                entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+
+    def _record_retry(self, endpoint):
+        with self.stats_lock:
+            self.stats[endpoint]["retries"] += 1
+
+    def request(self, method, url, timeout=None, retry=True, idempotent=None, **kwargs):
+        """
+        Send a request, retrying 429/5xx responses and connection errors with jittered backoff. A POST that
+        may have reached the server is only retried with idempotent=True, since it could run twice.
+        With stream=True the in-flight slot is held until the response is closed.
+        """
+        endpoint = self.endpoint_name(url)
+        attempts = self.max_retries + 1 if retry else 1
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            self.in_flight.acquire()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.in_flight.release()
+                self._record(endpoint, time.perf_counter() - started, error=True)
+                get_connectivity_monitor().request_refresh()  # Don't wait for the next scheduled probe
+                if attempt + 1 >= attempts or not (idempotent or failed_before_send(e)):
+                    raise
+                self._record_retry(endpoint)
+                time.sleep(self._retry_delay(attempt))
+                continue
+            except BaseException:
+                self.in_flight.release()
+                raise
+            if kwargs.get("stream"):
+                self._release_on_close(response)
+            else:
+                self.in_flight.release()
+
+            elapsed = time.perf_counter() - started
+            self._record(endpoint, elapsed, response.status_code, error=not response.ok)
+            if response.status_code in RETRY_STATUSES and attempt + 1 < attempts:
+                self._record_retry(endpoint)
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                response.close()
+                time.sleep(delay)
+                continue
+            return response
+
+    def _release_on_close(self, response):
+        """Frees the in-flight slot of a streamed response once it is closed (or garbage collected)."""
+        lock = threading.Lock()
+        released = []
+
+        def release():
+            with lock:
+                if released:
+                    return
+                released.append(True)
+            self.in_flight.release()
+
+        close = response.close
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        weakref.finalize(response, release)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def get_stats(self):
+        """Per-endpoint latency summary: count, errors, retries, avg/max/last seconds and status codes."""
+        with self.stats_lock:
+            return {
+                endpoint: dict(entry, avg=entry["total"] / entry["count"] if entry["count"] else 0.0, statuses=dict(entry["statuses"]))
+                for endpoint, entry in self.stats.items()
+            }
+
+    def report(self):
+        for endpoint, entry in self.get_stats().items():
+            print(
+                f"{endpoint}: {entry['count']} calls | avg {entry['avg'] * 1000:.1f} ms | max {entry['max'] * 1000:.1f} ms "
+                f"| errors {entry['errors']} | retries {entry['retries']} | statuses {entry['statuses']}"
+            )
+
+    def close(self):
+        self.session.close()
+
+
+def benchmark_client(requests_count=50):
+    """Exercise the client against a local stand-in server that rate-limits every fifth call."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive
+        disable_nagle_algorithm = True
+        calls = 0
+
+        def do_POST(self):
+            StandInHandler.calls += 1
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            status = 429 if StandInHandler.calls % 5 == 0 else 200
+            body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions"
+
+    client = HTTPClient(backoff=0.01)
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        client.post(url, json={"messages": []}).json()
+    print(f"{requests_count} pooled requests in {time.perf_counter() - started:.3f}s")
+    client.report()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_client()
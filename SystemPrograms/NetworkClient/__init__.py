@@ -0,0 +1 @@
+from SystemPrograms.NetworkClient.HTTPClient import HTTPClient, get_shared_client
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import threading
+
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+from SystemPrograms.NetworkClient.AsyncHTTPClient import get_shared_async_client
+
+
+class StdinLines:
+    """
+    Lines typed on stdin as an awaitable queue. A daemon thread makes raw os.read() calls: unlike input(),
+    it holds no interpreter-level lock, so being blocked in it does not break shutdown.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.lines = asyncio.Queue()
+        self.encoding = sys.stdin.encoding or "utf-8"
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        buffer = b""
+        while True:
+            try:
+                chunk = os.read(sys.stdin.fileno(), 4096)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                if buffer:
+                    self._put(buffer)
+                self._put(None)  # End of input
+                return
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                self._put(line.rstrip(b"\r"))
+
+    def _put(self, line):
+        text = None if line is None else line.decode(self.encoding, errors="replace")
+        try:
+            self.loop.call_soon_threadsafe(self.lines.put_nowait, text)
+        except RuntimeError:
+            pass  # The loop has already closed
+
+    async def readline(self, prompt=""):
+        """Next line without its newline, or None at end of input."""
+        print(prompt, end="", flush=True)
+        return await self.lines.get()
+
+
+class AsyncRuntime:
+    """
+    Runs chat, vision and voice as tasks on one event loop. They share a TaskGroup, so quitting, Ctrl+C
+    or a crash in any of them cancels the others, and shutdown() then releases what they held.
+    """
+
+    def __init__(self, ai, vision_model=None, voice=None):
+        self.ai = ai
+        self.vision_model = vision_model
+        self.voice = voice
+        self.replies = None  # Replies waiting to be spoken
+        self.stopping = None
+        self.stdin = None
+
+    async def run(self):
+        self.replies = asyncio.Queue()
+        self.stopping = asyncio.Event()
+        self.stdin = self.stdin or StdinLines()
+        await asyncio.to_thread(get_connectivity_monitor().is_online)  # The first probe blocks; keep it off the loop
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self.chat_task(), name="chat")]
+                if self.vision_model:
+                    tasks.append(group.create_task(self.vision_model.avision_loop(), name="vision"))
+                if self.voice:
+                    tasks.append(group.create_task(self.voice_task(), name="voice"))
+                await self.stopping.wait()
+                for task in tasks:
+                    task.cancel()
+        finally:
+            await self.shutdown()
+
+    def stop(self):
+        self.stopping.set()
+
+    async def chat_task(self):
+        while True:
+            user_message = await self.stdin.readline("You: ")
+            if user_message is None or user_message.lower() in ["exit", "quit"]:
+                break
+            if user_message.startswith("/enroll") and self.vision_model:
+                print(self.vision_model.face_recognizer.enrollment.command(user_message))
+                continue
+            reply = await self.ai.achat_with_ai(user_message, vision_model=self.vision_model)
+            if reply:
+                print(f"Toa: {reply}")
+                if self.voice:
+                    self.replies.put_nowait(reply)
+        self.stop()
+
+    async def voice_task(self):
+        while True:
+            text = await self.replies.get()
+            # Streamed playback blocks, so it runs in a thread; unlike the mp3 path, cancel() can stop it mid-sentence
+            speaking = asyncio.ensure_future(asyncio.to_thread(self.voice.speak_streaming, text))
+            try:
+                await asyncio.shield(speaking)
+            except asyncio.CancelledError:
+                while not speaking.done():  # speak_streaming clears the flag when it starts, so keep cancelling
+                    self.voice.cancel()
+                    await asyncio.wait({speaking}, timeout=0.05)
+                raise
+
+    async def shutdown(self):
+        if self.vision_model:
+            self.vision_model.running = False
+        if self.voice:
+            self.voice.cancel()
+        await get_shared_async_client().aclose()
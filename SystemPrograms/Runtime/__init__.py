@@ -0,0 +1 @@
+from SystemPrograms.Runtime.AsyncRuntime import AsyncRuntime
@@ -3,61 +3,75 @@ import termcolor
 import json
 import os
 import py_compile
-import subprocess
-import configparser
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+from SystemPrograms.SystemSetup.ConfigStore import get_config_store
+from SystemPrograms.SystemSetup.DependencyGraph import DependencyGraph
+from SystemPrograms.SystemSetup.RuntimeChecker import RuntimeChecker
+from SystemPrograms.SystemSetup.VerificationCache import VerificationCache
+
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
 SYSTEM_PROGRAMS_PATH = os.path.join(BASE_PATH, "SystemPrograms")
 CONFIG_PATH = os.path.join(BASE_PATH, "SystemFiles", "config.cfg")  # Config file
 TEMP_CONFIG_PATH = os.path.join(BASE_PATH, "SystemFiles", "temp", "config.cfg")
 
+RUNTIME_TIMEOUT = 10  # Seconds each module may run during the runtime check
+
 SKIP_FILES = {"AuthorizeFiles.py", "FileMonitor.py"}  # Skip these files
 SKIP_DIR = {os.path.join(BASE_PATH, "SystemPrograms", "SystemSetup")}
+CACHE_DIRS = {  # Regenerable, not verified
+    os.path.join(BASE_PATH, "SystemFiles", "temp", "response_cache"),
+    os.path.join(BASE_PATH, "SystemFiles", "temp", "tts_cache"),
+}
 
 class AuthorizeFiles:
-    def __init__(self, sys_files=SYSTEM_FILES_PATH, program_files=SYSTEM_PROGRAMS_PATH):
+    def __init__(self, sys_files=SYSTEM_FILES_PATH, program_files=SYSTEM_PROGRAMS_PATH, use_cache=True):
         self.sys_files = sys_files
         self.program_files = program_files
         self.verified_sys_files = []
+        self.program_paths = []  # Every program file seen by the syntax check
         self.passed_files = []  # Track files that pass syntax
-        self.config = configparser.ConfigParser()
+        self.store = get_config_store(TEMP_CONFIG_PATH)  # Working copy, flushed once per phase
+        self.cache = VerificationCache()
+        if not use_cache:
+            self.cache.clear()
+        self.started = time.perf_counter()
         self.load_config()
         if os.path.exists(CONFIG_PATH):
             os.remove(CONFIG_PATH)
 
     def load_config(self, path=TEMP_CONFIG_PATH):
         """Load configuration from the cfg file."""
-        if os.path.exists(path):
-            self.config.read(path)
-        else:
-            self.config = configparser.ConfigParser()
+        if not self.store.exists():
+            self.store.clear()  # The shared store still holds the previous run, which has been certified
+        self.store.refresh()
 
     def save_config(self, path=TEMP_CONFIG_PATH):
-        """Save updated file statuses back to config.cfg."""
-        with open(path, "w") as configfile:
-            self.config.write(configfile)
+        """Flush the batched file statuses to the temp config in one atomic write."""
+        self.store.flush(path)
 
     def set_file_status(self, section, filename, status):
-        """Set file status in the config file."""
-        if section not in self.config:
-            self.config[section] = {}
-        self.config[section][filename] = status
-        self.save_config()
+        """Set file status in memory; it is written at the end of the phase."""
+        self.store.set_status(section, filename, status)
 
     def verify_files(self):
+        self.started = time.perf_counter()
         if os.path.exists(CONFIG_PATH):
             os.remove(CONFIG_PATH)
         termcolor.cprint("DEBUG: Checking System Files", "red")
-        for dirpath, _, filenames in os.walk(self.sys_files):
+        for dirpath, dirnames, filenames in os.walk(self.sys_files):
+            dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) not in CACHE_DIRS]
             section = os.path.relpath(dirpath, BASE_PATH).replace(os.sep, ".")
             for filename in filenames:
                 filepath = os.path.join(dirpath, filename)
                 termcolor.cprint(f"Verified [ {datetime.now().strftime('%d-%m-%Y %H:%M:%S')} ]: {filename} @ {filepath}", "green")
                 self.verified_sys_files.append(filepath)
                 self.set_file_status("SystemFiles", filename, "enabled")
+        self.save_config()
 
     def verify_json_files(self):
         if os.path.exists(CONFIG_PATH):
@@ -68,14 +82,22 @@ class AuthorizeFiles:
             if filepath.endswith(".json"):
                 termcolor.cprint(f"Checking JSON -> {filepath}", "yellow")
                 filename = os.path.basename(filepath)
+                cached = self.cache.lookup(filepath, "json")
+                if cached is not None:
+                    termcolor.cprint(f"Cached JSON ({cached}): {filepath}", "cyan")
+                    self.set_file_status("SystemFiles", filename, cached)
+                    continue
                 try:
                     with open(filepath, "r") as f:
                         json.load(f)  # Ensure it's valid JSON
                     termcolor.cprint(f"Valid JSON: {filepath}", "green")
                     self.set_file_status("SystemFiles", filename, "enabled")
+                    self.cache.record(filepath, "json", "enabled")
                 except json.JSONDecodeError:
                     termcolor.cprint(f"Invalid JSON: {filepath}", "red")
                     self.set_file_status("SystemFiles", filename, "disabled")
+                    self.cache.record(filepath, "json", "disabled")
+        self.save_config()
 
     def verify_program_files_syntax(self):
         if os.path.exists(CONFIG_PATH):
@@ -84,65 +106,127 @@ class AuthorizeFiles:
         for dirpath, _, filenames in os.walk(self.program_files):
             section = os.path.relpath(dirpath, BASE_PATH).replace(os.sep, ".")
             for filename in filenames:
+                if filename.endswith(".py"):
+                    self.program_paths.append(os.path.join(dirpath, filename))
                 if dirpath in SKIP_DIR or filename in SKIP_FILES:
                     termcolor.cprint(f"⚠️ Skipping {filename} (manual exclusion)", "yellow")
                     self.set_file_status(section, filename, "not implemented")
                     continue
                 if filename.endswith(".py"):
                     filepath = os.path.join(dirpath, filename)
+                    cached = self.cache.lookup(filepath, "syntax")
+                    if cached is not None:
+                        termcolor.cprint(f"Cached syntax ({cached}): {filename}", "cyan")
+                        if cached == "enabled":
+                            self.passed_files.append(filepath)
+                        self.set_file_status(section, filename, cached)
+                        continue
                     termcolor.cprint(f"[{datetime.now().strftime(r'%m/%d/%Y %H:%M:%S')}] Checking syntax -> {filepath}", "yellow")
                     try:
                         py_compile.compile(filepath, doraise=True)
                         termcolor.cprint(f"Syntax OK: {filename}", "green")
                         self.passed_files.append(filepath)
                         self.set_file_status(section, filename, "enabled")
+                        self.cache.record(filepath, "syntax", "enabled")
                     except py_compile.PyCompileError:
                         termcolor.cprint(f"Syntax ERROR: {filename}", "red")
                         self.set_file_status(section, filename, "disabled")
+                        self.cache.record(filepath, "syntax", "disabled")
+        self.save_config()
+
+    def runtime_cache_key(self, filepath, graph):
+        """Runtime verdicts depend on the module and every local module it imports."""
+        module_name = graph.module_name(filepath)
+        dependencies = graph.dependencies(module_name, include_packages=True)
+        return self.cache.dependency_key(filepath, [graph.modules[name] for name in dependencies])
 
     def verify_program_files_runtime(self):
         termcolor.cprint("\nDEBUG: Checking System Program Runtime", "red")
+        if os.path.exists(CONFIG_PATH):
+            os.remove(CONFIG_PATH)
+        graph = DependencyGraph(self.program_files)
+        pending = {}  # module name -> (filepath, section, cache key)
         for filepath in self.passed_files:
-            if os.path.exists(CONFIG_PATH):
-                os.remove(CONFIG_PATH)
             filename = os.path.basename(filepath)
             section = os.path.relpath(os.path.dirname(filepath), BASE_PATH).replace(os.sep, ".")
 
             # Convert file path to module name
             module_name = os.path.relpath(filepath, BASE_PATH).replace(os.sep, ".").replace(".py", "")
 
+            cache_key = self.runtime_cache_key(filepath, graph)
+            cached = self.cache.lookup(filepath, "runtime", cache_key)
+            if cached is not None:
+                termcolor.cprint(f"Cached runtime ({cached}): {filename}", "cyan")
+                self.set_file_status(section, filename, cached)
+                continue
             termcolor.cprint(f"Running -> {filename} as {module_name}", "yellow")
-            try:
-                result = subprocess.run(["python", "-m", module_name], capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    termcolor.cprint(f"[{datetime.now().strftime('%d-%m-%Y %H:%M:%S')}] Runtime OK: {filename}", "green")
-                    self.set_file_status(section, filename, "enabled")
-                else:
-                    termcolor.cprint(f"[{datetime.now().strftime('%d-%m-%Y %H:%M:%S')}] Runtime ERROR: {filename} | ERROR: {result.stderr}", "red")
-                    self.set_file_status(section, filename, "disabled")
-            except subprocess.TimeoutExpired:
-                termcolor.cprint(f"[{datetime.now().strftime('%d-%m-%Y %H:%M:%S')}] Timeout ERROR: {filename}", "red")
+            pending[module_name] = (filepath, section, cache_key)
+
+        checker = RuntimeChecker(timeout=RUNTIME_TIMEOUT)
+        results = checker.check_modules(list(pending))
+        for module_name, result in results.items():
+            filepath, section, cache_key = pending[module_name]
+            filename = os.path.basename(filepath)
+            timestamp = datetime.now().strftime('%d-%m-%Y %H:%M:%S')
+            elapsed = f"{result['elapsed']:.2f}s"
+            if result["status"] == "ok":
+                termcolor.cprint(f"[{timestamp}] Runtime OK: {filename} ({elapsed})", "green")
+                self.set_file_status(section, filename, "enabled")
+                self.cache.record(filepath, "runtime", "enabled", cache_key)
+            elif result["status"] == "timeout":
+                termcolor.cprint(f"[{timestamp}] Timeout ERROR: {filename} ({elapsed})", "red")
                 self.set_file_status(section, filename, "disabled")
-            except Exception as e:
-                termcolor.cprint(f"[{datetime.now().strftime('%d-%m-%Y %H:%M:%S')}] Unexpected ERROR: {e}", "red")
+            elif result["status"] == "crashed":
+                # The checker failed, not the module: disable it for now but check again next run
+                termcolor.cprint(f"[{timestamp}] Check ERROR: {filename} ({elapsed}) | ERROR: {result['detail']}", "red")
                 self.set_file_status(section, filename, "disabled")
+            else:
+                termcolor.cprint(f"[{timestamp}] Runtime ERROR: {filename} ({elapsed}) | ERROR: {result['detail']}", "red")
+                self.set_file_status(section, filename, "disabled")
+                self.cache.record(filepath, "runtime", "disabled", cache_key)
+        if results:
+            termcolor.cprint(f"Runtime checks: {len(results)} modules in {checker.total_elapsed:.2f}s", "cyan")
+        self.save_config()
+        self.save_verification_cache()
         self.certify_the_config_file()
 
+    def save_verification_cache(self):
+        """Persist the manifest and report how long this verification pass took."""
+        elapsed = time.perf_counter() - self.started
+        kind = self.cache.record_timing(elapsed)
+        self.cache.prune(self.verified_sys_files + self.program_paths)
+        try:
+            self.cache.save()
+        except OSError as e:
+            termcolor.cprint(f"⚠️ Could not save verification manifest: {e}", "yellow")
+        termcolor.cprint(
+            f"Verification finished in {elapsed:.2f}s ({kind}) | cached: {self.cache.hits} | re-verified: {self.cache.misses} "
+            f"| last cold: {self.cache.describe_timing('cold')} | last warm: {self.cache.describe_timing('warm')}",
+            "cyan",
+        )
+        return elapsed
+
     def certify_the_config_file(self):
-        with open(TEMP_CONFIG_PATH, "r") as temp:
-            data = temp.read()
-            temp.close()
-        
-        os.remove(TEMP_CONFIG_PATH)
+        """Atomically publish the verified statuses as the live config.cfg."""
+        self.store.flush(CONFIG_PATH, force=True)
+        if os.path.exists(TEMP_CONFIG_PATH):
+            os.remove(TEMP_CONFIG_PATH)
 
-        with open(CONFIG_PATH, "w") as config:
-            config.write(data)
-            config.close()
-        
 
-if __name__ == "__main__":
-    app = AuthorizeFiles()
+def run_verification(use_cache=True):
+    """Run every verification phase and return the elapsed time."""
+    app = AuthorizeFiles(use_cache=use_cache)
     app.verify_files()
     app.verify_json_files()
     app.verify_program_files_syntax()
     app.verify_program_files_runtime()
+    return time.perf_counter() - app.started
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        cold = run_verification(use_cache=False)
+        warm = run_verification(use_cache=True)
+        termcolor.cprint(f"Cold verification: {cold:.2f}s | Warm verification: {warm:.2f}s", "cyan")
+    else:
+        run_verification()
@@ -0,0 +1,145 @@
+# File: ConfigStore.py
+import configparser
+import io
+import os
+import threading
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+CONFIG_PATH = os.path.join(BASE_PATH, "SystemFiles", "config.cfg")
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_store(path=CONFIG_PATH):
+    """Return the shared ConfigStore for a config file (one instance per path per process)."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ConfigStore(path)
+        return _stores[path]
+
+
+class ConfigStore:
+    """In-memory view of a config.cfg with an O(1) filename index and batched atomic writes."""
+
+    def __init__(self, path=CONFIG_PATH, base_path=BASE_PATH):
+        self.path = path
+        self.base_path = str(base_path)
+        self.lock = threading.RLock()
+        self.config = self._new_parser()
+        self.index = {}  # lowercase filename -> (section, status, path) of its first section
+        self.dirty = False
+        self._signature = None
+        self.refresh()
+
+    def _new_parser(self):
+        config = configparser.ConfigParser()
+        config.optionxform = str  # Keep the real file name case so paths resolve on case-sensitive systems
+        return config
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def resolve_path(self, section, filename):
+        """Map a config section and file name to a path on disk."""
+        return os.path.join(self.base_path, *section.split("."), filename)
+
+    def _restore_case(self, config):
+        """Older config.cfg files hold lowercased names (configparser's default); match them to the files on disk."""
+        for section in config.sections():
+            try:
+                on_disk = {name.lower(): name for name in os.listdir(os.path.join(self.base_path, *section.split(".")))}
+            except OSError:
+                continue
+            entries = list(config[section].items())
+            if all(on_disk.get(filename.lower(), filename) == filename for filename, _ in entries):
+                continue
+            config[section].clear()
+            for filename, status in entries:
+                config[section].setdefault(on_disk.get(filename.lower(), filename), status)
+
+    def _rebuild_index(self):
+        self.index = {}
+        for section in self.config.sections():
+            for filename, status in self.config[section].items():
+                # Names like __init__.py repeat across sections; the first one wins, as a section scan would find
+                self.index.setdefault(filename.lower(), (section, status, self.resolve_path(section, filename)))
+
+    def refresh(self):
+        """Re-parse the file only if its inode or mtime changed. Returns True if it was reloaded."""
+        with self.lock:
+            signature = self._file_signature()
+            if signature is None or signature == self._signature or self.dirty:
+                return False
+            config = self._new_parser()
+            try:
+                config.read(self.path)
+            except configparser.Error:
+                return False
+            self._restore_case(config)
+            self.config = config
+            self._signature = signature
+            self._rebuild_index()
+            return True
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def lookup(self, filename):
+        """Return (section, status, path) for a file name, or None."""
+        self.refresh()
+        return self.index.get(filename.lower())
+
+    def entries(self):
+        """Snapshot of every (filename, section, status, path) entry."""
+        self.refresh()
+        with self.lock:
+            return [
+                (filename, section, status, self.resolve_path(section, filename))
+                for section in self.config.sections()
+                for filename, status in self.config[section].items()
+            ]
+
+    def set_status(self, section, filename, status):
+        """Update a file status in memory; nothing is written until flush()."""
+        with self.lock:
+            if section not in self.config:
+                self.config[section] = {}
+            if self.config[section].get(filename) != status:
+                self.config[section][filename] = status
+                self.dirty = True
+            entry = self.index.get(filename.lower())
+            if entry is None or entry[0] == section:
+                self.index[filename.lower()] = (section, status, self.resolve_path(section, filename))
+
+    def clear(self):
+        with self.lock:
+            self.config = self._new_parser()
+            self.index = {}
+            self.dirty = True
+
+    def flush(self, path=None, force=False):
+        """Write pending changes with write-to-temp-then-rename so readers never see a partial file."""
+        with self.lock:
+            target = path or self.path
+            if not (self.dirty or force or target != self.path):
+                return False
+            buffer = io.StringIO()
+            self.config.write(buffer)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp_path = f"{target}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(buffer.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, target)
+            if target == self.path:
+                self.dirty = False
+                self._signature = self._file_signature()
+            return True
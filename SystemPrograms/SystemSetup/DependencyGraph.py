@@ -0,0 +1,143 @@
+# File: DependencyGraph.py
+import ast
+import os
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+SYSTEM_PROGRAMS_PATH = os.path.join(BASE_PATH, "SystemPrograms")
+
+
+class DependencyGraph:
+    """Import graph of the local SystemPrograms modules, built by parsing import statements."""
+
+    def __init__(self, root=SYSTEM_PROGRAMS_PATH, base_path=BASE_PATH):
+        self.root = str(root)
+        self.base_path = str(base_path)
+        self.modules = {}  # module name -> file path
+        self.imports = {}  # module name -> set of local module names it imports
+        self.scan()
+
+    def module_name(self, filepath):
+        """Convert a file path to a dotted module name (packages drop __init__)."""
+        relative_path = os.path.relpath(filepath, self.base_path)
+        name = relative_path[:-3].replace(os.sep, ".")
+        if name.endswith(".__init__"):
+            name = name[: -len(".__init__")]
+        return name
+
+    def scan(self):
+        """Walk the program tree once and parse the imports of every module."""
+        self.modules = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    filepath = os.path.join(dirpath, filename)
+                    self.modules[self.module_name(filepath)] = filepath
+        self.imports = {name: self.parse_imports(name) for name in self.modules}
+
+    def update(self, filepath):
+        """Re-parse a single file after it was created, edited or deleted."""
+        name = self.module_name(filepath)
+        if os.path.exists(filepath):
+            self.modules[name] = filepath
+            self.imports[name] = self.parse_imports(name)
+        else:
+            self.modules.pop(name, None)
+            self.imports.pop(name, None)
+        return name
+
+    def parse_imports(self, module_name):
+        """Return the local modules whose names a module binds through its imports."""
+        filepath = self.modules.get(module_name)
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=filepath)
+        except (OSError, SyntaxError, ValueError, TypeError):
+            return set()
+
+        if filepath.endswith("__init__.py"):
+            package = module_name
+        else:
+            package = module_name.rpartition(".")[0]
+
+        found = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    found.add(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parts = package.split(".")
+                    if node.level > 1:
+                        parts = parts[: len(parts) - (node.level - 1)]
+                    base = ".".join(parts + ([node.module] if node.module else []))
+                found.add(base)
+                for alias in node.names:
+                    found.add(f"{base}.{alias.name}")
+
+        found.discard(module_name)
+        return {name for name in found if name in self.modules}
+
+    def parent_packages(self, module_name):
+        """Packages Python imports before the module itself."""
+        parts = module_name.split(".")
+        return [".".join(parts[:i]) for i in range(1, len(parts)) if ".".join(parts[:i]) in self.modules]
+
+    def dependencies(self, module_name, include_packages=False):
+        """Return every local module the given module transitively depends on."""
+        seen = set()
+        stack = list(self.imports.get(module_name, ()))
+        if include_packages:
+            stack.extend(self.parent_packages(module_name))
+        while stack:
+            name = stack.pop()
+            if name in seen or name == module_name:
+                continue
+            seen.add(name)
+            stack.extend(self.imports.get(name, ()))
+            if include_packages:
+                stack.extend(self.parent_packages(name))
+        return seen
+
+    def dependents(self, module_name):
+        """Return every module that transitively imports the given module."""
+        reverse = {}
+        for name, imported in self.imports.items():
+            for dependency in imported:
+                reverse.setdefault(dependency, set()).add(name)
+
+        seen = set()
+        stack = list(reverse.get(module_name, ()))
+        while stack:
+            name = stack.pop()
+            if name in seen or name == module_name:
+                continue
+            seen.add(name)
+            stack.extend(reverse.get(name, ()))
+        return seen
+
+    def reload_order(self, *module_names):
+        """The changed modules followed by their reverse dependents, each after the modules it imports."""
+        affected = set(module_names)
+        for module_name in module_names:
+            affected |= self.dependents(module_name)
+        remaining = {name: self.imports.get(name, set()) & affected for name in affected}
+        order = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:  # Import cycle: fall back to name order for the rest
+                ready = sorted(remaining)
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+
+if __name__ == "__main__":
+    graph = DependencyGraph()
+    for module_name in sorted(graph.modules):
+        print(f"{module_name} -> {sorted(graph.imports[module_name])}")
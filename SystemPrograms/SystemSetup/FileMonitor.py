@@ -3,58 +3,85 @@ import time
 import termcolor
 import importlib
 import sys
-import configparser
 from pathlib import Path
 
 # Import AuthorizeFiles as a module
 try:
     from SystemPrograms.SystemSetup import AuthorizeFiles
+    from SystemPrograms.SystemSetup.ConfigStore import get_config_store
+    from SystemPrograms.SystemSetup.DependencyGraph import DependencyGraph
+    from SystemPrograms.SystemSetup.FileWatcher import InotifyWatcher
 except ModuleNotFoundError:
     termcolor.cprint("❌ ERROR: Could not import AuthorizeFiles module!", "red")
     sys.exit(1)
 
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 CONFIG_PATH = os.path.join(BASE_PATH, "SystemFiles", "config.cfg")
+SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
+SYSTEM_PROGRAMS_PATH = os.path.join(BASE_PATH, "SystemPrograms")
 
 
 class FileMonitor:
     def __init__(self):
-        self.config = configparser.ConfigParser()
+        self.store = get_config_store(CONFIG_PATH)
         self.monitored_modules = {}
+        self.file_index = {}  # lowercase filename -> path in SystemPrograms
+        self.running = True
+        self.graph = DependencyGraph(SYSTEM_PROGRAMS_PATH)
         self.load_config()
+        self.build_file_index()
 
     def load_config(self):
-        """Load file status from config.cfg."""
-        if os.path.exists(CONFIG_PATH):
-            self.config.read(CONFIG_PATH)
+        """Load file status from config.cfg (re-parsed only when the file changed)."""
+        if self.store.exists():
+            self.store.refresh()
         else:
             termcolor.cprint("⚠️ WARNING: config.cfg not found!", "yellow")
 
     def get_enabled_modules(self):
         """Extract enabled module paths and convert them to importable module names."""
         enabled_modules = {}
-        if "SystemFiles" in self.config:
-            for filename, status in self.config["SystemFiles"].items():
-                if status == "enabled":
-                    file_path = self.find_file_path(filename)
-                    module_name = self.get_module_name(file_path)
-                    if module_name:
-                        enabled_modules[module_name] = file_path
+        for filename, section, status, file_path in self.store.entries():
+            if status == "enabled" and section.startswith("SystemPrograms"):
+                module_name = self.get_module_name(file_path)
+                if module_name:
+                    enabled_modules[module_name] = file_path
         return enabled_modules
 
+    def build_file_index(self):
+        """Walk SystemPrograms once; afterwards the index is kept current from file events."""
+        self.file_index = {}
+        for root, dirs, files in os.walk(SYSTEM_PROGRAMS_PATH):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            for filename in files:
+                self.file_index[filename.lower()] = os.path.join(root, filename)
+
+    def update_file_index(self, path, kind):
+        """Apply a single created/deleted event to the filename index."""
+        key = os.path.basename(path).lower()
+        if kind == "deleted":
+            if self.file_index.get(key) == path:
+                del self.file_index[key]
+        else:
+            self.file_index[key] = path
+
     def find_file_path(self, filename):
         """Find the full path of a file in SystemPrograms."""
-        for root, _, files in os.walk(os.path.join(BASE_PATH, "SystemPrograms")):
-            if filename in files:
-                return os.path.join(root, filename)
-        return None
+        path = self.file_index.get(filename.lower())
+        if path is None or not os.path.exists(path):
+            self.build_file_index()  # Index went stale (e.g. polling mode without events)
+            path = self.file_index.get(filename.lower())
+        return path
 
     def get_module_name(self, filepath):
         """Convert a file path to a Python module name."""
         if not filepath or not filepath.endswith(".py"):
             return None
         relative_path = os.path.relpath(filepath, BASE_PATH).replace(os.sep, ".")
-        return relative_path[:-3]  # Remove .py extension
+        module_name = relative_path[:-3]  # Remove .py extension
+        if module_name.endswith(".__init__"):
+            module_name = module_name[: -len(".__init__")]  # Packages import by their own name
+        return module_name
 
     def import_or_reload_module(self, module_name):
         """Import or reload a module dynamically."""
@@ -74,6 +101,37 @@ class FileMonitor:
             termcolor.cprint(f"❌ ERROR importing {module_name}: {e}", "red")
             self.monitored_modules[module_name] = False
 
+    def get_disabled_modules(self):
+        """Module names of the files config.cfg marks as anything but enabled."""
+        return {
+            self.get_module_name(file_path) for filename, section, status, file_path in self.store.entries()
+            if status != "enabled" and section.startswith("SystemPrograms")
+        }
+
+    def reload_affected(self, module_names):
+        """
+        Reload the changed modules and, in one dependency order, the loaded modules that import them.
+        Shared dependents reload once per batch; disabled modules are left alone.
+        """
+        started = time.perf_counter()
+        disabled = self.get_disabled_modules()
+        order = [name for name in self.graph.reload_order(*module_names) if name in sys.modules and name not in disabled]
+        broken = set()
+        reloaded = []
+        for name in order:
+            if self.graph.imports.get(name, set()) & broken:
+                broken.add(name)  # It would only re-bind to a broken module
+                continue
+            self.import_or_reload_module(name)
+            if self.monitored_modules.get(name):
+                reloaded.append(name)
+            else:
+                broken.add(name)
+        elapsed = (time.perf_counter() - started) * 1000
+        termcolor.cprint(f"🔄 Reloaded {len(reloaded)} module(s) for {', '.join(module_names)} in {elapsed:.1f} ms: "
+                         f"{', '.join(reloaded)}", "cyan")
+        return reloaded
+
     def unload_module(self, module_name):
         """Unload a module from sys.modules."""
         if module_name in sys.modules:
@@ -92,26 +150,83 @@ class FileMonitor:
         self.load_config()  # Reload updated statuses
         termcolor.cprint("✅ AuthorizeFiles completed!", "green")
 
-    def start_monitoring(self):
-        """Start monitoring enabled modules."""
-        termcolor.cprint("📡 FileMonitor started...", "green")
+    def sync_modules(self):
+        """Import newly enabled modules and unload the ones that are no longer enabled."""
+        enabled_modules = self.get_enabled_modules()
+
+        for module_name, path in enabled_modules.items():
+            if module_name not in self.monitored_modules or not self.monitored_modules[module_name]:
+                self.import_or_reload_module(module_name)
+
+        for module_name in list(self.monitored_modules.keys()):
+            if module_name not in enabled_modules:
+                self.unload_module(module_name)
+
+    def handle_changes(self, changes, first_event_time):
+        """React to one debounced batch of file events."""
+        config_changed = False
+        changed_modules = []
+        for path, kind in changes.items():
+            if path is None:  # Event queue overflowed, fall back to a full rescan
+                self.build_file_index()
+                self.graph.scan()
+                config_changed = True
+                continue
+            if path == CONFIG_PATH:
+                config_changed = True
+            elif path.startswith(SYSTEM_PROGRAMS_PATH):
+                self.update_file_index(path, kind)
+                if not path.endswith(".py"):
+                    continue
+                module_name = self.graph.update(path)
+                if kind != "deleted" and module_name in sys.modules:
+                    changed_modules.append(module_name)
+
+        if config_changed:
+            self.load_config()
+        if changed_modules:
+            self.reload_affected(changed_modules)
+        if config_changed:
+            self.sync_modules()
+        latency = (time.perf_counter() - first_event_time) * 1000
+        termcolor.cprint(f"📡 Handled {len(changes)} file event(s) in {latency:.1f} ms", "cyan")
+
+    def start_watching(self, debounce=0.05):
+        """Event-driven monitoring using inotify; falls back to polling if inotify cannot be set up (e.g. EMFILE)."""
         try:
-            while True:
-                self.load_config()
-                enabled_modules = self.get_enabled_modules()
-
-                for module_name, path in enabled_modules.items():
-                    if module_name not in self.monitored_modules or not self.monitored_modules[module_name]:
-                        self.import_or_reload_module(module_name)
-
-                for module_name in list(self.monitored_modules.keys()):
-                    if module_name not in enabled_modules:
-                        self.unload_module(module_name)
+            watcher = InotifyWatcher([(SYSTEM_PROGRAMS_PATH, True), (SYSTEM_FILES_PATH, False)], debounce=debounce)
+        except OSError as e:
+            termcolor.cprint(f"⚠️ inotify unavailable ({e}), polling instead", "yellow")
+            return self.start_polling()
+        termcolor.cprint("📡 FileMonitor started (inotify)...", "green")
+        try:
+            self.load_config()
+            self.sync_modules()
+            watcher.run(self.handle_changes, lambda: not self.running)
+        finally:
+            watcher.close()
+
+    def start_polling(self, interval=5):
+        """Polling fallback for platforms without inotify."""
+        termcolor.cprint("📡 FileMonitor started...", "green")
+        while self.running:
+            self.load_config()
+            self.sync_modules()
+            time.sleep(interval)  # Check every 5 seconds
 
-                time.sleep(5)  # Check every 5 seconds
+    def start_monitoring(self, mode="auto"):
+        """Start monitoring enabled modules ("auto", "inotify" or "poll")."""
+        try:
+            if mode != "poll" and InotifyWatcher.available():
+                self.start_watching()
+            else:
+                self.start_polling()
         except KeyboardInterrupt:
             termcolor.cprint("\n🛑 FileMonitor stopped by user.", "cyan")
 
+    def stop_monitoring(self):
+        self.running = False
+
 
 if __name__ == "__main__":
     monitor = FileMonitor()
@@ -0,0 +1,151 @@
+# File: FileWatcher.py
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+import termcolor
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+IGNORED_DIRS = {"__pycache__", ".git"}
+IGNORED_SUFFIXES = (".pyc", ".swp", ".swx", "~", ".tmp")
+
+
+class InotifyWatcher:
+    """Linux inotify watcher that reports debounced batches of {path: "created" | "modified" | "deleted"}."""
+
+    def __init__(self, paths, debounce=0.05, max_delay=1.0):
+        self.debounce = debounce  # Quiet time that ends a burst of events
+        self.max_delay = max_delay  # Upper bound on how long a busy burst is held back
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # wd -> (directory, recursive)
+        self.failed_watches = {}  # directory -> errno; changes there are missed
+        self.overflowed = False
+        for path, recursive in paths:
+            self.add_watch(path, recursive)
+
+    @staticmethod
+    def available():
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            return hasattr(libc, "inotify_init1")
+        except OSError:
+            return False
+
+    def add_watch(self, directory, recursive=True, found=None):
+        """Watch a directory (and, if recursive, every sub-directory). Files seen on the way are added to `found`."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error != errno.ENOENT:  # Removed before we got to it: nothing to miss
+                self.failed_watches[directory] = error
+                hint = " (raise fs.inotify.max_user_watches)" if error == errno.ENOSPC else ""
+                termcolor.cprint(f"⚠️ Not watching {directory}: {os.strerror(error)}{hint}", "yellow")
+            return
+        self.watches[wd] = (directory, recursive)
+        if recursive:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                return  # Removed meanwhile; its IN_IGNORED event drops the watch
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        self.add_watch(entry.path, True, found)
+                elif found is not None and not entry.name.endswith(IGNORED_SUFFIXES):
+                    found.append(entry.path)
+
+    def read_events(self, timeout):
+        """Wait up to `timeout` seconds and return the raw (path, kind) events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory, recursive = self.watches.get(wd, (None, False))
+            if directory is None or not name or name in IGNORED_DIRS or name.endswith(IGNORED_SUFFIXES):
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files copied or moved in before the watch existed produce no events of their own
+                    found = []
+                    self.add_watch(path, True, found)
+                    events.extend((file_path, "created") for file_path in found)
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, "deleted"))
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                events.append((path, "created"))
+            else:
+                events.append((path, "modified"))
+        return events
+
+    def run(self, callback, should_stop=lambda: False):
+        """Block, calling callback(changes, first_event_time) once per debounced burst."""
+        pending = {}
+        first_event = deadline = None
+        while not should_stop():
+            timeout = 0.5 if deadline is None else max(0.0, deadline - time.perf_counter())
+            events = self.read_events(timeout)
+            now = time.perf_counter()
+            for path, kind in events:
+                if pending.get(path) == "created" and kind == "modified":
+                    continue  # A new file being written is still a creation
+                pending[path] = kind
+            if events or (self.overflowed and deadline is None):
+                first_event = first_event or now
+                deadline = min(now + self.debounce, first_event + self.max_delay)
+            if (pending or self.overflowed) and deadline is not None and now >= deadline:
+                changes, pending = pending, {}
+                if self.overflowed:
+                    changes[None] = "overflow"  # Events were lost; the receiver should rescan
+                    self.overflowed = False
+                started, first_event, deadline = first_event, None, None
+                callback(changes, started)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -1,8 +1,9 @@
 # File: ReadConfigs.py
-import configparser
 import os
 from pathlib import Path
 
+from SystemPrograms.SystemSetup.ConfigStore import get_config_store
+
 class ReadConfigs:
     def __init__(self):
         self.BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
@@ -12,15 +13,20 @@ class ReadConfigs:
         if not os.path.exists(self.CONFIG_PATH):
             with open(self.CONFIG_PATH, "w") as f:
                 f.write("")  # Create an empty config file
+        self.store = get_config_store(self.CONFIG_PATH)
 
     def load_config(self):
-        """Loads configuration from config.cfg"""
-        config = configparser.ConfigParser()
-        config.read(self.CONFIG_PATH)
-        return config
+        """Loads configuration from config.cfg (shared, re-parsed only when the file changed)"""
+        self.store.refresh()
+        return self.store.config
 
     def get_file_path(self, config, file_name):
         """Finds the file path based on config sections"""
+        if config is self.store.config:
+            entry = self.store.lookup(file_name)
+            if entry and entry[1].lower() in {"enabled", "not implemented", "disabled"}:
+                return entry[2]
+            return None
         for section in config.sections():
             if file_name in config[section]:
                 # Get the status (enabled/disabled/etc.)
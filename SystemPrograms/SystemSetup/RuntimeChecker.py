@@ -0,0 +1,155 @@
+# File: RuntimeChecker.py
+import io
+import multiprocessing
+import os
+import runpy
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import types
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+
+# Heavy third-party modules shared by the SystemPrograms; the fork-server imports them once
+PRELOAD_MODULES = ["cv2", "face_recognition", "requests", "pydub", "speedtest", "psutil", "termcolor"]
+
+_start_lock = threading.Lock()
+
+
+def _run_module_check(module_name, base_path, conn):
+    """Child entry point: run a module as __main__, the same way `python -m` would."""
+    os.chdir(base_path)
+    if base_path not in sys.path:
+        sys.path.insert(0, base_path)
+    output = io.StringIO()
+    ok, detail = True, ""
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            runpy.run_module(module_name, run_name="__main__", alter_sys=True)
+            # The interpreter waits for non-daemon threads before exiting, so a module is only done once they are
+            for thread in threading.enumerate():
+                if thread is not threading.current_thread() and not thread.daemon:
+                    thread.join()
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+        detail = "" if ok else f"SystemExit({e.code}) {output.getvalue()}"
+    except BaseException:
+        ok = False
+        detail = f"{output.getvalue()}{traceback.format_exc()}"
+    try:
+        conn.send((ok, detail))
+    finally:
+        conn.close()
+
+
+def _start_without_main(process):
+    """
+    Starts a fork-server child without the parent's __main__. Children normally re-import it as __mp_main__,
+    which would re-run an unguarded script such as main.py.
+    """
+    with _start_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")  # No __file__ or __spec__: nothing to re-import
+        try:
+            process.start()
+        finally:
+            sys.modules["__main__"] = main
+
+
+class RuntimeChecker:
+    """
+    Runs module runtime checks concurrently, each in its own process forked from a pre-warmed server.
+
+    A check behaves like `python -m module` with stdin at end of file, except that the preloaded modules
+    are already imported. Statuses: "ok", "error" (the module raised or exited non-zero), "timeout", and
+    "crashed" (the check itself failed or the process was killed by a signal, so there is no verdict).
+    """
+
+    def __init__(self, timeout=10, max_workers=None, preload=PRELOAD_MODULES, base_path=BASE_PATH):
+        self.timeout = timeout
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.base_path = str(base_path)
+        self.total_elapsed = 0.0
+        self.context = None
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context("forkserver")
+            # Missing modules are ignored by the fork-server, so optional deps are safe to list
+            self.context.set_forkserver_preload(list(preload))
+
+    def check_modules(self, module_names):
+        """Check every module and return {module_name: result} with per-module wall-clock."""
+        started = time.perf_counter()
+        check = self._check_forked if self.context else self._check_subprocess
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = dict(zip(module_names, pool.map(check, module_names)))
+        self.total_elapsed = time.perf_counter() - started
+        return results
+
+    def _result(self, status, detail, started):
+        return {"status": status, "detail": detail, "elapsed": time.perf_counter() - started}
+
+    def _check_forked(self, module_name):
+        started = time.perf_counter()
+        parent_conn, child_conn = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=_run_module_check, args=(module_name, self.base_path, child_conn))
+        try:
+            _start_without_main(process)
+        except Exception as e:
+            return self._result("crashed", f"Could not start check: {e}", started)
+        child_conn.close()
+
+        try:
+            if not parent_conn.poll(self.timeout):
+                process.terminate()
+                return self._result("timeout", "", started)
+            try:
+                ok, detail = parent_conn.recv()
+            except EOFError:
+                # The child exited without reporting (e.g. os._exit or a crash), so judge it by exit code
+                process.join(self.timeout)
+                if process.exitcode == 0:
+                    return self._result("ok", "", started)
+                if process.exitcode is None:
+                    return self._result("crashed", "Process closed its pipe but did not exit", started)
+                if process.exitcode < 0:
+                    return self._result("crashed", f"Process killed by signal {-process.exitcode}", started)
+                return self._result("error", f"Process exited with code {process.exitcode}", started)
+            return self._result("ok" if ok else "error", detail, started)
+        finally:
+            parent_conn.close()
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def _check_subprocess(self, module_name):
+        """Fallback for platforms without fork-server support (e.g. Windows)."""
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(
+                ["python", "-m", module_name], capture_output=True, text=True, timeout=self.timeout, cwd=self.base_path,
+                stdin=subprocess.DEVNULL,  # Same as the forked checks: input() sees end of file instead of waiting
+            )
+        except subprocess.TimeoutExpired:
+            return self._result("timeout", "", started)
+        except Exception as e:
+            return self._result("crashed", str(e), started)
+        if result.returncode == 0:
+            return self._result("ok", "", started)
+        if result.returncode < 0:
+            return self._result("crashed", f"Process killed by signal {-result.returncode}", started)
+        return self._result("error", result.stderr, started)
+
+
+if __name__ == "__main__":
+    modules = sys.argv[1:]
+    if modules:
+        checker = RuntimeChecker()
+        for module_name, result in checker.check_modules(modules).items():
+            print(f"{module_name}: {result['status']} ({result['elapsed']:.2f}s)")
+        print(f"Total: {checker.total_elapsed:.2f}s")
@@ -0,0 +1,133 @@
+# File: VerificationCache.py
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+MANIFEST_PATH = os.path.join(BASE_PATH, "SystemFiles", "temp", "verify_manifest.json")
+MANIFEST_VERSION = 1
+
+
+class VerificationCache:
+    """Persistent manifest of (path, size, mtime, content hash, last verdict) for AuthorizeFiles."""
+
+    def __init__(self, path=MANIFEST_PATH, base_path=BASE_PATH):
+        self.path = path
+        self.base_path = str(base_path)
+        self.entries = {}
+        self.timings = {}
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}  # Hashes computed during this run
+        self.load()
+
+    def environment_key(self):
+        """Verdicts are only valid for the interpreter that produced them."""
+        return f"{sys.executable}|{sys.version}"
+
+    def load(self):
+        """Load the manifest, discarding it if it was written by another format or interpreter."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return
+        if data.get("version") != MANIFEST_VERSION or data.get("environment") != self.environment_key():
+            return
+        self.entries = data.get("files", {})
+        self.timings = data.get("timings", {})
+
+    def save(self):
+        """Write the manifest to a temp file and rename it into place."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "environment": self.environment_key(),
+            "timings": self.timings,
+            "files": self.entries,
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Forget every cached verdict (forces a cold verification)."""
+        self.entries = {}
+        self._hashes = {}
+
+    def _key(self, filepath):
+        return os.path.relpath(filepath, self.base_path)
+
+    def file_hash(self, filepath):
+        """Content hash of a file; unchanged size and mtime reuse the stored hash."""
+        key = self._key(filepath)
+        if key in self._hashes:
+            return self._hashes[key]
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        entry = self.entries.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            digest = entry["hash"]
+        else:
+            sha = hashlib.sha256()
+            with open(filepath, "rb") as f:
+                for block in iter(lambda: f.read(65536), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            verdicts = entry.get("verdicts", {}) if entry and entry.get("hash") == digest else {}
+            self.entries[key] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest, "verdicts": verdicts}
+
+        self._hashes[key] = digest
+        return digest
+
+    def dependency_key(self, filepath, dependencies):
+        """Hash of a file together with every file it depends on."""
+        sha = hashlib.sha256()
+        for path in [filepath] + sorted(dependencies):
+            sha.update(self._key(path).encode())
+            sha.update((self.file_hash(path) or "missing").encode())
+        return sha.hexdigest()
+
+    def lookup(self, filepath, check, key=None):
+        """Return the cached verdict for a check, or None if the file must be re-verified."""
+        key = key or self.file_hash(filepath)
+        entry = self.entries.get(self._key(filepath))
+        cached = entry.get("verdicts", {}).get(check) if entry else None
+        if cached and key and cached.get("key") == key:
+            self.hits += 1
+            return cached.get("verdict")
+        self.misses += 1
+        return None
+
+    def record(self, filepath, check, verdict, key=None):
+        """Store the verdict of a check against the current content (or dependency) hash."""
+        key = key or self.file_hash(filepath)
+        entry = self.entries.get(self._key(filepath))
+        if entry is None or key is None:
+            return
+        entry.setdefault("verdicts", {})[check] = {"key": key, "verdict": verdict}
+
+    def prune(self, existing_paths):
+        """Drop manifest entries for files that no longer exist."""
+        keep = {self._key(path) for path in existing_paths}
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+
+    def record_timing(self, elapsed):
+        """Remember the last cold (nothing cached), warm (everything cached) and partial verification times."""
+        kind = "cold" if not self.hits else "warm" if not self.misses else "partial"
+        self.timings[kind] = {"seconds": round(elapsed, 3), "hits": self.hits, "misses": self.misses}
+        return kind
+
+    def describe_timing(self, kind):
+        timing = self.timings.get(kind)
+        if not isinstance(timing, dict):  # Manifests from before hit counts were recorded
+            return "n/a"
+        return f"{timing['seconds']}s ({timing['hits']} cached, {timing['misses']} re-verified)"
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import math
+import os
+import queue
+import tempfile
+import threading
+import time
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with BPE tokenizers
+MESSAGE_OVERHEAD = 4  # Role and separator tokens added per message
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate; no tokenizer download needed."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def message_tokens(message):
+    content = message.get("content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    return MESSAGE_OVERHEAD + estimate_tokens(content)
+
+
+class ContextBuilder:
+    """
+    Builds the message list for a request within a token budget, summarizing older turns. Model summaries
+    are generated by a background thread and saved to `summary_file`; until one is ready the block is
+    sent as a local extract, so building a request never waits on the model.
+    """
+
+    def __init__(self, token_budget=8000, reserve_tokens=1024, keep_recent=6, block_size=20, summarizer=None, summary_file=None):
+        self.token_budget = token_budget
+        self.reserve_tokens = reserve_tokens  # Left free for the model's reply
+        self.keep_recent = keep_recent  # Newest messages that are always sent verbatim
+        self.block_size = block_size  # Older history is summarized in fixed blocks so summaries stay cacheable
+        self.summarizer = summarizer  # callable(messages) -> summary text or None
+        self.summary_file = summary_file
+        self.max_cached_summaries = 256
+        self.summaries = self.load_summaries()  # block hash -> summary
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.pending_keys = set()
+        self.worker = None
+        self.last_stats = {}
+
+    def _block_key(self, messages):
+        return hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+
+    def load_summaries(self):
+        if not self.summary_file:
+            return {}
+        try:
+            with open(self.summary_file, "r", encoding="utf-8") as file:
+                summaries = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return summaries if isinstance(summaries, dict) else {}
+
+    def save_summaries(self):
+        """Rewrites the summary file (temp file + rename) so a crash never leaves it half written."""
+        if not self.summary_file:
+            return
+        with self.lock:
+            data = json.dumps(self.summaries, ensure_ascii=False)
+        directory = os.path.dirname(self.summary_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(data)
+            os.replace(temp_path, self.summary_file)
+        except OSError as e:
+            print(f"Could not save summaries: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def local_summary(self, messages, limit=120):
+        """Extractive fallback used when no summarizer is available or it fails."""
+        lines = []
+        for message in messages:
+            content = message.get("content", "")
+            if isinstance(content, str) and content:
+                text = " ".join(content.split())
+                lines.append(f"{message.get('role', 'user')}: {text[:limit]}{'...' if len(text) > limit else ''}")
+        return " | ".join(lines)
+
+    def summarize(self, messages):
+        if len(messages) < self.block_size:
+            return self.local_summary(messages)  # Partial blocks change every turn; not worth a model call
+        key = self._block_key(messages)
+        with self.lock:
+            summary = self.summaries.get(key)
+            if summary is None and self.summarizer and key not in self.pending_keys:
+                self.pending_keys.add(key)
+                self.pending.put((key, list(messages)))
+                if self.worker is None:
+                    self.worker = threading.Thread(target=self._summarize_loop, daemon=True)
+                    self.worker.start()
+        return summary or self.local_summary(messages)
+
+    def _summarize_loop(self):
+        while True:
+            key, messages = self.pending.get()
+            summary = None
+            try:
+                summary = self.summarizer(messages)
+            except Exception as e:
+                print(f"Summarization failed: {e}")
+            with self.lock:
+                self.pending_keys.discard(key)  # A failed block is retried the next time it is needed
+                if summary:
+                    self.summaries[key] = summary  # Only model summaries are cached; the fallback is cheap
+                    if len(self.summaries) > self.max_cached_summaries:
+                        del self.summaries[next(iter(self.summaries))]
+            if summary:
+                self.save_summaries()
+
+    def wait_for_summaries(self):
+        """Blocks until every queued summary has been attempted (for tests and benchmarks)."""
+        while True:
+            with self.lock:
+                if not self.pending_keys:
+                    return
+            time.sleep(0.01)
+
+    def build(self, memory, ephemeral=()):
+        """
+        Returns the messages to send. `memory` is the persistent history (persona prompt first, new user
+        turn last); `ephemeral` system facts are placed just before the new user turn and never stored.
+        """
+        budget = self.token_budget - self.reserve_tokens
+        head = list(memory[:1]) if memory and memory[0].get("role") == "system" else []
+        body = list(memory[len(head):])
+        ephemeral = list(ephemeral)
+        used = sum(message_tokens(m) for m in head + ephemeral)
+
+        # Newest messages first, as many as fit (but never fewer than keep_recent)
+        cut = len(body)
+        while cut > 0:
+            cost = message_tokens(body[cut - 1])
+            if used + cost > budget and len(body) - cut >= self.keep_recent:
+                break
+            used += cost
+            cut -= 1
+
+        # Move the cut forward to a block boundary so older blocks are stable across turns
+        if cut > 0:
+            aligned = math.ceil(cut / self.block_size) * self.block_size
+            if len(body) - aligned >= self.keep_recent:
+                used -= sum(message_tokens(m) for m in body[cut:aligned])
+                cut = aligned
+
+        # Summaries of older blocks, newest first, while they fit
+        summaries = []
+        for start in reversed(range(0, cut, self.block_size)):
+            summary = self.summarize(body[start:min(start + self.block_size, cut)])
+            cost = MESSAGE_OVERHEAD + estimate_tokens(summary)
+            if used + cost > budget:
+                break
+            used += cost
+            summaries.insert(0, summary)
+
+        messages = head
+        if summaries:
+            messages = messages + [{"role": "system", "content": "Summary of the earlier conversation: " + " ".join(summaries)}]
+        recent = body[cut:]
+        messages = messages + recent[:-1] + ephemeral + recent[-1:]
+
+        self.last_stats = {"tokens": used, "messages": len(messages), "summarized": cut, "summaries": len(summaries)}
+        return messages
@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_LOG_FILE = "SystemFiles/Memory/memory.jsonl"
+LEGACY_MEMORY_FILE = "SystemFiles/Memory/memory.json"
+
+
+class ConversationLog:
+    """Append-only JSONL conversation store: one record per message, compacted periodically."""
+
+    def __init__(self, path=DEFAULT_LOG_FILE, legacy_path=LEGACY_MEMORY_FILE, fsync="always",
+                 keep_messages=2000, compact_every=1000, align=1):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.fsync = fsync  # "always" fsyncs every append, "never" leaves flushing to the OS
+        self.keep_messages = keep_messages  # Messages kept by compaction (plus the leading system prompt)
+        self.compact_every = compact_every  # Appended records that trigger a compaction
+        self.align = align  # Compaction drops a multiple of this many messages, keeping summary blocks intact
+        self.record_count = 0
+        self.appended_since_compact = 0
+        self.lock = threading.Lock()
+
+    def migrate_legacy(self):
+        """One-time import of the old memory.json; skipped once the log exists."""
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return False
+        try:
+            with open(self.legacy_path, "r") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return False
+        messages = data.get("messages", [])
+        last_interaction = data.get("last_interaction")
+        self._rewrite([dict(message, time=last_interaction) for message in messages])
+        print(f"Migrated {len(messages)} messages from {self.legacy_path} to {self.path}")
+        return True
+
+    def load(self):
+        """
+        Returns (messages, last_interaction). A torn final record from a crash is discarded; damaged
+        records elsewhere are moved to `<log>.corrupt` so one bad line never hides the rest.
+        """
+        self.migrate_legacy()
+        messages, last_interaction = [], None
+        good_lines, bad_lines = [], []
+        good_offset = 0
+        try:
+            with open(self.path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break  # Only the last line can lack its newline: a torn append
+                    good_offset += len(line)
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError("not a message record")
+                    except ValueError:
+                        bad_lines.append(line)
+                        continue
+                    good_lines.append(line)
+                    last_interaction = record.pop("time", None) or last_interaction
+                    messages.append(record)
+        except FileNotFoundError:
+            return [], None
+
+        if bad_lines:
+            with self.lock:
+                with open(self.path + ".corrupt", "ab") as file:
+                    file.writelines(bad_lines)
+                self._rewrite_lines(good_lines)
+            print(f"Moved {len(bad_lines)} damaged record(s) from {self.path} to {self.path}.corrupt")
+        elif good_offset < os.path.getsize(self.path):
+            with open(self.path, "r+b") as file:
+                file.truncate(good_offset)
+            print(f"Discarded a partial record at the end of {self.path}")
+        self.record_count = len(messages)
+        return messages, last_interaction
+
+    def append(self, messages, timestamp=None):
+        """Appends one record per message in a single write."""
+        if not messages:
+            return
+        data = "".join(json.dumps(dict(message, time=timestamp), ensure_ascii=False) + "\n" for message in messages)
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(data)
+                file.flush()
+                if self.fsync == "always":
+                    os.fsync(file.fileno())
+            self.record_count += len(messages)
+            self.appended_since_compact += len(messages)
+
+    def should_compact(self):
+        return self.appended_since_compact >= self.compact_every and self.record_count > self.keep_messages
+
+    def compact(self, messages, timestamp=None):
+        """Rewrites the log with the system prompt and the most recent messages (temp file + rename)."""
+        kept = list(messages)
+        head = []
+        if kept and kept[0].get("role") == "system":
+            head, kept = kept[:1], kept[1:]
+        dropped = max(0, len(kept) - self.keep_messages)
+        dropped = -(-dropped // self.align) * self.align
+        kept = head + kept[dropped:]
+        with self.lock:
+            self._rewrite([dict(message, time=timestamp) for message in kept])
+            self.record_count = len(kept)
+            self.appended_since_compact = 0
+        return kept
+
+    def summary_path(self):
+        """Where the context builder keeps the block summaries of this conversation."""
+        return os.path.splitext(self.path)[0] + ".summaries.json"
+
+    def _rewrite(self, records):
+        self._rewrite_lines((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records)
+
+    def _rewrite_lines(self, lines):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.writelines(lines)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def benchmark_load(sizes=(10_000, 100_000, 1_000_000)):
+    """Times loading logs of increasing size from a temporary directory."""
+    message = {"role": "user", "content": "Hello Toa-chan, what are you curious about today?"}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            log = ConversationLog(os.path.join(directory, f"bench_{size}.jsonl"), legacy_path=None, fsync="never")
+            line = json.dumps(dict(message, time="2025-01-01 00:00:00")) + "\n"
+            with open(log.path, "w") as file:
+                file.write(line * size)
+            started = time.perf_counter()
+            messages, _ = log.load()
+            elapsed = time.perf_counter() - started
+            print(f"{size:>9} messages: load {elapsed:.3f}s ({elapsed / size * 1e6:.2f} us/message)")
+            assert len(messages) == size
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_load()
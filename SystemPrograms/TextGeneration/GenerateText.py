@@ -1,21 +1,28 @@
-import requests
+import asyncio
 import json
 import re
 import os
 import time
 from datetime import datetime
 from SystemPrograms.SystemSetup.ReadConfigs import ReadConfigs
+from SystemPrograms.NetworkClient.HTTPClient import get_shared_client
+from SystemPrograms.NetworkClient.AsyncHTTPClient import get_shared_async_client
+from SystemPrograms.TextGeneration.ConversationLog import ConversationLog, DEFAULT_LOG_FILE
+from SystemPrograms.TextGeneration.ContextBuilder import ContextBuilder
+from SystemPrograms.TextGeneration.ResponseCache import ResponseCache
 
-# WiFi Check Integration
-from SystemPrograms.CheckInternet.ManageWIFI import CheckWIFI
-manageWiFi = CheckWIFI()
-wifi_connected = manageWiFi.get_wifi_status()
+# Connectivity is probed in the background; checks read a cached flag
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+connectivity = get_connectivity_monitor()
 
 from pathlib import Path
 
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
 FILE_TO_FIND = os.path.join(SYSTEM_FILES_PATH, "tokens.json")
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+MODEL_NAME = "google/gemma-3-27b-it:free"
+NO_REPLY = "(no reply)"  # Stands in for a reply that never arrived, so user turns are never left unanswered
 
 def load_api_key():
     try:
@@ -26,30 +33,40 @@ def load_api_key():
         return None
 
 class BaseAI:
-    def __init__(self, memory_file="SystemFiles/Memory/memory.json"):
+    def __init__(self, memory_file="SystemFiles/Memory/memory.json", api_url=OPENROUTER_URL, log_file=DEFAULT_LOG_FILE, fsync="always", token_budget=8000, use_response_cache=False):
         self.api_key = load_api_key()
         if not self.api_key:
             raise ValueError("API key not found in tokens.json")
-        self.memory_file = memory_file
+        self.api_url = api_url
+        connectivity.add_endpoint(api_url)
+        self.http = get_shared_client()
+        self.ahttp = get_shared_async_client()
+        self.turn_lock = asyncio.Lock()  # Concurrent async turns would interleave their messages in memory
+        self.metrics = {"time_to_first_token": None, "total_time": None}
+        self.memory_file = memory_file  # Legacy store, migrated into the conversation log once
+        self.conversation_log = ConversationLog(log_file, legacy_path=memory_file, fsync=fsync)
+        self.context = ContextBuilder(token_budget=token_budget, summarizer=self.summarize_messages,
+                                      summary_file=self.conversation_log.summary_path())
+        self.conversation_log.align = self.context.block_size  # Compaction must not shift the summarized blocks
         self.memory, self.last_interaction = self.load_memory()
+        self.saved_count = len(self.memory)  # Messages already persisted in the log
+        self.response_cache = ResponseCache() if use_response_cache else None
 
         # Initialize system prompt if memory is empty
         if not self.memory:
             self.memory.append({"role": "system", "content": "Your name is Toa-chan. As far as you know, you're a human and you are very curious about everything."})
 
     def load_memory(self):
-        """Loads chat memory from a file."""
-        try:
-            with open(self.memory_file, "r") as file:
-                data = json.load(file)
-                return data.get("messages", []), data.get("last_interaction", None)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return [], None
+        """Loads chat memory from the conversation log."""
+        return self.conversation_log.load()
 
     def save_memory(self):
-        """Saves chat memory to a file."""
-        with open(self.memory_file, "w") as file:
-            json.dump({"messages": self.memory, "last_interaction": self.last_interaction}, file, indent=4)
+        """Appends the messages added since the last save to the conversation log."""
+        self.conversation_log.append(self.memory[self.saved_count:], self.last_interaction)
+        self.saved_count = len(self.memory)
+        if self.conversation_log.should_compact():
+            self.memory = self.conversation_log.compact(self.memory, self.last_interaction)
+            self.saved_count = len(self.memory)
 
     def get_time_since_last_interaction(self):
         """Calculates the time elapsed since the last interaction."""
@@ -60,8 +77,8 @@ class BaseAI:
         elapsed = (datetime.now() - last_time).total_seconds()
         return f"{int(elapsed // 60)} minutes and {int(elapsed % 60)} seconds ago."
 
-    def chat_with_ai(self, user_input, vision_model=None):
-        """Processes user input and generates a response using OpenRouter."""
+    def prepare_request(self, user_input, vision_model=None):
+        """Updates memory with the user turn and returns (headers, data) for OpenRouter, or None when offline."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -70,46 +87,201 @@ class BaseAI:
         # Update last interaction time
         self.last_interaction = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+        # Ephemeral facts are sent with this request only, never stored in history
+        ephemeral = []
+
         # Inject vision data if requested
         if vision_model and "what do you see" in user_input.lower():
             vision_context = vision_model.get_vision_data()
-            self.memory.append({"role": "system", "content": f"Visual Input: {vision_context}"})
+            ephemeral.append({"role": "system", "content": f"Visual Input: {vision_context}"})
 
         # Inject time awareness
         if "what time is it" in user_input.lower():
-            self.memory.append({"role": "system", "content": f"The current time is {datetime.now().strftime('%H:%M:%S')}."})
+            ephemeral.append({"role": "system", "content": f"The current time is {datetime.now().strftime('%H:%M:%S')}."})
 
         if "how long since last message" in user_input.lower():
-            self.memory.append({"role": "system", "content": f"Your last message was {self.get_time_since_last_interaction()}"})
+            ephemeral.append({"role": "system", "content": f"Your last message was {self.get_time_since_last_interaction()}"})
         
-        if not wifi_connected:
-            print("No WiFi Connection")
-            return
+        if not connectivity.is_online():
+            print("No Internet Connection")
+            return None
 
         self.memory.append({"role": "user", "content": user_input})
 
         data = {
-            "model": "google/gemma-3-27b-it:free",
-            "messages": self.memory
+            "model": MODEL_NAME,
+            "messages": self.context.build(self.memory, ephemeral)
+        }
+        return headers, data
+
+    def summarize_messages(self, messages):
+        """Asks the model for a short summary of older turns (used by the context builder)."""
+        if not connectivity.is_online():
+            return None
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages if isinstance(m.get("content"), str))
+        data = {
+            "model": MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": "Summarize this conversation in a few sentences. Keep names, facts and promises."},
+                {"role": "user", "content": transcript}
+            ]
         }
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        response = self.http.post(self.api_url, headers=headers, data=json.dumps(data))
+        if response.status_code != 200:
+            return None
+        choices = response.json().get("choices") or []
+        return choices[0].get("message", {}).get("content") if choices else None
+
+    def finish_response(self, ai_response):
+        """Post-processes a complete reply and saves it to memory."""
+        ai_response = re.sub(r"\\boxed{(.*?)}", r"\1", ai_response)  # Remove \boxed{{}}
+        self.memory.append({"role": "assistant", "content": ai_response})
+
+        # Save memory after response
+        self.save_memory()
+        return ai_response
+
+    def lookup_cached_response(self, user_input, data):
+        """Returns a cached reply for this turn, if the response cache is enabled and has one."""
+        if not self.response_cache:
+            return None
+        return self.response_cache.lookup(data["model"], self.memory[:-1], user_input)
 
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, data=json.dumps(data))
+    def cache_response(self, user_input, data, ai_response, latency):
+        """Stores a finished reply; memory already ends with this user turn and the reply."""
+        if self.response_cache:
+            self.response_cache.store(data["model"], self.memory[:-2], user_input, ai_response, latency)
 
-        if response.status_code == 200:
-            response_data = response.json()
-            if "choices" in response_data and len(response_data["choices"]) > 0:
-                ai_response = response_data["choices"][0].get("message", {}).get("content", "No response")
-                ai_response = re.sub(r"\\boxed{(.*?)}", r"\1", ai_response)  # Remove \boxed{{}}
-                self.memory.append({"role": "assistant", "content": ai_response})
+    def chat_with_ai(self, user_input, vision_model=None):
+        """Processes user input and generates a response using OpenRouter."""
+        request = self.prepare_request(user_input, vision_model)
+        if request is None:
+            return
+        headers, data = request
 
-                # Save memory after response
-                self.save_memory()
+        cached = self.lookup_cached_response(user_input, data)
+        if cached is not None:
+            return self.finish_response(cached)
 
-                return ai_response
-            else:
+        started = time.perf_counter()
+        answered = False
+        try:
+            response = self.http.post(self.api_url, headers=headers, data=json.dumps(data))
+            if response.status_code != 200:
+                return f"API Error: {response.status_code} - {response.text}"
+            choices = response.json().get("choices") or []
+            if not choices:
                 return "No response"
-        else:
-            return f"API Error: {response.status_code} - {response.text}"
+            answered = True
+            ai_response = self.finish_response(choices[0].get("message", {}).get("content", "No response"))
+        finally:
+            if not answered:
+                self.finish_response(NO_REPLY)  # The user turn is already in memory; keep turns paired
+        self.cache_response(user_input, data, ai_response, time.perf_counter() - started)
+        return ai_response
+
+    async def achat_with_ai(self, user_input, vision_model=None):
+        """Awaitable chat_with_ai: the request is awaited; context building and the memory save run in a worker thread."""
+        async with self.turn_lock:
+            request = await asyncio.to_thread(self.prepare_request, user_input, vision_model)  # Builds the context and appends the user turn
+            if request is None:
+                return
+            headers, data = request
+
+            cached = self.lookup_cached_response(user_input, data)
+            if cached is not None:
+                return await asyncio.to_thread(self.finish_response, cached)
+
+            started = time.perf_counter()
+            answered = False
+            try:
+                response = await self.ahttp.post(self.api_url, headers=headers, data=json.dumps(data))
+                if response.status_code != 200:
+                    return f"API Error: {response.status_code} - {response.text}"
+                choices = response.json().get("choices") or []
+                if not choices:
+                    return "No response"
+                answered = True
+                ai_response = await asyncio.to_thread(self.finish_response, choices[0].get("message", {}).get("content", "No response"))
+            finally:
+                if not answered:
+                    self.finish_response(NO_REPLY)  # Also on cancellation, so not in a worker thread
+            self.cache_response(user_input, data, ai_response, time.perf_counter() - started)
+            return ai_response
+
+    def iter_stream_tokens(self, response):
+        """Yields content deltas from an OpenRouter server-sent event stream."""
+        response.encoding = "utf-8"  # text/event-stream has no charset, requests would assume latin-1
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or line.startswith(":"):
+                continue  # Keep-alive comments such as ": OPENROUTER PROCESSING"
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            try:
+                chunk = json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+            if "error" in chunk:
+                raise RuntimeError(f"Stream error: {chunk['error']}")
+            choices = chunk.get("choices") or [{}]
+            token = (choices[0].get("delta") or {}).get("content")
+            if token:
+                yield token
+
+    def stream_chat_with_ai(self, user_input, vision_model=None, on_token=None):
+        """
+        Streams the reply token by token; the full reply is post-processed and saved once it completes.
+        If the stream fails or the caller stops early, whatever arrived (or NO_REPLY) is saved instead.
+        """
+        request = self.prepare_request(user_input, vision_model)
+        if request is None:
+            return
+        headers, data = request
+        data["stream"] = True
+
+        started = time.perf_counter()
+        self.metrics["time_to_first_token"] = None
+        cached = self.lookup_cached_response(user_input, data)
+        if cached is not None:
+            self.metrics["time_to_first_token"] = self.metrics["total_time"] = time.perf_counter() - started
+            cached = self.finish_response(cached)
+            if on_token:
+                on_token(cached)
+            yield cached
+            return
+
+        parts = []
+        completed = False
+        response = None
+        try:
+            response = self.http.post(self.api_url, headers=headers, data=json.dumps(data), stream=True)
+            if response.status_code != 200:
+                yield f"API Error: {response.status_code} - {response.text}"
+                return
+            for token in self.iter_stream_tokens(response):
+                if self.metrics["time_to_first_token"] is None:
+                    self.metrics["time_to_first_token"] = time.perf_counter() - started
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+                yield token
+            completed = bool(parts)
+        finally:
+            if response is not None:
+                response.close()
+            if not completed:
+                # Failed, empty or abandoned by the consumer: close the turn anyway so the history keeps alternating
+                self.finish_response("".join(parts) or NO_REPLY)
+        if not completed:
+            return
+
+        self.metrics["total_time"] = time.perf_counter() - started
+        ai_response = self.finish_response("".join(parts))
+        self.cache_response(user_input, data, ai_response, self.metrics["total_time"])
 
 def main():
     try:
@@ -122,8 +294,10 @@ def main():
         user_message = input("You: ")
         if user_message.lower() in ["exit", "quit"]:
             break
-        response = toa_ai.chat_with_ai(user_message)
-        print(f"AI: {response}")
+        print("AI: ", end="", flush=True)
+        for token in toa_ai.stream_chat_with_ai(user_message):
+            print(token, end="", flush=True)
+        print()
 
 # Example Usage
 if __name__ == "__main__":
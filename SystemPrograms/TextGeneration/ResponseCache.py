@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+CACHE_DIR = os.path.join(BASE_PATH, "SystemFiles", "temp", "response_cache")
+
+# Prompts whose answer depends on the moment they are asked
+TIME_SENSITIVE = re.compile(
+    r"\b(time|now|today|tonight|tomorrow|yesterday|date|day|see|look|weather|news|latest|current|since|remember)\b"
+)
+
+# Follow-ups that only make sense after the previous reply ("yes", "why?", "tell me more about it")
+CONTEXT_DEPENDENT = re.compile(
+    r"\b(yes|yeah|yep|no|nope|ok|okay|sure|why|really|more|again|continue|go on|it|that|this|those|they|them|he|she|him|her)\b"
+)
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace so near-repeats share a key."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + disk) cache of chat replies. The key is the model, the system prompt, the
+    last `context_messages` user turns and the input; follow-ups that refer back to the previous reply
+    also key on that reply.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_entries=256, max_disk_bytes=5 * 1024 * 1024,
+                 ttl=24 * 3600, context_messages=1):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.context_messages = context_messages  # Previous user turns that are part of the key; 0 hits most often
+        self.memory = OrderedDict()  # key -> (response, expires)
+        self.disk_index = {}  # key -> size in bytes
+        self.lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "normalized_hits": 0, "misses": 0, "bypassed": 0, "latency_saved": 0.0}
+        self.average_latency = None  # Running average of uncached round trips
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                self.disk_index[entry.name[:-5]] = entry.stat().st_size
+
+    def is_time_sensitive(self, user_input):
+        return bool(TIME_SENSITIVE.search(user_input.lower()))
+
+    def is_context_dependent(self, user_input):
+        return bool(CONTEXT_DEPENDENT.search(normalize_text(user_input)))
+
+    def make_key(self, model, history, user_input, normalized=False):
+        system = [m for m in history if m.get("role") == "system"]
+        recent = [m for m in history if m.get("role") == "user"][-self.context_messages:] if self.context_messages else []
+        clean = normalize_text if normalized else (lambda text: text)
+        material = [model, "n" if normalized else "e"]
+        material += [f"system:{m.get('content', '')}" for m in system]
+        material += [f"{m.get('role')}:{clean(str(m.get('content', '')))}" for m in recent]
+        if self.is_context_dependent(user_input):
+            replies = [m for m in history if m.get("role") == "assistant"]
+            material.append("assistant:" + normalize_text(str(replies[-1].get("content", ""))) if replies else "assistant:")
+        material.append(clean(user_input))
+        return hashlib.sha256("\x1f".join(material).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _get(self, key, now):
+        entry = self.memory.get(key)
+        if entry:
+            response, expires = entry
+            if expires > now:
+                self.memory.move_to_end(key)
+                return response
+            del self.memory[key]
+        if key not in self.disk_index:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._remove_disk(key)
+            return None
+        if data.get("expires", 0) <= now:
+            self._remove_disk(key)
+            return None
+        os.utime(self._path(key))  # Disk eviction is least-recently-used by mtime
+        self._put_memory(key, data["response"], data["expires"])
+        return data["response"]
+
+    def lookup(self, model, history, user_input):
+        """Returns a cached reply or None. Time-sensitive prompts always bypass the cache."""
+        now = time.time()
+        with self.lock:
+            if self.is_time_sensitive(user_input):
+                self.stats["bypassed"] += 1
+                return None
+            for normalized, counter in ((False, "exact_hits"), (True, "normalized_hits")):
+                response = self._get(self.make_key(model, history, user_input, normalized), now)
+                if response is not None:
+                    self.stats[counter] += 1
+                    self.stats["latency_saved"] += self.average_latency or 0.0
+                    return response
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, model, history, user_input, response, latency=None, ttl=None):
+        """Caches a reply under both its exact and normalized keys."""
+        if latency is not None:
+            self.average_latency = latency if self.average_latency is None else 0.9 * self.average_latency + 0.1 * latency
+        if self.is_time_sensitive(user_input) or not response:
+            return
+        expires = time.time() + (ttl or self.ttl)
+        with self.lock:
+            for normalized in (False, True):
+                key = self.make_key(model, history, user_input, normalized)
+                self._put_memory(key, response, expires)
+                self._put_disk(key, response, expires)
+            self._evict_disk()
+
+    def _put_memory(self, key, response, expires):
+        self.memory[key] = (response, expires)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _put_disk(self, key, response, expires):
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"response": response, "expires": expires}, f)
+            os.replace(temp_path, path)
+            self.disk_index[key] = os.path.getsize(path)
+        except OSError as e:
+            print(f"Could not write response cache entry: {e}")
+
+    def _remove_disk(self, key):
+        self.disk_index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        total = sum(self.disk_index.values())
+        if total <= self.max_disk_bytes:
+            return
+        by_age = sorted(self.disk_index, key=lambda key: os.path.getmtime(self._path(key)) if os.path.exists(self._path(key)) else 0)
+        for key in by_age:
+            if total <= self.max_disk_bytes:
+                break
+            total -= self.disk_index.get(key, 0)
+            self._remove_disk(key)
+
+    def get_stats(self):
+        hits = self.stats["exact_hits"] + self.stats["normalized_hits"]
+        lookups = hits + self.stats["misses"]
+        return dict(self.stats, hit_rate=hits / lookups if lookups else 0.0)
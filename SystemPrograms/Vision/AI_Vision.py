@@ -1,17 +1,24 @@
 import cv2
+import asyncio
 import base64
-import requests
 import json
 import time
 import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
 from SystemPrograms.Vision.FacialRecognition import FaceRecognizer
+from SystemPrograms.Vision.FaceTracker import FaceTracker
+from SystemPrograms.Vision.SceneChange import SceneChangeDetector
+from SystemPrograms.Vision.VisionPipeline import VisionPipeline
+from SystemPrograms.Vision.ImageEncoder import ImageEncoder
+from SystemPrograms.Vision.VisionState import VisionState
 from SystemPrograms.SystemSetup.ReadConfigs import ReadConfigs
+from SystemPrograms.NetworkClient.HTTPClient import get_shared_client
+from SystemPrograms.NetworkClient.AsyncHTTPClient import get_shared_async_client
 
-# WiFi Check Integration
-from SystemPrograms.CheckInternet.ManageWIFI import CheckWIFI
-manageWiFi = CheckWIFI()
-wifi_connected = manageWiFi.get_wifi_status()
+# Connectivity is probed in the background; checks read a cached flag
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+connectivity = get_connectivity_monitor()
 
 # Load API key from tokens.json
 from pathlib import Path
@@ -19,6 +26,9 @@ from pathlib import Path
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
 FILE_TO_FIND = os.path.join(SYSTEM_FILES_PATH, "tokens.json")
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+VISION_MODEL = "meta-llama/llama-3.2-11b-vision-instruct:free"
+VISION_PROMPT = "Describe what is in this image as if looking through your own eyes."
 
 def load_api_key():
     try:
@@ -33,100 +43,231 @@ if not API_KEY:
     print("[ERROR] Missing API key. Ensure 'tokens.json' is configured.")
 
 class VisionModel:
-    def __init__(self, vision_file="SystemFiles/Memory/vision_memory.txt", capture_interval=10, camera_index=0):
+    def __init__(self, vision_file="SystemFiles/Memory/vision_history.jsonl", capture_interval=10, camera_index=0, api_url=OPENROUTER_URL,
+                 tracking=False, detect_every=5, tracking_fps=15,
+                 scene_gating=True, scene_threshold=0.08, refresh_interval=120,
+                 pipelined=True,
+                 max_edge=768, max_image_bytes=150_000, crop_to_faces=False,
+                 persist_vision=True, history_size=256):
         if not API_KEY:
             raise ValueError("Missing API key.")
         
         self.api_key = API_KEY
+        self.api_url = api_url
+        connectivity.add_endpoint(api_url)
+        self.http = get_shared_client()
+        self.ahttp = get_shared_async_client()
         self.vision_file = vision_file
+        # Results live in memory; the history file (if any) is only appended to in batches
+        self.state = VisionState(history_size, persist_path=vision_file if persist_vision else None)
         self.capture_interval = capture_interval
         self.camera_index = camera_index
         self.running = True
         self.face_recognizer = FaceRecognizer()
+        # With tracking, frames are processed continuously at tracking_fps and faces are only encoded when they
+        # first appear. That costs far more CPU than one full recognition per capture_interval, so it is opt-in.
+        self.face_tracker = FaceTracker(self.face_recognizer, detect_every=detect_every) if tracking else None
+        self.tracking_fps = tracking_fps
+        self.recognized_faces = []
+        self.face_boxes = []
+        # Face boxes come from the tracker, so crop_to_faces has no effect with tracking=False
+        self.image_encoder = ImageEncoder(max_edge=max_edge, max_bytes=max_image_bytes, crop_to_faces=crop_to_faces)
+        # Only frames that differ from the last described one are sent to the vision model
+        self.scene_detector = SceneChangeDetector(scene_threshold, refresh_interval=refresh_interval) if scene_gating else None
+        self.last_analysis = None
+        # Tracks depend on frame order and dlib's models are not thread-safe: one frame at a time
+        self.recognition_lock = threading.RLock()
+        if self.face_tracker:
+            self.face_recognizer.enrollment.on_resolved.append(self.on_face_enrolled)
+        self.pipeline = None
+        if pipelined:
+            # Boxes travel with their frame; by upload time self.face_boxes belongs to a newer one
+            self.pipeline = VisionPipeline(
+                camera_index,
+                self.recognize_frame,
+                lambda frame, result, now: self.wants_analysis(frame, result[0], now),
+                lambda frame, result: self.analyze_image(frame, result[1], result[0]),
+                recognition_interval=1.0 / tracking_fps if tracking else capture_interval,
+            )
 
     def encode_image_to_base64(self, image):
-        """Converts an image to base64 format."""
-        _, buffer = cv2.imencode(".jpg", image)
-        return base64.b64encode(buffer).decode("utf-8")
+        """Converts an image to base64 format (resized and size-capped like uploads)."""
+        return base64.b64encode(self.image_encoder.encode(image).jpeg).decode("utf-8")
 
-    def analyze_image(self, image):
+    def analyze_image(self, image, face_boxes=None, faces=None):
         """Sends an image to OpenRouter AI for object recognition."""
-        image_base64 = self.encode_image_to_base64(image)
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
-        if not wifi_connected:
-            print("No WiFi Connection")
+        if not connectivity.is_online():
+            print("No Internet Connection")
             return
 
-        data = {
-            "model": "meta-llama/llama-3.2-11b-vision-instruct:free",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Describe what is in this image as if looking through your own eyes."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
-                    ]
-                }
-            ]
-        }
-
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, data=json.dumps(data))
+        encoded = self.image_encoder.encode(image, face_boxes)
+        data = self.image_encoder.build_request_body(VISION_MODEL, VISION_PROMPT, encoded)
+
+        response = self.http.post(self.api_url, headers=headers, data=data)
 
         if response.status_code == 200:
             response_data = response.json()
             if "choices" in response_data and len(response_data["choices"]) > 0:
                 vision_description = response_data["choices"][0]["message"]["content"]
-                self.save_vision_data(vision_description)
+                self.save_vision_data(vision_description, faces)
                 return vision_description
             else:
                 return "No description received."
         else:
             return f"Error: {response.status_code} - {response.text}"
 
-    def save_vision_data(self, vision_description):
-        """Saves the latest vision description to a file."""
-        with open(self.vision_file, "w") as file:
-            file.write(vision_description)
+    async def aanalyze_image(self, image, face_boxes=None, faces=None):
+        """Awaitable analyze_image: JPEG encoding runs in a worker thread and the upload is awaited."""
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
-    def get_vision_data(self):
-        """Retrieves the latest vision data from the file."""
-        try:
-            with open(self.vision_file, "r") as file:
-                return file.read().strip()
-        except FileNotFoundError:
+        if not connectivity.is_online():
+            print("No Internet Connection")
+            return
+
+        encoded = await asyncio.to_thread(self.image_encoder.encode, image, face_boxes)
+        data = self.image_encoder.build_request_body(VISION_MODEL, VISION_PROMPT, encoded)
+
+        response = await self.ahttp.post(self.api_url, headers=headers, data=data)
+
+        if response.status_code == 200:
+            response_data = response.json()
+            if "choices" in response_data and len(response_data["choices"]) > 0:
+                vision_description = response_data["choices"][0]["message"]["content"]
+                self.save_vision_data(vision_description, faces)
+                return vision_description
+            else:
+                return "No description received."
+        else:
+            return f"Error: {response.status_code} - {response.text}"
+
+    def save_vision_data(self, vision_description, faces=None):
+        """Publishes the latest vision description (and who was recognized) to the vision state."""
+        self.state.publish(vision_description, faces if faces is not None else self.recognized_faces)
+
+    def get_vision_data(self, fresh_within=None, timeout=2.0):
+        """
+        Returns the latest vision description from memory. If it is older than `fresh_within`
+        seconds, waits up to `timeout` for the next one before settling for what there is.
+        """
+        entry = self.state.latest()
+        if fresh_within is not None and (entry is None or time.time() - entry.timestamp > fresh_within):
+            entry = self.state.wait_for_next(timeout) or entry
+        if entry is None:
             return "No recent visual data."
+        if entry.faces:
+            return f"{entry.description}\nPeople recognized: {', '.join(entry.faces)}"
+        return entry.description
+
+    def process_frame(self, frame):
+        """Runs face recognition (tracked or full) on one frame and keeps the result."""
+        with self.recognition_lock:
+            if self.face_tracker:
+                faces = self.face_tracker.process(frame)
+            else:
+                faces = self.face_recognizer.recognize_faces(frame)
+            self.recognized_faces = faces
+            self.face_boxes = self.face_tracker.face_boxes if self.face_tracker else []
+            return faces
+
+    def recognize_frame(self, frame):
+        """(faces, boxes) of one frame, read before another frame can overwrite them."""
+        with self.recognition_lock:
+            return self.process_frame(frame), self.face_boxes
+
+    def on_face_enrolled(self, pending_id, name):
+        with self.recognition_lock:
+            self.face_tracker.forget_unknown()
+
+    def wants_analysis(self, frame, faces, now):
+        """True at most once per capture_interval, and only for frames that show something new."""
+        if self.last_analysis is not None and now - self.last_analysis < self.capture_interval:
+            return False
+        self.last_analysis = now
+        return self.scene_detector is None or self.scene_detector.should_send(frame, faces)[0]
 
     def vision_loop(self):
         """Captures frames, processes face recognition, and AI analysis."""
         cap = cv2.VideoCapture(self.camera_index)
+        frame_interval = 1.0 / self.tracking_fps if self.face_tracker else self.capture_interval
 
         while self.running:
+            started = time.monotonic()
             ret, frame = cap.read()
             if ret:
-                recognized_faces = self.face_recognizer.recognize_faces(frame)
-                vision_data = self.analyze_image(frame)
-                
+                self.process_frame(frame)
+                if self.wants_analysis(frame, self.recognized_faces, started):
+                    self.analyze_image(frame, self.face_boxes, self.recognized_faces)
+
                 # print(f"AI Vision: {vision_data}")
-                # print(f"Recognized Faces: {recognized_faces}")
+                # print(f"Recognized Faces: {self.recognized_faces}")
 
                 # cv2.imshow("AI Vision & Face Recognition", frame)
 
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 break
 
-            time.sleep(self.capture_interval)
+            time.sleep(max(0.0, frame_interval - (time.monotonic() - started)))
 
         cap.release()
         cv2.destroyAllWindows()
 
+    async def _aupload(self, frame, face_boxes, faces):
+        try:
+            return await self.aanalyze_image(frame, face_boxes, faces)
+        except Exception as e:
+            print(f"Vision upload failed: {e}")
+
+    async def avision_loop(self):
+        """
+        Cooperative vision_loop for the asyncio runtime: capture and face recognition run on a worker
+        thread, and each description upload is its own task so capture never waits for the network.
+        """
+        loop = asyncio.get_running_loop()
+        frame_interval = 1.0 / self.tracking_fps if self.face_tracker else self.capture_interval
+        executor = ThreadPoolExecutor(max_workers=1)  # One frame at a time keeps tracks in order
+        cap = await loop.run_in_executor(executor, cv2.VideoCapture, self.camera_index)
+        upload = None
+        self.running = True
+        try:
+            while self.running:
+                started = time.monotonic()
+                ret, frame = await loop.run_in_executor(executor, cap.read)
+                if ret:
+                    faces = await loop.run_in_executor(executor, self.process_frame, frame)
+                    # At most one description in flight; frames in the meantime are only tracked
+                    if (upload is None or upload.done()) and self.wants_analysis(frame, faces, started):
+                        upload = asyncio.create_task(self._aupload(frame, self.face_boxes, faces))
+                await asyncio.sleep(max(0.0, frame_interval - (time.monotonic() - started)))
+        finally:
+            if upload is not None and not upload.done():
+                upload.cancel()
+            executor.submit(cap.release)  # Runs after any read still in progress
+            executor.shutdown(wait=False)
+            self.state.flush()
+
     def start_vision_processing(self):
-        """Starts vision processing in a background thread."""
-        threading.Thread(target=self.vision_loop, daemon=True).start()
+        """Starts vision processing in the background (staged pipeline, or the single-thread loop)."""
+        self.running = True
+        if self.pipeline:
+            self.pipeline.start()
+        else:
+            threading.Thread(target=self.vision_loop, daemon=True).start()
 
     def stop_vision_processing(self):
         """Stops vision processing loop."""
         self.running = False
+        if self.pipeline:
+            self.pipeline.stop()
+        self.state.flush()
+
+    def get_pipeline_stats(self):
+        """Per-stage queue depth, drops and latency, plus scene gating counts."""
+        stats = self.pipeline.get_stats() if self.pipeline else {}
+        if self.scene_detector:
+            stats["scene"] = self.scene_detector.get_stats()
+        return stats
 
 def main():
     if API_KEY:
@@ -134,9 +275,13 @@ def main():
         vision.start_vision_processing()
 
         while True:
-            cmd = input("Enter 'see' to get vision data, 'faces' to list known faces, or 'quit' to exit: ")
-            if cmd.lower() == "see":
+            cmd = input("Enter 'see' to get vision data, 'faces' to list known faces, '/enroll' to name new faces, or 'quit' to exit: ")
+            if cmd.startswith("/enroll"):
+                print(vision.face_recognizer.enrollment.command(cmd))
+            elif cmd.lower() == "see":
                 print("AI sees:", vision.get_vision_data())
+            elif cmd.lower() == "stats":
+                print("Pipeline:", vision.get_pipeline_stats())
             elif cmd.lower() == "faces":
                 print("Known Faces:", vision.face_recognizer.known_faces["names"])
             elif cmd.lower() == "quit":
@@ -0,0 +1,148 @@
+import itertools
+import threading
+import time
+
+import numpy as np
+
+
+class PendingFace:
+    """One unknown person: a running centroid of their encodings and when they were seen."""
+
+    def __init__(self, pending_id, encoding, now, thumbnail=None):
+        self.id = pending_id
+        self.centroid = np.asarray(encoding, dtype=np.float64).copy()
+        self.samples = 1
+        self.sightings = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.thumbnail = thumbnail  # Small RGB crop so a UI can show who is waiting
+
+    def distance(self, encoding):
+        return float(np.linalg.norm(self.centroid - encoding))
+
+    def add(self, encoding, now, max_samples):
+        # Running mean, capped so the centroid keeps adapting to pose and lighting
+        self.samples = min(self.samples + 1, max_samples)
+        self.centroid += (encoding - self.centroid) / self.samples
+        self.sightings += 1
+        self.last_seen = now
+
+    def merge(self, other):
+        total = self.samples + other.samples
+        self.centroid = (self.centroid * self.samples + other.centroid * other.samples) / total
+        self.samples = total
+        self.sightings += other.sightings
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+
+    def summary(self):
+        return {"id": self.id, "sightings": self.sightings, "first_seen": self.first_seen, "last_seen": self.last_seen}
+
+
+class EnrollmentQueue:
+    """
+    Collects unknown faces without blocking recognition. Sightings of the same person are clustered
+    into one pending entry, which is later named (resolve) or ignored (dismiss) from any thread.
+    """
+
+    def __init__(self, recognizer, cluster_tolerance=0.5, max_samples=20, max_pending=20, ttl=3600):
+        self.recognizer = recognizer
+        self.cluster_tolerance = cluster_tolerance
+        self.max_samples = max_samples
+        self.max_pending = max_pending
+        self.ttl = ttl  # Seconds an unseen pending or dismissed face is remembered
+        self.pending_faces = {}
+        self.dismissed = []  # PendingFace entries that should stay quiet while they are around
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.on_resolved = []  # callables(pending_id, name)
+
+    def _nearest(self, entries, encoding):
+        best, best_distance = None, self.cluster_tolerance
+        for entry in entries:
+            distance = entry.distance(encoding)
+            if distance <= best_distance:
+                best, best_distance = entry, distance
+        return best
+
+    def _expire(self, now):
+        self.pending_faces = {i: p for i, p in self.pending_faces.items() if now - p.last_seen <= self.ttl}
+        self.dismissed = [p for p in self.dismissed if now - p.last_seen <= self.ttl]
+
+    def observe(self, encoding, rgb_frame=None, box=None, now=None):
+        """Records an unknown face; returns its pending id, or None if it was dismissed. Never blocks on I/O."""
+        now = time.time() if now is None else now
+        encoding = np.asarray(encoding, dtype=np.float64)
+        with self.lock:
+            self._expire(now)
+            ignored = self._nearest(self.dismissed, encoding)
+            if ignored:
+                ignored.add(encoding, now, self.max_samples)
+                return None
+
+            entry = self._nearest(self.pending_faces.values(), encoding)
+            if entry:
+                entry.add(encoding, now, self.max_samples)
+                # Two clusters that drifted together are the same person
+                others = [p for p in self.pending_faces.values() if p is not entry]
+                duplicate = self._nearest(others, entry.centroid)
+                if duplicate:
+                    entry.merge(duplicate)
+                    del self.pending_faces[duplicate.id]
+                return entry.id
+
+            if len(self.pending_faces) >= self.max_pending:
+                stalest = min(self.pending_faces.values(), key=lambda p: p.last_seen)
+                del self.pending_faces[stalest.id]
+            thumbnail = None
+            if rgb_frame is not None and box is not None:
+                top, right, bottom, left = box
+                thumbnail = rgb_frame[max(0, top):bottom, max(0, left):right].copy()
+            entry = PendingFace(next(self.ids), encoding, now, thumbnail)
+            self.pending_faces[entry.id] = entry
+            print(f"New face detected (pending #{entry.id}). Use '/enroll {entry.id} <name>' to name it.")
+            return entry.id
+
+    def pending(self):
+        """Summaries of the faces waiting for a name, most recently seen first."""
+        with self.lock:
+            self._expire(time.time())
+            return sorted((p.summary() for p in self.pending_faces.values()), key=lambda s: -s["last_seen"])
+
+    def resolve(self, pending_id, name):
+        """Enrolls a pending face under `name`. Returns False if the id is unknown."""
+        with self.lock:
+            entry = self.pending_faces.pop(pending_id, None)
+        if entry is None:
+            return False
+        self.recognizer.enroll_face(entry.centroid.astype(np.float32), name)
+        for callback in self.on_resolved:
+            callback(pending_id, name)
+        return True
+
+    def dismiss(self, pending_id):
+        """Drops a pending face and stops it from being queued again while it stays around."""
+        with self.lock:
+            entry = self.pending_faces.pop(pending_id, None)
+            if entry is None:
+                return False
+            self.dismissed.append(entry)
+            return True
+
+    def command(self, text):
+        """
+        Handles '/enroll' commands and returns a reply:
+        '/enroll' lists pending faces, '/enroll <id> <name>' names one, '/enroll dismiss <id>' ignores one.
+        """
+        parts = text.split(maxsplit=2)[1:]
+        if not parts:
+            pending = self.pending()
+            if not pending:
+                return "No faces are waiting to be named."
+            now = time.time()
+            return "\n".join(f"#{p['id']}: seen {p['sightings']} times, last {now - p['last_seen']:.0f}s ago" for p in pending)
+        if parts[0] == "dismiss" and len(parts) == 2 and parts[1].isdigit():
+            return f"Dismissed #{parts[1]}." if self.dismiss(int(parts[1])) else f"No pending face #{parts[1]}."
+        if parts[0].isdigit() and len(parts) == 2:
+            return f"Enrolled #{parts[0]} as {parts[1]}." if self.resolve(int(parts[0]), parts[1]) else f"No pending face #{parts[0]}."
+        return "Usage: /enroll | /enroll <id> <name> | /enroll dismiss <id>"
@@ -0,0 +1,191 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from SystemPrograms.Vision.FaceIndex import ENCODING_SIZE
+
+ENCODINGS_FILE = "SystemFiles/Memory/faces.f32"
+NAMES_FILE = "SystemFiles/Memory/faces.jsonl"
+LEGACY_FACES_FILE = "SystemFiles/Memory/faces.pkl"
+ROW_BYTES = ENCODING_SIZE * np.dtype(np.float32).itemsize
+DAMAGED_NAME = "Unknown"  # Name of a row whose record was damaged; it is offered for enrollment again
+
+
+class FaceGallery:
+    """
+    Face store in two append-only files: raw float32 encodings (memory-mapped on load) and a
+    JSONL table with one name/metadata record per row. Enrolling a face appends to both.
+    """
+
+    def __init__(self, encodings_path=ENCODINGS_FILE, names_path=NAMES_FILE, legacy_path=LEGACY_FACES_FILE, fsync=True):
+        self.encodings_path = encodings_path
+        self.names_path = names_path
+        self.legacy_path = legacy_path
+        self.fsync = fsync
+        self.encodings = np.zeros((0, ENCODING_SIZE), dtype=np.float32)
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def names(self):
+        return [record["name"] for record in self.records]
+
+    def migrate_legacy(self):
+        """One-time import of faces.pkl; skipped once the gallery files exist."""
+        if os.path.exists(self.encodings_path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return False
+        try:
+            with open(self.legacy_path, "rb") as file:
+                data = pickle.load(file)  # Only ever our own legacy file; never loaded again after this
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Could not migrate {self.legacy_path}: {e}")
+            return False
+        names = list(data.get("names", []))
+        encodings = np.asarray(data.get("encodings", []), dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        records = "".join(json.dumps({"name": name, "source": "faces.pkl"}, ensure_ascii=False) + "\n" for name in names)
+        # Names first: the encodings file marks the migration as done
+        self._write_atomic(self.names_path, records.encode("utf-8"))
+        self._write_atomic(self.encodings_path, encodings.tobytes())
+        print(f"Migrated {len(names)} faces from {self.legacy_path} to {self.encodings_path}")
+        return True
+
+    def load(self):
+        """
+        Maps the encodings file and reads the names table. Rows left over from an interrupted append are
+        dropped; a damaged record is moved to <names>.corrupt and its row kept as an unnamed face.
+        """
+        self.migrate_legacy()
+        try:
+            with open(self.names_path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b""
+        complete = data[:data.rfind(b"\n") + 1]  # A torn final line has no newline yet
+        lines = complete.split(b"\n")[:-1]
+        try:
+            records = json.loads(b"[" + complete.rstrip(b"\n").replace(b"\n", b",") + b"]") if complete else []
+        except ValueError:
+            records = None
+        damaged = []
+        if records is None or len(records) != len(lines) or not all(isinstance(r, dict) and "name" in r for r in records):
+            records = []  # Parse line by line; every line keeps its row so names stay aligned with encodings
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict) or "name" not in record:
+                    damaged.append(line)
+                    record = {"name": DAMAGED_NAME, "damaged": True}
+                records.append(record)
+
+        rows = os.path.getsize(self.encodings_path) // ROW_BYTES if os.path.exists(self.encodings_path) else 0
+        count = min(rows, len(records))
+        if damaged:
+            with open(self.names_path + ".corrupt", "ab") as file:
+                file.write(b"".join(line + b"\n" for line in damaged))
+            records_data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records[:count])
+            self._write_atomic(self.names_path, records_data.encode("utf-8"))
+            print(f"Moved {len(damaged)} damaged face record(s) from {self.names_path} to {self.names_path}.corrupt")
+        elif count < len(lines) or len(complete) < len(data):
+            keep = sum(len(line) + 1 for line in lines[:count])
+            with open(self.names_path, "r+b") as file:
+                file.truncate(keep)
+            print(f"Discarded a partial face record at the end of {self.names_path}")
+        if os.path.exists(self.encodings_path) and os.path.getsize(self.encodings_path) != count * ROW_BYTES:
+            with open(self.encodings_path, "r+b") as file:
+                file.truncate(count * ROW_BYTES)
+            print(f"Discarded a partial face record at the end of {self.encodings_path}")
+
+        self.records = records[:count]
+        self._map(count)
+        return self.encodings, self.names
+
+    def _map(self, count):
+        # Mapping reads nothing up front, so re-mapping after each append costs the same at any gallery size
+        if count:
+            self.encodings = np.memmap(self.encodings_path, dtype=np.float32, mode="r", shape=(count, ENCODING_SIZE))
+        else:
+            self.encodings = np.zeros((0, ENCODING_SIZE), dtype=np.float32)
+
+    def append(self, encoding, name, **metadata):
+        """Appends one face and returns its row. The encoding is written before its name record."""
+        row = np.asarray(encoding, dtype=np.float32).reshape(ENCODING_SIZE)
+        record = dict(metadata, name=name, time=metadata.get("time", time.time()))
+        directory = os.path.dirname(self.encodings_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for path, data in ((self.encodings_path, row.tobytes()),
+                           (self.names_path, (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))):
+            with open(path, "ab") as file:
+                file.write(data)
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+        self.records.append(record)
+        self._map(len(self.records))
+        return len(self.records) - 1
+
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def benchmark_gallery(sizes=(10_000, 100_000), enrollments=20):
+    """Compares startup and per-enrollment cost of the pickle file and the mapped gallery."""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            encodings = list(rng.normal(0, 0.1, (size, ENCODING_SIZE)))
+            names = [f"person {i}" for i in range(size)]
+            legacy = os.path.join(directory, f"faces_{size}.pkl")
+            with open(legacy, "wb") as file:
+                pickle.dump({"encodings": encodings, "names": names}, file)
+
+            started = time.perf_counter()
+            with open(legacy, "rb") as file:
+                data = pickle.load(file)
+            pickle_load = time.perf_counter() - started
+            started = time.perf_counter()
+            for i in range(enrollments):
+                data["encodings"].append(encodings[i])
+                data["names"].append(names[i])
+                with open(legacy, "wb") as file:
+                    pickle.dump(data, file)
+            pickle_enroll = (time.perf_counter() - started) / enrollments
+
+            gallery = FaceGallery(os.path.join(directory, f"faces_{size}.f32"),
+                                  os.path.join(directory, f"faces_{size}.jsonl"), legacy, fsync=False)
+            gallery.load()  # Migration, not timed
+            started = time.perf_counter()
+            FaceGallery(gallery.encodings_path, gallery.names_path, legacy).load()
+            mapped_load = time.perf_counter() - started
+            started = time.perf_counter()
+            for i in range(enrollments):
+                gallery.append(encodings[i], names[i])
+            mapped_enroll = (time.perf_counter() - started) / enrollments
+            print(f"{size:>7} faces: load pickle {pickle_load * 1000:.1f} ms / mapped {mapped_load * 1000:.1f} ms | "
+                  f"enroll pickle {pickle_enroll * 1000:.1f} ms / mapped {mapped_enroll * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_gallery()
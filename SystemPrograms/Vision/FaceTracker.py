@@ -0,0 +1,224 @@
+import sys
+import time
+from collections import Counter, deque
+
+import cv2
+
+from SystemPrograms.Vision.FacialRecognition import FaceRecognizer
+
+
+def box_iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    intersection = max(0, right - left) * max(0, bottom - top)
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    union = area_a + area_b - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def create_cv_tracker():
+    """Returns a fresh OpenCV single-object tracker, or None when this cv2 build has none."""
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        for factory in ("TrackerKCF_create", "TrackerMIL_create"):
+            if module is not None and hasattr(module, factory):
+                return getattr(module, factory)()
+    return None
+
+
+class FaceTrack:
+    """One face followed across frames, with a short history of identity votes."""
+
+    def __init__(self, track_id, box, smoothing):
+        self.id = track_id
+        self.box = box
+        self.votes = deque(maxlen=smoothing)  # (name, confidence) per encoding of this track
+        self.hits = 1  # Detections matched to this track
+        self.misses = 0  # Consecutive detections that did not find it
+        self.attempts = 0  # Encodings spent on this track
+        self.lost = False
+        self.cv_tracker = None
+
+    def vote(self, name, confidence):
+        self.votes.append((name, confidence))
+        self.attempts += 1
+
+    def identity(self):
+        """Majority name over the recent votes, with its mean confidence."""
+        if not self.votes:
+            return "Unknown", 0.0
+        counts = Counter(name for name, _ in self.votes)
+        name = max(counts, key=lambda candidate: (counts[candidate], candidate != "Unknown"))
+        confidences = [confidence for voted, confidence in self.votes if voted == name]
+        return name, sum(confidences) / len(confidences)
+
+    def start_cv_tracker(self, frame):
+        self.cv_tracker = create_cv_tracker()
+        if self.cv_tracker is not None:
+            top, right, bottom, left = self.box
+            self.cv_tracker.init(frame, (left, top, right - left, bottom - top))
+
+    def follow(self, frame):
+        """Moves the box with the OpenCV tracker between detections; marks the track lost on failure."""
+        if self.cv_tracker is None:
+            return
+        ok, (x, y, w, h) = self.cv_tracker.update(frame)
+        if ok:
+            self.box = (int(y), int(x + w), int(y + h), int(x))
+        else:
+            self.lost = True
+
+
+class FaceTracker:
+    """
+    Track-then-recognize: faces are detected every `detect_every` frames (or as soon as a track is
+    lost), followed in between, and encoded only when a new track appears.
+    """
+
+    def __init__(self, recognizer, detect_every=5, iou_threshold=0.3, max_misses=2, smoothing=5,
+                 min_hits=2, max_attempts=3, detection_scale=1.0, use_cv_tracker=False):
+        self.recognizer = recognizer
+        self.detect_every = detect_every
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses  # Detections a track may go unseen before it is dropped
+        self.min_hits = min_hits  # Detections before a track is reported, so one-off false positives never show
+        self.max_attempts = max_attempts  # Encodings allowed for a track that is still Unknown
+        self.detection_scale = detection_scale
+        # Boxes stay put between detections unless an OpenCV tracker is enabled; KCF (opencv-contrib)
+        # is cheap enough to pay off, MIL usually costs as much as the detection it replaces
+        self.use_cv_tracker = use_cv_tracker and create_cv_tracker() is not None
+        self.tracks = []
+        self.next_id = 0
+        self.frame_index = 0
+        self.smoothing = smoothing
+        self.stats = {"frames": 0, "detections": 0, "encodings": 0}
+        self.face_boxes = []  # Boxes of the faces returned by the last process() call
+
+    def needs_detection(self):
+        return self.frame_index % self.detect_every == 0 or any(track.lost for track in self.tracks)
+
+    def associate(self, boxes):
+        """Greedy IoU matching of detected boxes to tracks; returns (pairs, unmatched box indexes)."""
+        candidates = sorted(
+            ((box_iou(track.box, box), t, b) for t, track in enumerate(self.tracks) for b, box in enumerate(boxes)),
+            reverse=True,
+        )
+        used_tracks, used_boxes, pairs = set(), set(), []
+        for overlap, t, b in candidates:
+            if overlap < self.iou_threshold:
+                break
+            if t in used_tracks or b in used_boxes:
+                continue
+            used_tracks.add(t)
+            used_boxes.add(b)
+            pairs.append((self.tracks[t], boxes[b]))
+        return pairs, [b for b in range(len(boxes)) if b not in used_boxes]
+
+    def detect(self, frame, rgb_frame):
+        boxes = self.recognizer.detect_faces(rgb_frame, self.detection_scale)
+        self.stats["detections"] += 1
+        pairs, unmatched = self.associate(boxes)
+
+        matched = set()
+        for track, box in pairs:
+            track.box, track.lost = box, False
+            track.hits += 1
+            track.misses = 0
+            matched.add(track.id)
+        for track in self.tracks:
+            if track.id not in matched:
+                track.misses += 1
+                track.lost = True  # Re-detect on the next frame rather than waiting a full cycle
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        new_tracks = []
+        for b in unmatched:
+            new_tracks.append(FaceTrack(self.next_id, boxes[b], self.smoothing))
+            self.next_id += 1
+        self.tracks.extend(new_tracks)
+
+        # Encode new faces, plus matched faces that are still Unknown and have attempts left
+        to_encode = new_tracks + [
+            track for track in self.tracks
+            if track.id in matched and track.identity()[0] == "Unknown" and track.attempts < self.max_attempts
+        ]
+        for track, (name, confidence, _) in zip(to_encode, self.recognizer.identify_faces(rgb_frame, [t.box for t in to_encode])):
+            track.vote(name, confidence)
+        self.stats["encodings"] += len(to_encode)
+
+        if self.use_cv_tracker:
+            for track in self.tracks:
+                if track.id in matched or track in new_tracks:
+                    track.start_cv_tracker(frame)
+
+    def process(self, frame, draw=True):
+        """Updates the tracks with one BGR frame and returns (name, confidence) per confirmed face."""
+        if self.needs_detection():
+            self.detect(frame, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        elif self.use_cv_tracker:
+            for track in self.tracks:
+                track.follow(frame)
+        self.frame_index += 1
+        self.stats["frames"] += 1
+
+        faces, boxes = [], []
+        for track in self.tracks:
+            if track.hits < self.min_hits:
+                continue
+            name, confidence = track.identity()
+            faces.append((name, confidence))
+            boxes.append(track.box)
+            if draw:
+                self.recognizer.draw_face(frame, track.box, name)
+        self.face_boxes = boxes
+        return faces
+
+    def forget_unknown(self):
+        """Lets Unknown tracks be encoded again, e.g. after someone was just enrolled."""
+        for track in self.tracks:
+            if track.identity()[0] == "Unknown":
+                track.votes.clear()
+                track.attempts = 0
+                track.lost = True  # Forces a detection (and their re-encoding) on the next frame
+
+    def get_stats(self):
+        frames = self.stats["frames"]
+        return dict(self.stats, tracks=len(self.tracks), encodings_per_frame=self.stats["encodings"] / frames if frames else 0.0)
+
+
+def benchmark_tracking(source=0, frames=150):
+    """Measures FPS and CPU per frame on a camera index or video file, with and without tracking."""
+    recognizer = FaceRecognizer()
+    for mode in ("full", "tracking"):
+        tracker = FaceTracker(recognizer) if mode == "tracking" else None
+        capture = cv2.VideoCapture(source)
+        processed, encodings = 0, 0
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        while processed < frames:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            if tracker:
+                tracker.process(frame, draw=False)
+            else:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                encodings += len(recognizer.identify_faces(rgb_frame, recognizer.detect_faces(rgb_frame)))
+            processed += 1
+        capture.release()
+        if not processed:
+            print(f"No frames could be read from {source!r}")
+            return
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+        if tracker:
+            encodings = tracker.stats["encodings"]
+        print(f"{mode:>8}: {processed / wall:.1f} FPS | {cpu / processed * 1000:.1f} ms CPU/frame | "
+              f"{encodings} encodings over {processed} frames")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        arguments = [argument for argument in sys.argv[1:] if argument != "--benchmark"]
+        source = arguments[0] if arguments else 0
+        benchmark_tracking(int(source) if str(source).isdigit() else source)
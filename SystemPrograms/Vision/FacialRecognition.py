@@ -1,54 +1,141 @@
 import cv2
 import face_recognition
-import pickle
-import os
+import numpy as np
+import sys
+import threading
+import time
 
-DATA_FILE = "SystemFiles/Memory/faces.pkl"
+from SystemPrograms.Vision.EnrollmentQueue import EnrollmentQueue
+from SystemPrograms.Vision.FaceGallery import DAMAGED_NAME, FaceGallery
+from SystemPrograms.Vision.FaceIndex import ENCODING_SIZE, make_index
+
+DEFAULT_TOLERANCE = 0.6  # Same default distance threshold as face_recognition.compare_faces
 
 class FaceRecognizer:
-    def __init__(self):
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, index="brute", **index_options):
+        self.tolerance = tolerance
+        self.index_kind = index  # "brute" is exact; "ivf" scales to tens of thousands of identities
+        self.index_options = index_options
+        self.store = FaceGallery()
+        self.lock = threading.RLock()  # Enrollment can come from another thread than recognition
+        self.enrollment = EnrollmentQueue(self)
         self.load_known_faces()
 
     def load_known_faces(self):
-        """Loads known faces from a file or initializes an empty database."""
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "rb") as f:
-                self.known_faces = pickle.load(f)
-        else:
-            self.known_faces = {"encodings": [], "names": []}
-
-    def save_known_faces(self):
-        """Saves updated face data."""
-        with open(DATA_FILE, "wb") as f:
-            pickle.dump(self.known_faces, f)
-
-    def recognize_faces(self, frame):
+        """Maps the stored face gallery (migrating faces.pkl on first run)."""
+        encodings, names = self.store.load()
+        self.known_faces = {"encodings": encodings, "names": names}
+        self.build_gallery()
+
+    def build_gallery(self):
+        """Puts the known encodings in the configured nearest-neighbour index; the mapped file is searched in place."""
+        self.gallery = make_index(self.index_kind, **self.index_options)
+        if len(self.known_faces["encodings"]):
+            self.gallery.wrap(self.known_faces["encodings"])
+
+    def add_to_gallery(self, encoding):
+        """Inserts one encoding incrementally; the index is never rebuilt for an enrollment."""
+        self.gallery.add(encoding)
+
+    def enroll_face(self, encoding, name):
+        """Appends a new face to the stored gallery and the search index."""
+        with self.lock:
+            self.store.append(encoding, name)
+            self.known_faces["encodings"] = self.store.encodings
+            self.known_faces["names"].append(name)
+            self.add_to_gallery(encoding)
+
+    def match_encodings(self, face_encodings):
+        """
+        Matches every face of a frame with one batched index search.
+        Returns (index or None, distance, confidence) per face; index is None above the tolerance.
+        """
+        if len(face_encodings) == 0:
+            return []
+        with self.lock:
+            distances, ids = self.gallery.search(face_encodings, k=1)
+
+        matches = []
+        for index, distance in zip(ids[:, 0], distances[:, 0]):
+            distance = float(distance)
+            confidence = max(0.0, 1.0 - distance / self.tolerance)
+            matches.append((int(index) if index >= 0 and distance <= self.tolerance else None, distance, confidence))
+        return matches
+
+    def detect_faces(self, rgb_frame, scale=1.0):
+        """Face boxes as (top, right, bottom, left) in frame coordinates; scale < 1 detects on a smaller copy."""
+        if scale == 1.0:
+            return face_recognition.face_locations(rgb_frame)
+        small_frame = cv2.resize(rgb_frame, (0, 0), fx=scale, fy=scale)
+        return [tuple(int(value / scale) for value in box) for box in face_recognition.face_locations(small_frame)]
+
+    def identify_faces(self, rgb_frame, face_locations):
+        """
+        Encodes only the given boxes and returns (name, confidence, encoding) for each.
+        Unknown faces are handed to the enrollment queue; naming them never blocks recognition.
+        """
+        if not face_locations:
+            return []
+        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        identities = []
+        for face_encoding, box, (matched_idx, distance, confidence) in zip(
+            face_encodings, face_locations, self.match_encodings(face_encodings)
+        ):
+            name = self.known_faces["names"][matched_idx] if matched_idx is not None else DAMAGED_NAME
+            if name == DAMAGED_NAME:  # Also a row whose name record was damaged, so it can be named again
+                self.enrollment.observe(face_encoding, rgb_frame, box)
+            identities.append((name, confidence, face_encoding))
+        return identities
+
+    @staticmethod
+    def draw_face(frame, box, name):
+        """Draws a labelled bounding box; green for known faces, red for unknown."""
+        top, right, bottom, left = box
+        color = (0, 255, 0) if name != "Unknown" else (0, 0, 255)
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+        cv2.putText(frame, name, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+    def recognize_faces(self, frame, return_confidence=False):
         """Detects and recognizes faces in a given frame."""
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         face_locations = face_recognition.face_locations(rgb_frame)
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
 
         recognized_faces = []
-        
-        for face_encoding, (top, right, bottom, left) in zip(face_encodings, face_locations):
-            matches = face_recognition.compare_faces(self.known_faces["encodings"], face_encoding)
-            name = "Unknown"
-
-            if True in matches:
-                matched_idx = matches.index(True)
-                name = self.known_faces["names"][matched_idx]
-            else:
-                print("New face detected! Please enter a name: ")
-                name = input()
-                self.known_faces["encodings"].append(face_encoding)
-                self.known_faces["names"].append(name)
-                self.save_known_faces()
-
-            recognized_faces.append(name)
+
+        for box, (name, confidence, _) in zip(face_locations, self.identify_faces(rgb_frame, face_locations)):
+            recognized_faces.append((name, confidence) if return_confidence else name)
 
             # Draw bounding box
-            color = (0, 255, 0) if name != "Unknown" else (0, 0, 255)
-            cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
-            cv2.putText(frame, name, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+            self.draw_face(frame, box, name)
 
         return recognized_faces
+
+
+def benchmark_matching(gallery_sizes=(100, 10_000, 100_000), faces_per_frame=4, repeats=5):
+    """Compares the batched matcher with per-face compare_faces on random galleries."""
+    rng = np.random.default_rng(0)
+    for size in gallery_sizes:
+        recognizer = FaceRecognizer.__new__(FaceRecognizer)
+        recognizer.tolerance = DEFAULT_TOLERANCE
+        recognizer.index_kind, recognizer.index_options = "brute", {}
+        recognizer.lock = threading.RLock()
+        encodings = rng.normal(0, 0.1, (size, ENCODING_SIZE)).astype(np.float32)
+        recognizer.known_faces = {"encodings": list(encodings), "names": [str(i) for i in range(size)]}
+        recognizer.build_gallery()
+        queries = encodings[rng.integers(0, size, faces_per_frame)] + rng.normal(0, 0.01, (faces_per_frame, ENCODING_SIZE))
+
+        started = time.perf_counter()
+        for _ in range(repeats):
+            recognizer.match_encodings(queries)
+        batched = (time.perf_counter() - started) / repeats
+
+        started = time.perf_counter()
+        for query in queries:
+            face_recognition.compare_faces(recognizer.known_faces["encodings"], query)
+        looped = time.perf_counter() - started
+        print(f"{size:>7} identities: batched {batched * 1000:.2f} ms/frame | compare_faces loop {looped * 1000:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_matching()
@@ -0,0 +1,183 @@
+import base64
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_PLACEHOLDER = "@@IMAGE_BASE64@@"
+
+
+class EncodedImage:
+    """A JPEG ready for upload and what it cost to make."""
+
+    def __init__(self, jpeg, quality, shape, encode_time, attempts):
+        self.jpeg = jpeg  # uint8 ndarray straight from cv2.imencode; never copied into bytes
+        self.quality = quality
+        self.shape = shape
+        self.encode_time = encode_time
+        self.attempts = attempts
+
+    def __len__(self):
+        return len(self.jpeg)
+
+
+class ImageEncoder:
+    """
+    Prepares frames for the vision model: longest edge capped at `max_edge`, JPEG quality chosen by
+    binary search to fit `max_bytes`, and optionally cropped around detected faces. Cropping needs the
+    caller to pass face boxes; VisionModel only has them with face tracking enabled.
+    """
+
+    def __init__(self, max_edge=768, max_bytes=150_000, min_quality=35, max_quality=90, crop_to_faces=False, crop_margin=0.6,
+                 reprobe_every=10):
+        self.max_edge = max_edge
+        self.max_bytes = max_bytes
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.crop_to_faces = crop_to_faces
+        self.crop_margin = crop_margin  # Extra space around the faces, as a fraction of their bounding box
+        self.last_quality = max_quality  # Consecutive frames are similar, so the search starts here
+        self.reprobe_every = reprobe_every  # While the budget binds, try higher qualities only every N frames
+        self.frames_since_probe = 0
+
+    def crop(self, image, boxes):
+        """Crops to the union of (top, right, bottom, left) boxes plus a margin."""
+        if not boxes:
+            return image
+        height, width = image.shape[:2]
+        top = min(box[0] for box in boxes)
+        right = max(box[1] for box in boxes)
+        bottom = max(box[2] for box in boxes)
+        left = min(box[3] for box in boxes)
+        pad_y, pad_x = int((bottom - top) * self.crop_margin), int((right - left) * self.crop_margin)
+        return image[max(0, top - pad_y):min(height, bottom + pad_y), max(0, left - pad_x):min(width, right + pad_x)]
+
+    def resize(self, image):
+        height, width = image.shape[:2]
+        scale = self.max_edge / max(height, width)
+        if scale >= 1.0:
+            return image
+        return cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+
+    def _jpeg(self, image, quality):
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buffer
+
+    def encode(self, image, boxes=None):
+        """Returns the highest-quality JPEG within the byte budget (or the smallest one allowed)."""
+        started = time.perf_counter()
+        if self.crop_to_faces:
+            image = self.crop(image, boxes)
+        image = self.resize(image)
+
+        attempts = 1
+        best_quality, best = None, None
+        buffer = self._jpeg(image, self.last_quality)
+        if len(buffer) <= self.max_bytes:
+            best_quality, best = self.last_quality, buffer
+            self.frames_since_probe += 1
+            if self.frames_since_probe >= self.reprobe_every:
+                self.frames_since_probe = 0
+                low, high = self.last_quality + 1, self.max_quality
+            else:
+                low, high = 1, 0  # Still fits; most frames skip the upward search
+        else:
+            low, high = self.min_quality, self.last_quality - 1
+        while low <= high:
+            quality = (low + high) // 2
+            buffer = self._jpeg(image, quality)
+            attempts += 1
+            if len(buffer) <= self.max_bytes:
+                best_quality, best = quality, buffer
+                low = quality + 1
+            else:
+                high = quality - 1
+        if best is None:  # Even the lowest quality is over budget; send it anyway
+            best_quality, best = self.min_quality, self._jpeg(image, self.min_quality)
+            attempts += 1
+        self.last_quality = best_quality
+        return EncodedImage(best, best_quality, image.shape, time.perf_counter() - started, attempts)
+
+    def build_request_body(self, model, prompt, encoded):
+        """
+        JSON chat request as bytes. The metadata is serialized once around a placeholder and the base64
+        image is spliced in, so the large payload is never escaped, decoded to str or re-encoded.
+        """
+        template = json.dumps({
+            "model": model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{IMAGE_PLACEHOLDER}"}}
+                    ]
+                }
+            ]
+        }).encode("utf-8")
+        prefix, suffix = template.split(IMAGE_PLACEHOLDER.encode("ascii"), 1)
+        return b"".join((prefix, base64.b64encode(encoded.jpeg), suffix))
+
+
+def synthetic_frame(width=1280, height=720, seed=0):
+    """A camera-like test frame: smooth lighting, a few objects and sensor noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0], frame[..., 1], frame[..., 2] = 90 + 80 * x, 70 + 60 * y, 110 + 40 * (x * y)
+    for _ in range(12):
+        cx, cy, r = rng.integers(0, width), rng.integers(0, height), int(rng.integers(20, 120))
+        cv2.circle(frame, (int(cx), int(cy)), r, [float(c) for c in rng.integers(0, 255, 3)], -1)
+    frame += rng.normal(0, 4, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def benchmark_encoding(source=None, frames=30):
+    """Bytes per request and encode time per frame: the previous full-size path versus ImageEncoder."""
+    images = []
+    if source is not None:
+        capture = cv2.VideoCapture(source)
+        while len(images) < frames:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            images.append(frame)
+        capture.release()
+    if not images:
+        images = [synthetic_frame(seed=i) for i in range(frames)]
+
+    prompt = "Describe what is in this image as if looking through your own eyes."
+    model = "meta-llama/llama-3.2-11b-vision-instruct:free"
+
+    started, total = time.perf_counter(), 0
+    for image in images:
+        _, buffer = cv2.imencode(".jpg", image)
+        image_base64 = base64.b64encode(buffer).decode("utf-8")
+        body = json.dumps({"model": model, "messages": [{"role": "user", "content": [
+            {"type": "text", "text": prompt},
+            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}]}]})
+        total += len(body.encode("utf-8"))
+    elapsed = time.perf_counter() - started
+    print(f"  original: {total / len(images) / 1024:7.1f} KiB/request | {elapsed / len(images) * 1000:6.2f} ms/frame")
+
+    for label, encoder in (("adaptive", ImageEncoder()), ("512 edge", ImageEncoder(max_edge=512, max_bytes=60_000))):
+        started, total, qualities = time.perf_counter(), 0, []
+        for image in images:
+            encoded = encoder.encode(image)
+            total += len(encoder.build_request_body(model, prompt, encoded))
+            qualities.append(encoded.quality)
+        elapsed = time.perf_counter() - started
+        print(f"  {label}: {total / len(images) / 1024:7.1f} KiB/request | {elapsed / len(images) * 1000:6.2f} ms/frame | "
+              f"quality {min(qualities)}-{max(qualities)}")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        arguments = [argument for argument in sys.argv[1:] if argument != "--benchmark"]
+        source = arguments[0] if arguments else None
+        benchmark_encoding(int(source) if source and source.isdigit() else source)
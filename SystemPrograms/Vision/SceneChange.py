@@ -0,0 +1,67 @@
+import time
+from collections import Counter
+
+import cv2
+
+
+class SceneChangeDetector:
+    """
+    Decides whether a frame is worth sending to the vision model by comparing a small grayscale
+    copy with the last frame that was sent. Recognized faces changing always counts as a change.
+    """
+
+    def __init__(self, threshold=0.08, pixel_threshold=25, size=(64, 48), refresh_interval=120):
+        self.threshold = threshold  # Fraction of changed pixels that counts as a new scene (lower = more sensitive)
+        self.pixel_threshold = pixel_threshold  # Gray-level difference for a pixel to count as changed
+        self.size = size
+        self.refresh_interval = refresh_interval  # Seconds after which a frame is sent regardless
+        self.reference = None
+        self.reference_faces = None
+        self.last_sent = None
+        self.last_score = 0.0
+        self.stats = Counter()
+
+    def signature(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0)  # Sensor noise would otherwise read as change
+
+    def change_score(self, signature):
+        """Fraction of downscaled pixels that differ noticeably from the reference."""
+        if self.reference is None:
+            return 1.0
+        changed = cv2.absdiff(signature, self.reference) > self.pixel_threshold
+        return float(changed.mean())
+
+    @staticmethod
+    def face_names(faces):
+        """Accepts names or (name, confidence) tuples, as returned by the recognizer and tracker."""
+        return tuple(sorted(face[0] if isinstance(face, tuple) else face for face in faces or ()))
+
+    def should_send(self, frame, faces=None, now=None):
+        """Returns (send, reason). When send is True the frame becomes the new reference."""
+        now = time.monotonic() if now is None else now
+        signature = self.signature(frame)
+        names = self.face_names(faces)
+        self.last_score = self.change_score(signature)
+
+        if self.reference is None:
+            reason = "first"
+        elif faces is not None and names != self.reference_faces:
+            reason = "faces"
+        elif self.last_score >= self.threshold:
+            reason = "changed"
+        elif self.refresh_interval and now - self.last_sent >= self.refresh_interval:
+            reason = "refresh"
+        else:
+            self.stats["skipped"] += 1
+            return False, "unchanged"
+
+        self.reference, self.reference_faces, self.last_sent = signature, names, now
+        self.stats["sent"] += 1
+        self.stats[reason] += 1
+        return True, reason
+
+    def get_stats(self):
+        total = self.stats["sent"] + self.stats["skipped"]
+        return dict(self.stats, skip_rate=self.stats["skipped"] / total if total else 0.0, last_score=self.last_score)
@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+
+import cv2
+
+
+class StageStats:
+    """Counters and latency for one pipeline stage."""
+
+    def __init__(self, name, depth=None):
+        self.name = name
+        self.depth = depth or (lambda: 0)  # Callable returning the stage's current input backlog
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        with self.lock:
+            self.processed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def drop(self, count=1):
+        with self.lock:
+            self.dropped += count
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self.lock:
+            average = self.total_latency / self.processed if self.processed else 0.0
+            return {
+                "queue_depth": self.depth(),
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "latency_avg_ms": average * 1000,
+                "latency_max_ms": self.max_latency * 1000,
+            }
+
+
+class LatestFrame:
+    """Single-slot buffer: a new frame replaces one nobody has taken yet, so readers never see stale frames."""
+
+    def __init__(self, stats):
+        self.condition = threading.Condition()
+        self.frame = None
+        self.captured_at = None
+        self.stats = stats
+        self.closed = False
+
+    def put(self, frame, captured_at):
+        with self.condition:
+            if self.frame is not None:
+                self.stats.drop()
+            self.frame, self.captured_at = frame, captured_at
+            self.condition.notify()
+
+    def take(self, timeout=None):
+        """Returns (frame, captured_at), or (None, None) on timeout or close."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.frame is not None or self.closed, timeout):
+                return None, None
+            frame, captured_at = self.frame, self.captured_at
+            self.frame = self.captured_at = None
+            return frame, captured_at
+
+    def __len__(self):
+        return int(self.frame is not None)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+def put_latest(bounded_queue, item, stats):
+    """Puts without blocking, discarding the oldest queued item when full."""
+    while True:
+        try:
+            bounded_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                bounded_queue.get_nowait()
+                stats.drop()
+            except queue.Empty:
+                pass
+
+
+class VisionPipeline:
+    """
+    Capture -> recognize -> upload stages, each on its own thread and joined by bounded buffers.
+    A slow upload never holds up recognition, and recognition only ever sees the newest frame.
+
+    recognize(frame) -> result, should_upload(frame, result, now) -> bool and upload(frame, result)
+    are supplied by the owner (VisionModel).
+    """
+
+    def __init__(self, camera_index, recognize, should_upload, upload, recognition_interval=0.0,
+                 upload_queue_size=1):
+        self.camera_index = camera_index
+        self.recognize = recognize
+        self.should_upload = should_upload
+        self.upload = upload
+        self.recognition_interval = recognition_interval  # Minimum seconds between recognized frames
+        self.upload_queue = queue.Queue(maxsize=upload_queue_size)
+
+        self.capture_stats = StageStats("capture")
+        self.frames = LatestFrame(self.capture_stats)
+        self.capture_stats.depth = lambda: len(self.frames)
+        self.recognition_stats = StageStats("recognition", lambda: len(self.frames))
+        self.upload_stats = StageStats("upload", self.upload_queue.qsize)
+
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        self.frames.closed = False
+        targets = [("vision-capture", self.capture_loop), ("vision-recognize", self.recognition_loop),
+                   ("vision-upload", self.upload_loop)]
+        self.threads = [threading.Thread(target=target, name=name, daemon=True) for name, target in targets]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        self.running = False
+        self.frames.close()
+        put_latest(self.upload_queue, None, StageStats("shutdown"))  # Wakes the uploader
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self.threads = []
+
+    def capture_loop(self):
+        cap = cv2.VideoCapture(self.camera_index)
+        try:
+            while self.running:
+                started = time.monotonic()
+                ret, frame = cap.read()
+                if not ret:
+                    self.capture_stats.error()
+                    time.sleep(0.1)
+                    continue
+                self.capture_stats.record(time.monotonic() - started)
+                self.frames.put(frame, time.monotonic())
+        finally:
+            cap.release()
+
+    def recognition_loop(self):
+        while self.running:
+            frame, captured_at = self.frames.take(timeout=0.5)
+            if frame is None:
+                continue
+            started = time.monotonic()
+            try:
+                result = self.recognize(frame)
+            except Exception as e:
+                self.recognition_stats.error()
+                print(f"Face recognition failed: {e}")
+                continue
+            # Latency is measured from capture so time spent waiting for the recognizer is included
+            self.recognition_stats.record(time.monotonic() - captured_at)
+            if self.should_upload(frame, result, time.monotonic()):
+                put_latest(self.upload_queue, (frame, result, captured_at), self.upload_stats)
+            time.sleep(max(0.0, self.recognition_interval - (time.monotonic() - started)))
+
+    def upload_loop(self):
+        while self.running:
+            item = self.upload_queue.get()
+            if item is None:
+                continue
+            frame, result, captured_at = item
+            try:
+                self.upload(frame, result)
+                self.upload_stats.record(time.monotonic() - captured_at)
+            except Exception as e:
+                self.upload_stats.error()
+                print(f"Vision upload failed: {e}")
+
+    def get_stats(self):
+        return {stats.name: stats.snapshot() for stats in (self.capture_stats, self.recognition_stats, self.upload_stats)}
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+
+VisionEntry = namedtuple("VisionEntry", ["timestamp", "description", "faces"])
+
+
+class VisionState:
+    """
+    Thread-safe, in-memory history of vision results (a bounded ring buffer). Reads never touch the
+    disk; persistence is optional and appended in batches. The newest entries are read back on startup,
+    and once the file passes `max_file_bytes` it is rewritten with just the buffered ones.
+    """
+
+    def __init__(self, capacity=256, persist_path=None, flush_every=10, flush_interval=30.0, max_file_bytes=4_000_000):
+        self.entries = deque(maxlen=capacity)
+        self.condition = threading.Condition()
+        self.sequence = 0  # Number of results ever published; lets readers wait for a newer one
+        self.persist_path = persist_path
+        self.flush_every = flush_every  # Unwritten entries that trigger a flush
+        self.flush_interval = flush_interval  # Seconds after which unwritten entries are flushed anyway
+        self.unwritten = []
+        self.last_flush = time.monotonic()
+        self.write_lock = threading.Lock()  # Keeps concurrent flushes in publish order
+        self.max_file_bytes = max_file_bytes
+        if persist_path:
+            self.load()
+
+    def load(self):
+        """Fills the buffer with the newest entries of the history file."""
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                entry = VisionEntry(**json.loads(line))
+            except (ValueError, TypeError):
+                continue  # A torn or foreign line
+            self.entries.append(entry)
+        if self.entries:
+            self.sequence = len(self.entries)
+
+    def publish(self, description, faces=(), timestamp=None):
+        """Adds a result and wakes every reader waiting for one."""
+        names = [face[0] if isinstance(face, tuple) else face for face in faces or ()]
+        entry = VisionEntry(time.time() if timestamp is None else timestamp, description, names)
+        with self.condition:
+            self.entries.append(entry)
+            self.sequence += 1
+            self.condition.notify_all()
+            if self.persist_path:
+                self.unwritten.append(entry)
+                due = len(self.unwritten) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval
+            else:
+                due = False
+        if due:
+            self.flush()
+        return entry
+
+    def latest(self):
+        with self.condition:
+            return self.entries[-1] if self.entries else None
+
+    def query(self, since=None, until=None, limit=None):
+        """Entries with since <= timestamp <= until, oldest first; `limit` keeps the newest ones."""
+        with self.condition:
+            entries = [
+                entry for entry in self.entries
+                if (since is None or entry.timestamp >= since) and (until is None or entry.timestamp <= until)
+            ]
+        return entries[-limit:] if limit else entries
+
+    def wait_for_next(self, timeout=None):
+        """Blocks until a result newer than the current one is published; returns it, or None on timeout."""
+        with self.condition:
+            seen = self.sequence
+            if not self.condition.wait_for(lambda: self.sequence > seen, timeout):
+                return None
+            return self.entries[-1]
+
+    def flush(self):
+        """Appends unwritten entries to the history file in one write."""
+        with self.write_lock:
+            with self.condition:
+                entries, self.unwritten = self.unwritten, []
+                self.last_flush = time.monotonic()
+            if not entries or not self.persist_path:
+                return
+            data = "".join(json.dumps(entry._asdict(), ensure_ascii=False) + "\n" for entry in entries)
+            try:
+                directory = os.path.dirname(self.persist_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.persist_path, "a", encoding="utf-8") as file:
+                    file.write(data)
+                    size = file.tell()
+                if size > self.max_file_bytes:
+                    self._compact()
+            except OSError as e:
+                print(f"Could not persist vision history: {e}")
+
+    def _compact(self):
+        """Rewrites the history file with only the buffered entries (temp file + rename)."""
+        with self.condition:
+            entries = list(self.entries)[:len(self.entries) - len(self.unwritten)]  # The rest is written by the next flush
+        directory = os.path.dirname(self.persist_path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write("".join(json.dumps(entry._asdict(), ensure_ascii=False) + "\n" for entry in entries))
+            os.replace(temp_path, self.persist_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __len__(self):
+        with self.condition:
+            return len(self.entries)
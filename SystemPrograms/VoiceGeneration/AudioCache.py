@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
+CACHE_DIR = os.path.join(BASE_PATH, "SystemFiles", "temp", "tts_cache")
+
+
+def audio_key(text, voice_id, model_id, voice_settings, output_format):
+    """Content address of one utterance: everything that changes the audio that comes back."""
+    material = json.dumps([text.strip(), voice_id, model_id, voice_settings, output_format], sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Two-tier LRU cache of synthesized PCM: decoded bytes in memory, raw .pcm files on disk, both bounded by size."""
+
+    def __init__(self, directory=CACHE_DIR, max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=128 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()  # key -> PCM bytes
+        self.memory_bytes = 0
+        self.disk = OrderedDict()  # key -> size, least recently used first
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "audio_seconds_saved": 0.0}
+        os.makedirs(self.directory, exist_ok=True)
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".pcm")]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self.disk[entry.name[:-4]] = entry.stat().st_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def get(self, key, bytes_per_second=None):
+        """Returns cached PCM or None."""
+        with self.lock:
+            pcm = self.memory.get(key)
+            if pcm is not None:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+            elif key in self.disk:
+                try:
+                    with open(self._path(key), "rb") as f:
+                        pcm = f.read()
+                except OSError:
+                    self._remove_disk(key)
+                else:
+                    self.disk.move_to_end(key)
+                    os.utime(self._path(key))  # Keeps the on-disk order right across restarts
+                    self._put_memory(key, pcm)
+                    self.stats["disk_hits"] += 1
+            if pcm is None:
+                self.stats["misses"] += 1
+            elif bytes_per_second:
+                self.stats["audio_seconds_saved"] += len(pcm) / bytes_per_second
+            return pcm
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.memory or key in self.disk
+
+    def put(self, key, pcm):
+        if not pcm:
+            return
+        with self.lock:
+            self._put_memory(key, pcm)
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(pcm)
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Could not write audio cache entry: {e}")
+                return
+            self.disk[key] = len(pcm)
+            self.disk.move_to_end(key)
+            total = sum(self.disk.values())
+            while total > self.max_disk_bytes and len(self.disk) > 1:
+                oldest = next(iter(self.disk))
+                total -= self.disk[oldest]
+                self._remove_disk(oldest)
+
+    def _put_memory(self, key, pcm):
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        self.memory[key] = pcm
+        self.memory_bytes += len(pcm)
+        while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def _remove_disk(self, key):
+        self.disk.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get_stats(self):
+        with self.lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return dict(self.stats, hit_rate=hits / lookups if lookups else 0.0, memory_bytes=self.memory_bytes,
+                        disk_bytes=sum(self.disk.values()), entries=len(self.disk))
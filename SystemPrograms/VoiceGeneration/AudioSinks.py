@@ -0,0 +1,130 @@
+import shutil
+import subprocess
+import threading
+import time
+
+try:
+    import pyaudio
+except ImportError:  # Optional; ffplay or the null sink are used instead
+    pyaudio = None
+
+SAMPLE_WIDTH = 2  # 16-bit signed little-endian PCM, as ElevenLabs returns for pcm_* formats
+CHANNELS = 1
+
+
+class AudioSink:
+    """Plays raw PCM as it is written. write() may block to pace playback; abort() stops at once."""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.first_write = None  # perf_counter() of the first audio handed to the device
+        self.bytes_written = 0
+
+    def write(self, pcm):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.bytes_written += len(pcm)
+        self._write(pcm)
+
+    def _write(self, pcm):
+        raise NotImplementedError
+
+    def close(self):
+        """Waits for queued audio to finish, then releases the device."""
+
+    def abort(self):
+        """Stops playback immediately, dropping anything still queued."""
+
+    def duration(self):
+        return self.bytes_written / (self.sample_rate * SAMPLE_WIDTH * CHANNELS)
+
+
+class PyAudioSink(AudioSink):
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(format=pyaudio.paInt16, channels=CHANNELS, rate=sample_rate, output=True)
+        self.lock = threading.Lock()
+        self.aborted = False
+
+    def _write(self, pcm):
+        with self.lock:
+            if not self.aborted:
+                self.stream.write(pcm)  # Blocks while the device buffer is full
+
+    def close(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.stop_stream()
+                self.stream.close()
+                self.audio.terminate()
+                self.stream = None
+
+    def abort(self):
+        # PortAudio streams are not safe to stop from another thread mid-write, so this waits for the
+        # current chunk (a few ms of audio) to be accepted; later writes are skipped
+        self.aborted = True
+        self.close()
+
+
+class FFplaySink(AudioSink):
+    """Pipes PCM into ffplay; used when PyAudio is not installed."""
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        # -ac rather than -ch_layout, which needs ffmpeg 5.1 or newer
+        self.process = subprocess.Popen(
+            ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error",
+             "-f", "s16le", "-ar", str(sample_rate), "-ac", str(CHANNELS), "-i", "pipe:0"],
+            stdin=subprocess.PIPE,
+        )
+        self.aborted = False
+
+    def _write(self, pcm):
+        try:
+            self.process.stdin.write(pcm)
+        except (BrokenPipeError, ValueError):
+            if self.aborted:
+                return
+            self.process.wait()
+            raise OSError(f"ffplay exited with code {self.process.returncode}")
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        self.process.wait()
+
+    def abort(self):
+        self.aborted = True
+        self.process.kill()
+        self.close()
+
+
+class NullSink(AudioSink):
+    """Discards audio. With realtime=True, write() sleeps for the audio's duration like a device would."""
+
+    def __init__(self, sample_rate, realtime=False):
+        super().__init__(sample_rate)
+        self.realtime = realtime
+        self.aborted = threading.Event()
+        self.chunks = 0
+
+    def _write(self, pcm):
+        self.chunks += 1
+        if self.realtime:
+            self.aborted.wait(len(pcm) / (self.sample_rate * SAMPLE_WIDTH * CHANNELS))
+
+    def abort(self):
+        self.aborted.set()
+
+
+def default_sink(sample_rate):
+    """PyAudio if installed, else ffplay if on PATH, else a null sink."""
+    if pyaudio is not None:
+        return PyAudioSink(sample_rate)
+    if shutil.which("ffplay"):
+        return FFplaySink(sample_rate)
+    print("No audio output available (install pyaudio or ffmpeg); speech will be silent.")
+    return NullSink(sample_rate)
@@ -1,20 +1,30 @@
+import asyncio
 import requests
 import os
 import json
+import sys
+import threading
+import time
 from pathlib import Path
 from pydub import AudioSegment
 from pydub.playback import play
+from SystemPrograms.NetworkClient.HTTPClient import get_shared_client
+from SystemPrograms.NetworkClient.AsyncHTTPClient import get_shared_async_client
+from SystemPrograms.VoiceGeneration.AudioCache import AudioCache, audio_key
+from SystemPrograms.VoiceGeneration.AudioSinks import NullSink, default_sink
 
-# WiFi Check Integration
-from SystemPrograms.CheckInternet.ManageWIFI import CheckWIFI
-manageWiFi = CheckWIFI()
-wifi_connected = manageWiFi.get_wifi_status()
+# Connectivity is probed in the background; checks read a cached flag
+from SystemPrograms.CheckInternet.ConnectivityMonitor import get_connectivity_monitor
+connectivity = get_connectivity_monitor()
 
 BASE_PATH = Path(__file__).resolve().parents[2]  # Moves up three levels
 SYSTEM_FILES_PATH = os.path.join(BASE_PATH, "SystemFiles")
+ELEVENLABS_URL = "https://api.elevenlabs.io"
+STREAM_FORMAT = "pcm_22050"  # Raw 16-bit mono PCM: playable chunk by chunk, nothing to decode
 
 class Voice:
-    def __init__(self, output_path="SystemFiles/temp/output.mp3", chunk_size=1024):
+    def __init__(self, output_path="SystemFiles/temp/output.mp3", chunk_size=1024, api_base=ELEVENLABS_URL,
+                 stream_format=STREAM_FORMAT, sink_factory=default_sink, use_audio_cache=True):
         # Load API key and voice ID from tokens.json using ReadConfigs
         tokens_path = os.path.join(SYSTEM_FILES_PATH, "tokens.json")
 
@@ -22,11 +32,21 @@ class Voice:
         self.output_path = output_path
         self.wav_path = "SystemFiles/temp/output.wav"  # Path for the converted wav file
         self.chunk_size = chunk_size
-        self.tts_url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/stream"
+        self.tts_url = f"{api_base}/v1/text-to-speech/{self.voice_id}/stream"
+        connectivity.add_endpoint(api_base)
+        self.http = get_shared_client()
+        self.ahttp = get_shared_async_client()
         self.headers = {
             "Accept": "application/json",
             "xi-api-key": self.api_key
         }
+        self.stream_format = stream_format
+        self.sample_rate = int(stream_format.split("_")[1])
+        self.sink_factory = sink_factory  # callable(sample_rate) -> AudioSink
+        self.cancel_event = threading.Event()
+        self.active_sink = None
+        self.metrics = {"time_to_first_byte": None, "time_to_first_audio": None, "total_time": None, "audio_seconds": 0.0, "cached": False}
+        self.audio_cache = AudioCache() if use_audio_cache else None
 
     def _load_api_details(self, tokens_path):
         """Load API key and VoiceID from the specified JSON config file."""
@@ -48,11 +68,50 @@ class Voice:
             print("API key or VoiceID missing. Please check your configuration.")
             return
         
-        if not wifi_connected:
-            print("No WiFi Connection")
+        if not connectivity.is_online():
+            print("No Internet Connection")
             return
         
-        data = {
+        data = self.build_request(text, model_id, stability, similarity_boost, style, use_speaker_boost)
+
+        try:
+            with self.http.post(self.tts_url, headers=self.headers, json=data, stream=True) as response:
+                if response.ok:
+                    self._save_audio_stream(response)
+                    print("Audio stream saved successfully.")
+                else:
+                    print(f"Failed to generate audio: {response.status_code}, {response.text}")
+
+        except requests.exceptions.RequestException as e:
+            print(f"An error occurred while making the request: {str(e)}")
+
+    async def agenerate_audio(self, text, model_id="eleven_multilingual_v2", stability=1.0, similarity_boost=0.8, style=0.0, use_speaker_boost=True):
+        """
+        Awaitable generate_audio: the request is awaited and the file is written in a worker thread.
+        """
+        if not self.api_key or not self.voice_id:
+            print("API key or VoiceID missing. Please check your configuration.")
+            return
+
+        if not connectivity.is_online():
+            print("No Internet Connection")
+            return
+
+        data = self.build_request(text, model_id, stability, similarity_boost, style, use_speaker_boost)
+
+        try:
+            response = await self.ahttp.post(self.tts_url, headers=self.headers, json=data)
+            if response.ok:
+                await asyncio.to_thread(self._save_audio_bytes, response.content)
+                print("Audio stream saved successfully.")
+            else:
+                print(f"Failed to generate audio: {response.status_code}, {response.text}")
+
+        except requests.exceptions.RequestException as e:
+            print(f"An error occurred while making the request: {str(e)}")
+
+    def build_request(self, text, model_id="eleven_multilingual_v2", stability=1.0, similarity_boost=0.8, style=0.0, use_speaker_boost=True):
+        return {
             "text": text,
             "model_id": model_id,
             "voice_settings": {
@@ -63,16 +122,128 @@ class Voice:
             }
         }
 
-        try:
-            response = requests.post(self.tts_url, headers=self.headers, json=data, stream=True)
-            if response.ok:
-                self._save_audio_stream(response)
-                print("Audio stream saved successfully.")
-            else:
-                print(f"Failed to generate audio: {response.status_code}, {response.text}")
+    def stream_audio(self, text, cancel_event=None, **voice_options):
+        """
+        Yields raw PCM chunks (16-bit mono at self.sample_rate) as they arrive from ElevenLabs.
+        Stops early, closing the connection, when cancel() (or the given event) is set.
+        """
+        cancel_event = cancel_event or self.cancel_event
+        if not self.api_key or not self.voice_id:
+            print("API key or VoiceID missing. Please check your configuration.")
+            return
+        if not connectivity.is_online():
+            print("No Internet Connection")
+            return
 
+        try:
+            response = self.http.post(self.tts_url, headers=self.headers, params={"output_format": self.stream_format},
+                                      json=self.build_request(text, **voice_options), stream=True)
         except requests.exceptions.RequestException as e:
             print(f"An error occurred while making the request: {str(e)}")
+            return
+
+        with response:
+            if not response.ok:
+                print(f"Failed to generate audio: {response.status_code}, {response.text}")
+                return
+            leftover = b""  # Chunks can split a sample; carry the odd byte over
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if cancel_event.is_set():
+                    return
+                if not chunk:
+                    continue
+                chunk = leftover + chunk
+                usable = len(chunk) - len(chunk) % 2
+                leftover = chunk[usable:]
+                if usable:
+                    yield chunk[:usable]
+
+    def cache_key(self, text, **voice_options):
+        data = self.build_request(text, **voice_options)
+        return audio_key(text, self.voice_id, data["model_id"], data["voice_settings"], self.stream_format)
+
+    def iter_cached(self, pcm):
+        """Replays cached PCM in chunks so it can be cancelled like a live stream."""
+        step = self.chunk_size * 4
+        for start in range(0, len(pcm), step):
+            yield pcm[start:start + step]
+
+    def speak_streaming(self, text, sink=None, **voice_options):
+        """
+        Plays speech while it is still being generated (or straight from the audio cache).
+        Returns True if it played to the end, False if it was cancelled or failed. Timings are kept in self.metrics.
+        """
+        self.cancel_event.clear()
+        self.metrics.update(time_to_first_byte=None, time_to_first_audio=None, total_time=None, audio_seconds=0.0, cached=False)
+        started = time.perf_counter()
+        key = self.cache_key(text, **voice_options) if self.audio_cache else None
+        cached = self.audio_cache.get(key, self.sample_rate * 2) if key else None
+        self.metrics["cached"] = cached is not None
+        chunks = self.iter_cached(cached) if cached is not None else self.stream_audio(text, **voice_options)
+        received = [] if key and cached is None else None  # A completed live stream is cached for next time
+
+        sink = sink or self.sink_factory(self.sample_rate)
+        self.active_sink = sink
+        completed = False
+        try:
+            for pcm in chunks:
+                if self.metrics["time_to_first_byte"] is None:
+                    self.metrics["time_to_first_byte"] = time.perf_counter() - started
+                if received is not None:
+                    received.append(pcm)
+                sink.write(pcm)
+                if self.metrics["time_to_first_audio"] is None:
+                    self.metrics["time_to_first_audio"] = sink.first_write - started
+                if self.cancel_event.is_set():
+                    break
+            completed = not self.cancel_event.is_set() and sink.bytes_written > 0
+            if completed and received:
+                self.audio_cache.put(key, b"".join(received))
+        except OSError as e:
+            if not self.cancel_event.is_set():
+                print(f"Audio playback failed: {e}")
+        finally:
+            if self.cancel_event.is_set():
+                sink.abort()
+            else:
+                sink.close()
+            self.active_sink = None
+            self.metrics["total_time"] = time.perf_counter() - started
+            self.metrics["audio_seconds"] = sink.duration()
+        return completed
+
+    def prewarm(self, phrases, background=True, **voice_options):
+        """Synthesizes and caches phrases that are not cached yet (greetings, acknowledgements, errors)."""
+        if not self.audio_cache:
+            return None
+
+        def warm():
+            stop = threading.Event()  # Independent of cancel(), which only targets live speech
+            for phrase in phrases:
+                key = self.cache_key(phrase, **voice_options)
+                if key in self.audio_cache:
+                    continue
+                try:
+                    self.audio_cache.put(key, b"".join(self.stream_audio(phrase, cancel_event=stop, **voice_options)))
+                except requests.exceptions.RequestException as e:
+                    print(f"Could not prewarm '{phrase}': {e}")
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def get_cache_stats(self):
+        return self.audio_cache.get_stats() if self.audio_cache else {}
+
+    def cancel(self):
+        """Stops the current streaming utterance mid-sentence (safe to call from any thread)."""
+        self.cancel_event.set()
+        sink = self.active_sink
+        if sink is not None:
+            sink.abort()
 
     def _save_audio_stream(self, response):
         """Save the audio stream to the specified output path."""
@@ -81,6 +252,10 @@ class Voice:
                 if chunk:
                     f.write(chunk)
 
+    def _save_audio_bytes(self, content):
+        with open(self.output_path, "wb") as f:
+            f.write(content)
+
     def play_audio(self):
         """Play the generated audio file as a .wav file and delete the .mp3 afterward."""
         if os.path.exists(self.output_path):
@@ -98,4 +273,75 @@ class Voice:
             except Exception as e:
                 print(f"Failed to play the audio: {str(e)}")
         else:
-            print(f"Audio file {self.output_path} not found. Please generate it first.")
\ No newline at end of file
+            print(f"Audio file {self.output_path} not found. Please generate it first.")
+
+def benchmark_streaming(audio_seconds=3.0, first_chunk_delay=0.3, chunk_interval=0.05):
+    """
+    Time to first audio, streaming vs. download-then-play vs. a cached phrase, against a local stand-in that
+    generates PCM at a steady rate after an initial delay (like the real service).
+    """
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    sample_rate = int(STREAM_FORMAT.split("_")[1])
+    total_bytes = int(audio_seconds * sample_rate) * 2
+    chunk_count = 20
+    chunk = b"\x00\x01" * (total_bytes // chunk_count // 2)
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/pcm")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(first_chunk_delay)
+            try:
+                for i in range(chunk_count):
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    self.wfile.flush()
+                    time.sleep(chunk_interval)
+                self.wfile.write(b"0\r\n\r\n")
+            except ConnectionError:
+                pass  # The client cancelled
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    voice = Voice(chunk_size=4096, use_audio_cache=False)
+    voice.api_key, voice.voice_id = voice.api_key or "test", voice.voice_id or "test"
+    voice.tts_url = f"http://127.0.0.1:{server.server_address[1]}/v1/text-to-speech/{voice.voice_id}/stream"
+    connectivity.add_endpoint(voice.tts_url)
+
+    started = time.perf_counter()
+    downloaded = b"".join(voice.stream_audio("Hello there!"))
+    download_all = time.perf_counter() - started
+    print(f"download then play: first audio after {download_all * 1000:.0f} ms (+ decode and file round trip)")
+
+    voice.speak_streaming("Hello there!", sink=NullSink(sample_rate, realtime=True))
+    print(f"streaming:          first audio after {voice.metrics['time_to_first_audio'] * 1000:.0f} ms | "
+          f"{voice.metrics['audio_seconds']:.2f}s of audio in {voice.metrics['total_time']:.2f}s")
+
+    timer = threading.Timer(0.6, voice.cancel)
+    timer.start()
+    completed = voice.speak_streaming("Hello there!", sink=NullSink(sample_rate, realtime=True))
+    print(f"cancel after 600 ms: completed={completed}, stopped after {voice.metrics['total_time'] * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        voice.audio_cache = AudioCache(cache_dir)
+        voice.prewarm(["One moment."], background=False)
+        voice.speak_streaming("One moment.", sink=NullSink(sample_rate))
+        print(f"cached phrase:      first audio after {voice.metrics['time_to_first_audio'] * 1000:.1f} ms | "
+              f"hit rate {voice.get_cache_stats()['hit_rate']:.0%}")
+    assert len(downloaded) == total_bytes // chunk_count // 2 * 2 * chunk_count
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_streaming()
@@ -0,0 +1,346 @@
+import queue
+import sys
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit mono PCM throughout
+FRAME_MS = 30
+
+
+def frame_energy(pcm):
+    """RMS of a 16-bit PCM frame."""
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detection with an adaptive noise floor. The floor is calibrated from the
+    first frames, then follows the background level whenever nobody is speaking. An utterance that runs
+    to `max_utterance_s` usually means the background got louder than the threshold, so the floor is
+    calibrated again afterwards.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, threshold_ratio=3.0, min_energy=150.0,
+                 calibration_ms=300, adapt_rate=0.05, start_ms=90, hangover_ms=450, pre_roll_ms=300, max_utterance_s=15.0):
+        self.frame_ms = frame_ms
+        self.threshold_ratio = threshold_ratio  # Speech is this many times louder than the noise floor
+        self.min_energy = min_energy
+        self.adapt_rate = adapt_rate
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.start_frames = max(1, start_ms // frame_ms)  # Loud frames in a row that start an utterance
+        self.hangover_frames = max(1, hangover_ms // frame_ms)  # Quiet frames in a row that end it
+        self.max_frames = int(max_utterance_s * 1000 // frame_ms)
+        self.noise_floor = None
+        self.calibration = []
+        self.pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms) + self.start_frames)  # Keeps the first syllable
+        self.frames = []
+        self.speaking = False
+        self.loud_run = 0
+        self.quiet_run = 0
+        self.last_voiced = None
+        self.recalibrations = 0
+
+    @property
+    def threshold(self):
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.threshold_ratio)
+
+    def process(self, pcm, timestamp):
+        """
+        Feeds one frame captured at `timestamp`. Returns ("start", None) when speech begins,
+        ("end", (pcm, last_voiced_timestamp)) when an utterance is complete, else None.
+        """
+        energy = frame_energy(pcm)
+        if self.noise_floor is None:
+            self.calibration.append(energy)
+            self.pre_roll.append(pcm)
+            if len(self.calibration) >= self.calibration_frames:
+                self.noise_floor = float(np.median(self.calibration))
+            return None
+
+        voiced = energy > self.threshold
+        if not self.speaking:
+            self.pre_roll.append(pcm)
+            if voiced:
+                self.loud_run += 1
+                self.last_voiced = timestamp
+                if self.loud_run >= self.start_frames:
+                    self.speaking = True
+                    self.quiet_run = 0
+                    self.frames = list(self.pre_roll)
+                    self.pre_roll.clear()
+                    return "start", None
+            else:
+                self.loud_run = 0
+                self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+            return None
+
+        self.frames.append(pcm)
+        if voiced:
+            self.quiet_run = 0
+            self.last_voiced = timestamp
+        else:
+            self.quiet_run += 1
+        too_long = len(self.frames) >= self.max_frames
+        if self.quiet_run >= self.hangover_frames or too_long:
+            utterance = b"".join(self.frames[:len(self.frames) - self.quiet_run] or self.frames)
+            self.speaking = False
+            self.loud_run = 0
+            self.frames = []
+            if too_long:
+                # A floor that only adapts on unvoiced frames can never catch up with rising noise
+                self.noise_floor, self.calibration = None, []
+                self.recalibrations += 1
+            return "end", (utterance, self.last_voiced)
+        return None
+
+    def flush(self):
+        """Ends an utterance that is still open (the source ran out mid-speech); returns its payload or None."""
+        if not self.speaking:
+            return None
+        self.speaking = False
+        utterance, self.frames = b"".join(self.frames), []
+        return utterance, self.last_voiced
+
+
+class Resampler:
+    """Streaming linear-interpolation resampler for 16-bit mono PCM; keeps its phase across chunks."""
+
+    def __init__(self, input_rate, output_rate):
+        self.step = input_rate / output_rate
+        self.pending = np.zeros(0, dtype=np.float32)  # Input samples still needed for interpolation
+        self.position = 0.0  # Of the next output sample, in `pending` samples
+
+    def process(self, pcm):
+        samples = np.concatenate([self.pending, np.frombuffer(pcm, dtype=np.int16).astype(np.float32)])
+        if len(samples) < 2 or self.position > len(samples) - 1:
+            self.pending = samples
+            return b""
+        count = int((len(samples) - 1 - self.position) // self.step) + 1
+        positions = self.position + self.step * np.arange(count)
+        output = np.interp(positions, np.arange(len(samples)), samples)
+        next_position = self.position + self.step * count
+        consumed = int(next_position)
+        self.pending, self.position = samples[consumed:], next_position - consumed
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16).tobytes()
+
+
+class MicrophoneSource:
+    """
+    Fixed-size 16 kHz PCM frames from the default microphone. Many devices reject 16 kHz, so audio
+    is captured at the device's native rate and resampled.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, device_index=None):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.microphone = sr.Microphone(device_index=device_index)  # Native rate
+        self.microphone.CHUNK = max(1, self.microphone.SAMPLE_RATE * frame_ms // 1000)
+        self.resampler = Resampler(self.microphone.SAMPLE_RATE, sample_rate) if self.microphone.SAMPLE_RATE != sample_rate else None
+
+    def frames(self, stop_event):
+        frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        buffered = b""
+        with self.microphone as source:
+            while not stop_event.is_set():
+                pcm = source.stream.read(source.CHUNK)
+                if self.resampler is None:
+                    yield pcm
+                    continue
+                buffered += self.resampler.process(pcm)
+                while len(buffered) >= frame_bytes:
+                    yield buffered[:frame_bytes]
+                    buffered = buffered[frame_bytes:]
+
+
+class WavFileSource:
+    """Frames from a 16-bit WAV file, for tests and benchmarks. realtime=True paces reads like a microphone."""
+
+    def __init__(self, path, frame_ms=FRAME_MS, realtime=False):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: expected 16-bit PCM")
+            self.sample_rate = wav.getframerate()
+            self.channels = wav.getnchannels()
+
+    def frames(self, stop_event):
+        frame_samples = self.sample_rate * self.frame_ms // 1000
+        started = time.perf_counter()
+        with wave.open(self.path, "rb") as wav:
+            for index in range(wav.getnframes() // frame_samples):
+                if stop_event.is_set():
+                    return
+                pcm = wav.readframes(frame_samples)
+                if self.channels > 1:
+                    samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.channels)
+                    pcm = samples.mean(axis=1).astype(np.int16).tobytes()
+                if self.realtime:
+                    time.sleep(max(0.0, started + (index + 1) * self.frame_ms / 1000 - time.perf_counter()))
+                yield pcm
+
+
+class ContinuousListener:
+    """
+    Listens without pausing: a capture thread segments speech with the VAD and queues each utterance
+    for a recognition thread, so decoding never blocks the microphone.
+    """
+
+    def __init__(self, source=None, recognize=None, on_transcript=None, on_speech_start=None, vad=None, queue_size=8):
+        self.source = source or MicrophoneSource()
+        self.recognizer = sr.Recognizer()
+        self.recognize = recognize or self.recognize_sphinx  # callable(sr.AudioData) -> text or None
+        self.on_transcript = on_transcript  # callable(text, latency_seconds)
+        self.on_speech_start = on_speech_start  # callable(), e.g. to stop speech playback (barge-in)
+        self.vad = vad or EnergyVAD(self.source.sample_rate)
+        self.utterances = queue.Queue(maxsize=queue_size)
+        self.transcripts = queue.Queue()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.stats = {"utterances": 0, "dropped": 0, "transcripts": 0, "latencies": deque(maxlen=200)}
+
+    def recognize_sphinx(self, audio):
+        try:
+            return self.recognizer.recognize_sphinx(audio)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"Could not request results; {e}")
+            return None
+
+    def start(self):
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self._capture_loop, daemon=True),
+            threading.Thread(target=self._recognition_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """Blocks until the source runs out (WAV files) and every utterance has been recognized."""
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def _capture_loop(self):
+        try:
+            for pcm in self.source.frames(self.stop_event):
+                event = self.vad.process(pcm, time.perf_counter())
+                if event is None:
+                    continue
+                kind, payload = event
+                if kind == "start":
+                    if self.on_speech_start:
+                        self.on_speech_start()
+                    continue
+                self.stats["utterances"] += 1
+                try:
+                    self.utterances.put_nowait(payload)
+                except queue.Full:
+                    self.stats["dropped"] += 1  # Recognition fell behind; never stall capture
+            remaining = self.vad.flush()
+            if remaining:
+                self.stats["utterances"] += 1
+                self.utterances.put(remaining)
+        except OSError as e:
+            print(f"Audio capture failed: {e}")
+        finally:
+            self.utterances.put(None)
+
+    def _recognition_loop(self):
+        while True:
+            item = self.utterances.get()
+            if item is None:
+                return
+            pcm, speech_ended = item
+            text = self.recognize(sr.AudioData(pcm, self.source.sample_rate, SAMPLE_WIDTH))
+            latency = time.perf_counter() - speech_ended
+            self.stats["latencies"].append(latency)
+            if not text:
+                continue
+            self.stats["transcripts"] += 1
+            self.transcripts.put((text, latency))
+            if self.on_transcript:
+                self.on_transcript(text, latency)
+
+    def get_transcript(self, timeout=None):
+        """Next (text, latency) pair, or None on timeout."""
+        try:
+            return self.transcripts.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_stats(self):
+        latencies = sorted(self.stats["latencies"])
+        return {
+            "utterances": self.stats["utterances"],
+            "dropped": self.stats["dropped"],
+            "transcripts": self.stats["transcripts"],
+            "noise_floor": self.vad.noise_floor,
+            "recalibrations": self.vad.recalibrations,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+            "latency_p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+        }
+
+
+def synthetic_wav(path, sample_rate=SAMPLE_RATE, bursts=3, speech_s=1.0, silence_s=1.0, noise=60, seed=0):
+    """Background noise with `bursts` voiced tone bursts, written as a 16-bit mono WAV."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(bursts):
+        parts.append(rng.normal(0, noise, int(silence_s * sample_rate)))
+        t = np.arange(int(speech_s * sample_rate)) / sample_rate
+        parts.append(3000 * np.sin(2 * np.pi * 180 * t) * (1 + np.sin(2 * np.pi * 3 * t)) / 2 + rng.normal(0, noise, t.size))
+    parts.append(rng.normal(0, noise, int(silence_s * sample_rate)))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16).tobytes())
+
+
+def benchmark_listener(path=None, decode_seconds=0.3):
+    """Segments a WAV file in real time with a stand-in decoder and reports end-of-speech -> transcript latency."""
+    import os
+    import tempfile
+
+    temp_path = None
+    if path is None:
+        temp_path = os.path.join(tempfile.mkdtemp(), "speech.wav")
+        synthetic_wav(temp_path)
+    def stand_in_decoder(audio):
+        time.sleep(decode_seconds)
+        return f"<{len(audio.frame_data) / (audio.sample_rate * SAMPLE_WIDTH):.2f}s of speech>"
+
+    recognize = stand_in_decoder if decode_seconds is not None else None
+    starts = []
+    listener = ContinuousListener(WavFileSource(path or temp_path, realtime=True), recognize=recognize,
+                                  on_speech_start=lambda: starts.append(time.perf_counter()),
+                                  on_transcript=lambda text, latency: print(f"{text} (+{latency * 1000:.0f} ms)"))
+    listener.start().wait()
+    stats = listener.get_stats()
+    print(f"{stats['utterances']} utterances, {stats['dropped']} dropped, noise floor {stats['noise_floor']:.0f} | "
+          f"end of speech -> transcript: mean {stats['latency_mean'] * 1000:.0f} ms, p95 {stats['latency_p95'] * 1000:.0f} ms "
+          f"(hangover {listener.vad.hangover_frames * listener.vad.frame_ms} ms + decode)")
+    if temp_path:
+        os.remove(temp_path)
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        args = [arg for arg in sys.argv[1:] if arg != "--benchmark"]
+        benchmark_listener(args[0] if args else None, decode_seconds=None if args else 0.3)
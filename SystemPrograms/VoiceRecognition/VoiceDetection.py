@@ -1,14 +1,19 @@
 import speech_recognition as sr
+from SystemPrograms.VoiceRecognition.ContinuousListener import ContinuousListener, MicrophoneSource
 
 class SpeechRecognizer:
     def __init__(self):
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
+        self.calibrated = False  # Ambient noise is measured once; dynamic_energy_threshold keeps it current
+        self.listener = None
 
     def recognize_speech(self):
         with self.microphone as source:
-            print("Adjusting for ambient noise... Please wait.")
-            self.recognizer.adjust_for_ambient_noise(source)
+            if not self.calibrated:
+                print("Adjusting for ambient noise... Please wait.")
+                self.recognizer.adjust_for_ambient_noise(source)
+                self.calibrated = True
             print("Listening...")
             try:
                 audio = self.recognizer.listen(source, timeout=5)
@@ -26,6 +31,22 @@ class SpeechRecognizer:
                 print(f"Could not request results; {e}")
         return None
 
+    def listen_continuously(self, on_transcript=None, on_speech_start=None, source=None):
+        """
+        Starts background listening: utterances are segmented as they happen and recognized on a
+        separate thread. Transcripts go to on_transcript(text, latency) and self.listener.get_transcript().
+        """
+        self.stop_listening()
+        self.listener = ContinuousListener(source or MicrophoneSource(), on_transcript=on_transcript,
+                                           on_speech_start=on_speech_start)
+        self.listener.recognizer = self.recognizer
+        return self.listener.start()
+
+    def stop_listening(self):
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
 if __name__ == "__main__":
     print("Starting Speech Recognizer...")
     # recognizer = SpeechRecognizer()
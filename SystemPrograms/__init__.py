@@ -1,4 +1,5 @@
 from SystemPrograms import SystemSetup
+from SystemPrograms import NetworkClient
 from SystemPrograms import TextGeneration
 from SystemPrograms import Vision
 from SystemPrograms import VoiceGeneration
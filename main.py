@@ -1,26 +1,52 @@
 from SystemPrograms.TextGeneration.GenerateText import BaseAI
 from SystemPrograms.Vision.AI_Vision import VisionModel
+from SystemPrograms.Conversation.VoiceConversation import VoiceConversation
+from SystemPrograms.Runtime.AsyncRuntime import AsyncRuntime
+from SystemPrograms.VoiceGeneration.VoiceSynthesis import Voice
 
 from SubprocessTerminal import TerminalManager
 
+import asyncio
 import threading
 import datetime
 import time
+import sys
 
 # setup = TerminalManager()
 # setup.open_terminal()
 
 # Facial Recognition and AI
-toa_v = VisionModel()
+# Continuous face tracking is opt-in; by default faces are recognized once per capture
+toa_v = VisionModel(tracking="--track-faces" in sys.argv)
 toa_b = BaseAI()
 
-# Start the vision processing in a separate thread
-toa_v.start_vision_processing()
+# Start the vision processing in a separate thread (the async runtime runs it as a task instead)
+if "--async" not in sys.argv:
+    toa_v.start_vision_processing()
 
-# Start the BaseAI
-while True:
-    user_message = input("You: ")
-    if user_message.lower() in ["exit", "quit"]:
-        break
-    response = toa_b.chat_with_ai(user_message)
-    print(f"Toa: {response}")
\ No newline at end of file
+# Chat, vision and voice as cooperative tasks on one event loop
+if "--async" in sys.argv:
+    try:
+        asyncio.run(AsyncRuntime(toa_b, vision_model=toa_v, voice=Voice()).run())
+    except KeyboardInterrupt:
+        pass  # The runtime has already cancelled its tasks and shut down
+
+# Talk out loud instead of typing
+elif "--voice" in sys.argv:
+    # Without headphones the mic hears the reply and it would interrupt itself, so barge-in is opt-in
+    conversation = VoiceConversation(toa_b, vision_model=toa_v, barge_in="--barge-in" in sys.argv).start()
+    input("Listening... press Enter to stop.\n")
+    conversation.stop()
+else:
+    # Start the BaseAI
+    while True:
+        user_message = input("You: ")
+        if user_message.lower() in ["exit", "quit"]:
+            break
+        if user_message.startswith("/enroll"):
+            print(toa_v.face_recognizer.enrollment.command(user_message))
+            continue
+        print("Toa: ", end="", flush=True)
+        for token in toa_b.stream_chat_with_ai(user_message, vision_model=toa_v):
+            print(token, end="", flush=True)
+        print()
\ No newline at end of file
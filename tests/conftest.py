@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parents[1]  # The repository root, so SystemPrograms imports as a package
+if str(BASE_PATH) not in sys.path:
+    sys.path.insert(0, str(BASE_PATH))
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from SystemPrograms.TextGeneration import GenerateText
+from SystemPrograms.TextGeneration.ConversationLog import ConversationLog
+from SystemPrograms.TextGeneration.GenerateText import NO_REPLY, BaseAI
+
+
+class FakeConnectivity:
+    def add_endpoint(self, url):
+        pass
+
+    def is_online(self):
+        return True
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, lines=()):
+        self.status_code = status_code
+        self.body = body or {}
+        self.lines = list(lines)
+        self.text = json.dumps(self.body)
+        self.encoding = None
+        self.closed = False
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+    def close(self):
+        self.closed = True
+
+
+class FakeHTTP:
+    """Returns the queued responses (or raises the queued exceptions) in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def post(self, url, **kwargs):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def apost(self, url, **kwargs):
+        return self.post(url, **kwargs)
+
+
+def sse(*tokens):
+    return [f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}" for token in tokens] + ["data: [DONE]"]
+
+
+@pytest.fixture
+def ai(tmp_path, monkeypatch):
+    monkeypatch.setattr(GenerateText, "load_api_key", lambda: "test-key")
+    monkeypatch.setattr(GenerateText, "connectivity", FakeConnectivity())
+    return BaseAI(memory_file=str(tmp_path / "memory.json"), log_file=str(tmp_path / "memory.jsonl"), fsync="never")
+
+
+def use_http(ai, *responses):
+    ai.http = FakeHTTP(*responses)
+    ai.ahttp = type("FakeAsyncHTTP", (), {"post": ai.http.apost})()
+
+
+def assert_paired(ai):
+    """After the system prompt, user and assistant turns alternate, in memory and in the log."""
+    persisted, _ = ConversationLog(ai.conversation_log.path, legacy_path=None).load()
+    for messages in (ai.memory, persisted):
+        roles = [message["role"] for message in messages if message["role"] != "system"]
+        assert roles == ["user", "assistant"] * (len(roles) // 2)
+
+
+def test_streamed_reply_is_saved_once(ai):
+    use_http(ai, FakeResponse(lines=sse("Hello ", "there.")))
+    assert "".join(ai.stream_chat_with_ai("hi")) == "Hello there."
+    assert ai.memory[-1] == {"role": "assistant", "content": "Hello there."}
+    assert_paired(ai)
+
+
+def test_empty_stream_saves_a_single_placeholder(ai):
+    use_http(ai, FakeResponse(lines=["data: [DONE]"]))
+    assert list(ai.stream_chat_with_ai("hi")) == []
+    assert ai.memory[-1]["content"] == NO_REPLY
+    assert_paired(ai)
+
+
+def test_abandoned_stream_keeps_what_arrived(ai):
+    use_http(ai, FakeResponse(lines=sse("Partial ", "reply")))
+    stream = ai.stream_chat_with_ai("hi")
+    assert next(stream) == "Partial "
+    stream.close()
+    assert ai.memory[-1]["content"] == "Partial "
+    assert_paired(ai)
+
+
+def test_failed_requests_close_the_turn(ai):
+    use_http(ai, FakeResponse(status_code=500), FakeResponse(body={"choices": []}), ConnectionError("offline"),
+             FakeResponse(status_code=429))
+    assert ai.chat_with_ai("one").startswith("API Error: 500")
+    assert ai.chat_with_ai("two") == "No response"
+    with pytest.raises(ConnectionError):
+        ai.chat_with_ai("three")
+    assert list(ai.stream_chat_with_ai("four"))[0].startswith("API Error: 429")
+    assert [message["content"] for message in ai.memory if message["role"] == "assistant"] == [NO_REPLY] * 4
+    assert_paired(ai)
+
+
+def test_async_failure_closes_the_turn(ai):
+    use_http(ai, FakeResponse(status_code=503),
+             FakeResponse(body={"choices": [{"message": {"content": "Fine, thanks."}}]}))
+    assert asyncio.run(ai.achat_with_ai("hello")).startswith("API Error: 503")
+    assert asyncio.run(ai.achat_with_ai("how are you?")) == "Fine, thanks."
+    assert_paired(ai)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from SystemPrograms.VoiceRecognition.ContinuousListener import (
+    SAMPLE_RATE, ContinuousListener, EnergyVAD, Resampler, WavFileSource, synthetic_wav,
+)
+
+
+def run_vad(vad, pcm, frame_ms=30):
+    frame_bytes = SAMPLE_RATE * frame_ms // 1000 * 2
+    events = []
+    for index in range(len(pcm) // frame_bytes):
+        event = vad.process(pcm[index * frame_bytes:(index + 1) * frame_bytes], index * frame_ms / 1000)
+        if event:
+            events.append(event)
+    return events
+
+
+def test_listener_segments_each_burst_of_a_wav(tmp_path):
+    path = str(tmp_path / "speech.wav")
+    synthetic_wav(path, bursts=3, speech_s=1.0, silence_s=1.0)
+    listener = ContinuousListener(WavFileSource(path), recognize=lambda audio: len(audio.frame_data))
+    listener.start().wait(timeout=30)
+    transcripts = []
+    while (item := listener.get_transcript(timeout=0)) is not None:
+        transcripts.append(item[0])
+    assert listener.get_stats()["utterances"] == 3
+    for size in transcripts:  # About one second of speech each, with pre-roll and without the hangover
+        assert 0.9 < size / (SAMPLE_RATE * 2) < 1.5
+
+
+def test_quiet_noise_never_starts_an_utterance():
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 60, SAMPLE_RATE * 3).astype(np.int16).tobytes()
+    assert run_vad(EnergyVAD(), noise) == []
+
+
+def test_rising_noise_recalibrates_after_one_max_length_utterance():
+    rng = np.random.default_rng(0)
+    quiet = rng.normal(0, 60, SAMPLE_RATE).astype(np.int16)
+    loud = rng.normal(0, 600, SAMPLE_RATE * 12).astype(np.int16)
+    vad = EnergyVAD(max_utterance_s=3.0)
+    events = run_vad(vad, np.concatenate([quiet, loud]).tobytes())
+    assert [kind for kind, _ in events] == ["start", "end"]
+    assert vad.recalibrations == 1
+    assert vad.noise_floor > 300
+
+
+def test_resampler_keeps_a_tone_across_chunks():
+    for rate in (44100, 48000, 22050):
+        resampler = Resampler(rate, SAMPLE_RATE)
+        tone = (8000 * np.sin(2 * np.pi * 440 * np.arange(rate) / rate)).astype(np.int16).tobytes()
+        chunk = rate * 30 // 1000 * 2
+        output = b"".join(resampler.process(tone[i:i + chunk]) for i in range(0, len(tone), chunk))
+        samples = np.frombuffer(output, dtype=np.int16)
+        assert abs(len(samples) - SAMPLE_RATE) <= 1
+        expected = 8000 * np.sin(2 * np.pi * 440 * np.arange(len(samples)) / SAMPLE_RATE)
+        assert np.max(np.abs(samples - expected)) < 50
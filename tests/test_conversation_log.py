@@ -0,0 +1,71 @@
+import json
+
+from SystemPrograms.TextGeneration.ConversationLog import ConversationLog
+
+SYSTEM = {"role": "system", "content": "You are a test."}
+
+
+def turns(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(count)]
+
+
+def make_log(tmp_path, **options):
+    return ConversationLog(str(tmp_path / "memory.jsonl"), legacy_path=None, fsync="never", **options)
+
+
+def test_append_and_load_round_trip(tmp_path):
+    log = make_log(tmp_path)
+    log.append([SYSTEM] + turns(4), "2025-01-01 10:00:00")
+    messages, last_interaction = make_log(tmp_path).load()
+    assert messages == [SYSTEM] + turns(4)
+    assert last_interaction == "2025-01-01 10:00:00"
+
+
+def test_torn_final_record_is_discarded(tmp_path):
+    log = make_log(tmp_path)
+    log.append(turns(2))
+    with open(log.path, "a") as file:
+        file.write('{"role": "user", "cont')
+    messages, _ = make_log(tmp_path).load()
+    assert messages == turns(2)
+    assert open(log.path).read().endswith("}\n")
+    assert not (tmp_path / "memory.jsonl.corrupt").exists()
+
+
+def test_damaged_middle_record_is_quarantined(tmp_path):
+    log = make_log(tmp_path)
+    log.append(turns(4))
+    lines = open(log.path).read().splitlines(keepends=True)
+    lines[1] = "{not json\n"
+    lines.insert(2, "[1, 2]\n")  # Valid JSON but not a message
+    open(log.path, "w").writelines(lines)
+
+    messages, _ = make_log(tmp_path).load()
+    assert [message["content"] for message in messages] == ["message 0", "message 2", "message 3"]
+    assert open(str(tmp_path / "memory.jsonl.corrupt")).read() == "{not json\n[1, 2]\n"
+    assert make_log(tmp_path).load()[0] == messages  # The log itself was repaired
+
+
+def test_compaction_keeps_the_system_prompt_and_aligned_blocks(tmp_path):
+    log = make_log(tmp_path, keep_messages=10, compact_every=5, align=4)
+    messages = [SYSTEM] + turns(23)
+    log.append(messages)
+    assert log.should_compact()
+    kept = log.compact(messages)
+    assert kept[0] == SYSTEM
+    assert (len(messages) - len(kept)) % 4 == 0  # Whole summary blocks are dropped
+    assert len(kept) - 1 <= 10
+    assert kept[1:] == messages[len(messages) - len(kept) + 1:]
+    assert make_log(tmp_path).load()[0] == kept
+    assert not log.should_compact()
+
+
+def test_legacy_memory_is_migrated_once(tmp_path):
+    legacy = tmp_path / "memory.json"
+    legacy.write_text(json.dumps({"messages": [SYSTEM] + turns(2), "last_interaction": "2024-12-31 23:59:00"}))
+    log = ConversationLog(str(tmp_path / "memory.jsonl"), legacy_path=str(legacy), fsync="never")
+    messages, last_interaction = log.load()
+    assert messages == [SYSTEM] + turns(2)
+    assert last_interaction == "2024-12-31 23:59:00"
+    log.append(turns(1))
+    assert len(log.load()[0]) == 4  # The existing log wins over the legacy file
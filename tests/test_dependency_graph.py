@@ -0,0 +1,55 @@
+from SystemPrograms.SystemSetup.DependencyGraph import DependencyGraph
+
+
+def write_tree(root, files):
+    for relative_path, source in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+
+def make_graph(tmp_path):
+    # base <- mid <- top, base <- other; lonely imports nothing local
+    write_tree(tmp_path, {
+        "Programs/__init__.py": "",
+        "Programs/base.py": "import os\n",
+        "Programs/mid.py": "from Programs import base\n",
+        "Programs/top.py": "from Programs.mid import something\nimport Programs.base\n",
+        "Programs/other.py": "from . import base\n",
+        "Programs/lonely.py": "import json\n",
+    })
+    return DependencyGraph(tmp_path / "Programs", tmp_path)
+
+
+def test_reload_order_puts_each_module_after_its_imports(tmp_path):
+    graph = make_graph(tmp_path)
+    order = graph.reload_order("Programs.base")
+    assert order[0] == "Programs.base"
+    assert set(order) == {"Programs.base", "Programs.mid", "Programs.top", "Programs.other"}
+    assert order.index("Programs.mid") < order.index("Programs.top")
+
+
+def test_reload_order_merges_several_changes(tmp_path):
+    graph = make_graph(tmp_path)
+    order = graph.reload_order("Programs.base", "Programs.mid", "Programs.lonely")
+    assert len(order) == len(set(order))  # A shared dependent appears once
+    assert set(order) == {"Programs.base", "Programs.mid", "Programs.top", "Programs.other", "Programs.lonely"}
+    assert order.index("Programs.base") < order.index("Programs.mid") < order.index("Programs.top")
+
+
+def test_update_picks_up_a_new_import(tmp_path):
+    graph = make_graph(tmp_path)
+    assert "Programs.lonely" not in graph.reload_order("Programs.base")
+    (tmp_path / "Programs" / "lonely.py").write_text("from Programs import base\n")
+    graph.update(str(tmp_path / "Programs" / "lonely.py"))
+    assert "Programs.lonely" in graph.reload_order("Programs.base")
+
+
+def test_import_cycle_still_yields_every_module(tmp_path):
+    write_tree(tmp_path, {
+        "Programs/__init__.py": "",
+        "Programs/a.py": "from Programs import b\n",
+        "Programs/b.py": "from Programs import a\n",
+    })
+    graph = DependencyGraph(tmp_path / "Programs", tmp_path)
+    assert sorted(graph.reload_order("Programs.a")) == ["Programs.a", "Programs.b"]
@@ -0,0 +1,61 @@
+import numpy as np
+
+from SystemPrograms.Vision.FaceGallery import DAMAGED_NAME, ROW_BYTES, FaceGallery
+from SystemPrograms.Vision.FaceIndex import ENCODING_SIZE
+
+
+def make_gallery(tmp_path):
+    return FaceGallery(str(tmp_path / "faces.f32"), str(tmp_path / "faces.jsonl"), legacy_path=None, fsync=False)
+
+
+def enroll(tmp_path, count):
+    gallery = make_gallery(tmp_path)
+    gallery.load()
+    for i in range(count):
+        gallery.append(np.full(ENCODING_SIZE, i, dtype=np.float32), f"person {i}")
+    return gallery
+
+
+def test_append_and_load_round_trip(tmp_path):
+    enroll(tmp_path, 3)
+    encodings, names = make_gallery(tmp_path).load()
+    assert names == ["person 0", "person 1", "person 2"]
+    assert encodings[:, 0].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_interrupted_append_is_dropped(tmp_path):
+    enroll(tmp_path, 3)
+    with open(tmp_path / "faces.f32", "ab") as file:
+        file.write(np.ones(ENCODING_SIZE, dtype=np.float32).tobytes())  # Encoding written, name never was
+    with open(tmp_path / "faces.jsonl", "a") as file:
+        file.write('{"name": "half')
+    encodings, names = make_gallery(tmp_path).load()
+    assert names == ["person 0", "person 1", "person 2"]
+    assert (tmp_path / "faces.f32").stat().st_size == 3 * ROW_BYTES
+
+
+def test_damaged_middle_record_keeps_every_other_face(tmp_path):
+    enroll(tmp_path, 5)
+    lines = (tmp_path / "faces.jsonl").read_bytes().split(b"\n")
+    lines[1] = b"{garbage"
+    (tmp_path / "faces.jsonl").write_bytes(b"\n".join(lines))
+
+    encodings, names = make_gallery(tmp_path).load()
+    assert names == ["person 0", DAMAGED_NAME, "person 2", "person 3", "person 4"]
+    assert encodings[:, 0].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]  # Rows stay aligned with their names
+    assert (tmp_path / "faces.jsonl.corrupt").read_bytes() == b"{garbage\n"
+    assert make_gallery(tmp_path).load()[1] == names  # Repaired on disk; nothing is quarantined twice
+    assert (tmp_path / "faces.jsonl.corrupt").read_bytes() == b"{garbage\n"
+
+
+def test_enrolling_after_a_repair_appends_in_order(tmp_path):
+    enroll(tmp_path, 3)
+    lines = (tmp_path / "faces.jsonl").read_bytes().split(b"\n")
+    lines[0] = b'"just a string"'
+    (tmp_path / "faces.jsonl").write_bytes(b"\n".join(lines))
+    gallery = make_gallery(tmp_path)
+    gallery.load()
+    assert gallery.append(np.full(ENCODING_SIZE, 9, dtype=np.float32), "newcomer") == 3
+    encodings, names = make_gallery(tmp_path).load()
+    assert names == [DAMAGED_NAME, "person 1", "person 2", "newcomer"]
+    assert encodings[3, 0] == 9.0
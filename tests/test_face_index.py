@@ -0,0 +1,64 @@
+import numpy as np
+
+from SystemPrograms.Vision.FaceIndex import ENCODING_SIZE, BruteForceIndex, IVFIndex, make_index
+
+
+def clustered_gallery(size, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = rng.normal(0, 0.1, (max(1, size // 100), ENCODING_SIZE))
+    gallery = groups[rng.integers(0, len(groups), size)] + rng.normal(0, 0.04, (size, ENCODING_SIZE))
+    probes = gallery[rng.integers(0, size, 100)] + rng.normal(0, 0.02, (100, ENCODING_SIZE))
+    return gallery.astype(np.float32), probes.astype(np.float32)
+
+
+def test_brute_force_matches_numpy():
+    gallery, probes = clustered_gallery(500)
+    index = BruteForceIndex()
+    index.add(gallery[:200])
+    index.add(gallery[200:])  # Grows the buffer
+    distances, ids = index.search(probes, k=3)
+    expected = np.linalg.norm(probes[:, None, :] - gallery[None, :, :], axis=2)
+    assert (ids[:, 0] == expected.argmin(axis=1)).all()
+    assert np.allclose(distances[:, 0], expected.min(axis=1), atol=1e-3)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_empty_index_returns_no_neighbours():
+    distances, ids = BruteForceIndex().search(np.zeros((2, ENCODING_SIZE)), k=2)
+    assert (ids == -1).all() and np.isinf(distances).all()
+
+
+def test_wrap_shares_memory_with_the_source():
+    gallery, _ = clustered_gallery(300)
+    index = BruteForceIndex()
+    index.wrap(gallery)
+    assert np.shares_memory(index.vectors, gallery)
+    assert len(index) == 300
+    assert index.add(gallery[:1]) == 300  # The first add moves to a growable buffer
+    assert not np.shares_memory(index.vectors, gallery)
+
+
+def test_ivf_recall_against_brute_force():
+    gallery, probes = clustered_gallery(5000)
+    brute = BruteForceIndex()
+    brute.add(gallery)
+    _, truth = brute.search(probes)
+
+    ivf = make_index("ivf", nprobe=8, train_threshold=1000, background_training=False)
+    ivf.add(gallery[:2500])
+    for start in range(2500, 5000, 500):
+        ivf.add(gallery[start:start + 500])  # Enrollment into a trained index never rebuilds
+    assert ivf.centroids is not None
+    _, found = ivf.search(probes)
+    assert np.mean(found[:, 0] == truth[:, 0]) >= 0.95
+
+
+def test_ivf_background_training_swaps_in_the_partition():
+    gallery, probes = clustered_gallery(2000)
+    ivf = IVFIndex(nprobe=8, train_threshold=1000)
+    ivf.add(gallery[:999])
+    ivf.add(gallery[999:])  # Crosses the threshold; searches keep working while it trains
+    assert ivf.search(probes)[1].shape == (100, 1)
+    ivf.wait_for_training()
+    assert ivf.centroids is not None
+    assert sum(len(ids) for ids in ivf.lists) == len(ivf)
@@ -0,0 +1,64 @@
+import pytest
+
+from SystemPrograms.TextGeneration.ResponseCache import ResponseCache
+
+SYSTEM = {"role": "system", "content": "You are a test."}
+
+
+def history(user, assistant):
+    return [SYSTEM, {"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(directory=str(tmp_path))
+
+
+def test_self_contained_question_ignores_the_previous_reply(cache):
+    first = cache.make_key("model", history("hi", "Hey there!"), "How are you?")
+    second = cache.make_key("model", history("hi", "Hello, friend."), "How are you?")
+    assert first == second
+
+
+def test_follow_up_keys_on_the_previous_reply(cache):
+    joke = cache.make_key("model", history("hi", "Want to hear a joke?"), "yes")
+    cats = cache.make_key("model", history("hi", "Shall we talk about cats?"), "yes")
+    assert joke != cats
+    assert cache.make_key("model", history("hi", "Want to hear a joke?"), "yes") == joke
+
+
+def test_key_depends_on_model_system_prompt_and_previous_user_turn(cache):
+    key = cache.make_key("model", history("hi", "Hey!"), "How are you?")
+    assert cache.make_key("other-model", history("hi", "Hey!"), "How are you?") != key
+    assert cache.make_key("model", history("good morning", "Hey!"), "How are you?") != key
+    other_system = [{"role": "system", "content": "Someone else."}] + history("hi", "Hey!")[1:]
+    assert cache.make_key("model", other_system, "How are you?") != key
+
+
+def test_normalized_key_ignores_case_and_punctuation(cache):
+    key = cache.make_key("model", history("hi", "Hey!"), "How are you?", normalized=True)
+    assert cache.make_key("model", history("HI!", "Hey!"), "how are   you", normalized=True) == key
+    assert cache.make_key("model", history("hi", "Hey!"), "how are you", normalized=False) != \
+        cache.make_key("model", history("hi", "Hey!"), "How are you?", normalized=False)
+
+
+def test_store_and_lookup(cache):
+    cache.store("model", history("hi", "Want to hear a joke?"), "yes", "Knock knock.")
+    cache.store("model", history("hi", "Hey!"), "How are you?", "Fine.")
+    assert cache.lookup("model", history("hi", "Want to hear a joke?"), "Yes!") == "Knock knock."
+    assert cache.lookup("model", history("hi", "Shall we talk about cats?"), "yes") is None
+    assert cache.lookup("model", history("hi", "Hello."), "how are you") == "Fine."
+    stats = cache.get_stats()
+    assert (stats["exact_hits"], stats["normalized_hits"], stats["misses"]) == (0, 2, 1)
+
+
+def test_time_sensitive_prompts_bypass_the_cache(cache):
+    cache.store("model", history("hi", "Hey!"), "What time is it?", "Noon.")
+    assert cache.lookup("model", history("hi", "Hey!"), "What time is it?") is None
+    assert cache.get_stats()["bypassed"] == 1
+    assert not cache.memory
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    ResponseCache(directory=str(tmp_path)).store("model", history("hi", "Hey!"), "Tell a joke", "Knock knock.")
+    assert ResponseCache(directory=str(tmp_path)).lookup("model", history("hi", "Hey!"), "Tell a joke") == "Knock knock."
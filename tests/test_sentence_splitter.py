@@ -0,0 +1,35 @@
+from SystemPrograms.Conversation.VoiceConversation import SentenceSplitter
+
+
+def split_stream(splitter, text, token_size=3):
+    sentences = []
+    for start in range(0, len(text), token_size):
+        sentences += splitter.feed(text[start:start + token_size])
+    rest = splitter.flush()
+    return sentences + ([rest] if rest else [])
+
+
+def test_sentences_come_out_as_soon_as_they_end():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Hello there, how are you today") == []
+    assert splitter.feed("? I am") == ["Hello there, how are you today?"]
+    assert splitter.flush() == "I am"
+
+
+def test_short_fragments_and_abbreviations_are_joined():
+    text = "Oh. Hello there, Mr. Smith. How are you today? I am fine!"
+    assert split_stream(SentenceSplitter(), text) == ["Oh. Hello there, Mr. Smith.", "How are you today?", "I am fine!"]
+
+
+def test_long_run_ons_are_cut_at_a_comma_or_space():
+    splitter = SentenceSplitter(max_chars=40)
+    sentences = split_stream(splitter, "first part of a long thought, " * 3 + "word " * 20)
+    assert all(len(sentence) <= 40 for sentence in sentences)
+    assert sentences[0].endswith(",")
+    assert " ".join(sentences).split() == ("first part of a long thought, " * 3 + "word " * 20).split()
+
+
+def test_flush_of_an_empty_stream_is_none():
+    splitter = SentenceSplitter()
+    assert splitter.feed("   ") == []
+    assert splitter.flush() is None